@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 被测脚本在仓库根目录，文件名本身就是合法的模块名
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,24 @@
+import 米哈游启动器背景提取 as extractor
+
+
+def test_url_written_in_two_parts_is_emitted_once(tmp_path):
+    watcher = extractor.CacheDirWatcher([str(tmp_path)])
+    path = str(tmp_path / "f_000001")
+    with open(path, "wb") as f:
+        f.write(b"\x00" * 300 + b"https://b.example.com/x.jpg \x00 https://a.example.com/bg")
+    found = watcher._scan_changes([path])
+    assert found == {"https://b.example.com/x.jpg"}
+    with open(path, "ab") as f:
+        f.write(b"_full.png\x00")
+    found |= watcher._scan_changes([path])
+    assert found == {"https://b.example.com/x.jpg", "https://a.example.com/bg_full.png"}
+
+
+def test_open_tail_complete_earlier_is_kept(tmp_path):
+    path = str(tmp_path / "f_000002")
+    with open(path, "wb") as f:
+        f.write(b"")
+    watcher = extractor.CacheDirWatcher([str(tmp_path)])
+    with open(path, "ab") as f:
+        f.write(b"see https://a.example.com/bg here\n" + b"." * 9000 + b"https://a.example.com/bg")
+    assert watcher._scan_changes([path]) == {"https://a.example.com/bg"}
@@ -0,0 +1,82 @@
+import base64
+import os
+import struct
+
+import pytest
+
+import 米哈游启动器背景提取 as extractor
+
+PNG_HEAD = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+
+def data_uri(payload, mime="png"):
+    return b"data:image/" + mime.encode() + b";base64," + base64.b64encode(payload)
+
+
+def block_addr(file_type, file_number, start_block):
+    return 0x80000000 | (file_type << 28) | (file_number << 16) | start_block
+
+
+def write_cache(cache_dir, entries, tail=b""):
+    """最小的blockfile缓存：data_1放条目（256字节块），data_2放响应体（1K块），tail追加到data_2末尾（不属于任何条目）"""
+    os.makedirs(cache_dir)
+    blocks = {n: bytearray(struct.pack("<I", extractor.CACHE_BLOCK_MAGIC).ljust(extractor.CACHE_BLOCK_HEADER_SIZE, b"\0"))
+              for n in (1, 2)}
+    table = [0] * extractor.CACHE_INDEX_TABLE_LEN
+    for i, (url, body) in enumerate(entries):
+        blocks[2] += body.ljust(1024, b"\0")
+        record = extractor.CACHE_ENTRY_STRUCT.pack(0, 0, 0, 0, 0, 0, 0, len(url), 0, 0, len(body), 0, 0,
+                                                   0, block_addr(3, 2, i), 0, 0, 0, 0, 0, 0, 0, 0)
+        blocks[1] += (record + url.encode()).ljust(256, b"\0")
+        table[i] = block_addr(2, 1, i)
+    blocks[2] += tail
+    for n, data in blocks.items():
+        with open(os.path.join(cache_dir, f"data_{n}"), "wb") as f:
+            f.write(data)
+    header = bytearray(extractor.CACHE_INDEX_HEADER_SIZE)
+    struct.pack_into("<IIi", header, 0, extractor.CACHE_INDEX_MAGIC, 0x30000, len(entries))
+    with open(os.path.join(cache_dir, "index"), "wb") as f:
+        f.write(bytes(header) + struct.pack(f"<{len(table)}I", *table))
+    return os.path.join(cache_dir, "index")
+
+
+def find(paths):
+    found = []
+    extractor.scan_paths([str(path) for path in paths], workers=1,
+                         on_data_uris=lambda items, source: found.extend((item, source) for item in items))
+    return found
+
+
+@pytest.fixture(autouse=True)
+def scan_index(tmp_path, monkeypatch):
+    # 扫描索引写到临时目录，不碰用户目录下的索引
+    monkeypatch.setattr(extractor.ScanIndex.__init__, "__defaults__", (str(tmp_path / "scan_index.json"),))
+
+
+def test_cache_only_searches_non_media_bodies(tmp_path):
+    inline = data_uri(b"css inline image payload" * 4)
+    index_path = write_cache(tmp_path / "cache", [
+        ("https://a.example.com/page.css", b"body{background:url(" + inline + b")}"),
+        ("https://a.example.com/bg.png", b"text " + data_uri(b"inside a png url" * 4)),
+        ("https://a.example.com/api", PNG_HEAD + data_uri(b"inside a png body" * 4)),
+    ], tail=data_uri(b"not part of any entry" * 4))
+    found = find([index_path])
+    assert [(item.mime, source) for item, source in found] == [("png", index_path)]
+    assert extractor.decode_data_uri(found[0][0]) == b"css inline image payload" * 4
+
+
+def test_unchanged_file_reuses_indexed_data_uris(tmp_path, monkeypatch):
+    path = tmp_path / "page.html"
+    path.write_bytes(b"<img src=\"" + data_uri(b"first inline image" * 4) + b"\">")
+    first = find([path])
+    assert len(first) == 1
+
+    scanned = []
+    scan_data_uris = extractor.scan_data_uris
+    monkeypatch.setattr(extractor, "scan_data_uris", lambda *args, **kwargs: scanned.append(args) or
+                        scan_data_uris(*args, **kwargs))
+    assert find([path]) == first and scanned == []
+
+    with open(path, "ab") as f:
+        f.write(b"<img src=\"" + data_uri(b"second inline image" * 4, "jpeg") + b"\">")
+    assert [item.mime for item, _ in find([path])] == ["png", "jpeg"] and len(scanned) == 1
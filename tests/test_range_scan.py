@@ -0,0 +1,71 @@
+import mmap
+
+import pytest
+
+import 米哈游启动器背景提取 as extractor
+
+MODES = [extractor.SCAN_MODE_MMAP, extractor.SCAN_MODE_STREAM]
+
+
+@pytest.fixture
+def sample(tmp_path):
+    path = tmp_path / "f_000001"
+    data = b"".join(
+        b"\x00" * (i * 37 % 500) + b"https://act.example.com/bg/%d.png?x=%d \n" % (i, i % 7) for i in range(400)
+    )
+    path.write_bytes(data)
+    return str(path), [m.group().decode("ascii") for m in extractor.URL_REGEX_BYTES.finditer(data)]
+
+
+@pytest.mark.parametrize("scan_mode", MODES)
+@pytest.mark.parametrize("split_size", [333, 4096, 50000])
+def test_ranges_cover_file_once(sample, scan_mode, split_size):
+    # 各区间只产出起点落在区间内的URL，依次拼起来与整段finditer相同
+    path, expected = sample
+    size = len(open(path, "rb").read())
+    urls = []
+    for start in range(0, size, split_size):
+        urls.extend(extractor.iter_urls_range(path, start, start + split_size, scan_mode=scan_mode))
+    assert urls == expected
+
+
+def test_stream_range_does_not_map(sample, monkeypatch):
+    path, expected = sample
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("stream模式不应映射文件")
+
+    monkeypatch.setattr(mmap, "mmap", refuse)
+    assert list(extractor.iter_urls_range(path, 0, 10 ** 9, scan_mode=extractor.SCAN_MODE_STREAM)) == expected
+
+
+@pytest.mark.parametrize("scan_mode", MODES)
+def test_parallel_scan_honours_mode(sample, scan_mode):
+    path, expected = sample
+    tasks = extractor.plan_scan_tasks([(path, 0, len(open(path, "rb").read()))], split_size=5000)
+    found = set()
+    for _, urls in extractor.iter_parallel_scan(tasks, 2, scan_mode=scan_mode):
+        found |= urls
+    assert found == set(expected)
+
+
+def test_checkpointed_scan_honours_mode(sample, monkeypatch):
+    # 可取消的串行扫描按段读取，stream模式下各段同样不映射文件
+    path, expected = sample
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("stream模式不应映射文件")
+
+    monkeypatch.setattr(extractor, "SCAN_CHECKPOINT_SIZE", 4096)
+    monkeypatch.setattr(mmap, "mmap", refuse)
+    found = extractor.scan_paths([path], scan_mode=extractor.SCAN_MODE_STREAM, workers=1, use_index=False,
+                                 control=extractor.JobControl())
+    assert sorted(found) == sorted(set(expected))
+
+
+def test_cache_index_pool_stops_at_checkpoint(tmp_path):
+    control = extractor.JobControl()
+    control.cancel()
+    paths = [str(tmp_path / str(i) / "index") for i in range(4)]
+    with pytest.raises(extractor.ScanCancelled):
+        list(extractor.iter_cache_indexes(paths, 2, control))
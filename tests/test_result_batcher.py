@@ -0,0 +1,37 @@
+import time
+
+import 米哈游启动器背景提取 as extractor
+
+
+def test_flushes_on_interval_without_more_urls():
+    batches = []
+    persisted = []
+    batcher = extractor.ResultBatcher(lambda urls, sources: batches.append(list(urls)), max_count=100,
+                                      max_interval=0.2, persist=lambda urls, sources: persisted.append(list(urls)))
+    batcher.start()
+    try:
+        batcher.add("https://a.example.com/bg.png")
+        deadline = time.monotonic() + 2
+        while not batches and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert batches == [["https://a.example.com/bg.png"]]
+        # 计时线程只负责送出，写库留给扫描线程的flush
+        assert persisted == []
+    finally:
+        batcher.stop()
+    batcher.flush()
+    assert batches == [["https://a.example.com/bg.png"]]
+    assert persisted == [["https://a.example.com/bg.png"]]
+
+
+def test_flush_without_timer_emits_and_persists_once():
+    batches = []
+    persisted = []
+    batcher = extractor.ResultBatcher(lambda urls, sources: batches.append(list(urls)), max_count=2,
+                                      max_interval=60, persist=lambda urls, sources: persisted.append(list(urls)))
+    for url in ("https://a.example.com/1.png", "https://a.example.com/1.png", "https://a.example.com/2.png",
+                "https://a.example.com/3.png"):
+        batcher.add(url)
+    batcher.flush()
+    assert batches == persisted == [["https://a.example.com/1.png", "https://a.example.com/2.png"],
+                                    ["https://a.example.com/3.png"]]
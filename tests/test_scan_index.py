@@ -0,0 +1,46 @@
+import pytest
+
+import 米哈游启动器背景提取 as extractor
+
+
+@pytest.fixture
+def scan(tmp_path, monkeypatch):
+    # 扫描索引写到临时目录，不碰用户目录下的索引
+    monkeypatch.setattr(extractor.ScanIndex.__init__, "__defaults__", (str(tmp_path / "scan_index.json"),))
+
+    def run(path):
+        return sorted(extractor.scan_paths([str(path)], workers=1))
+    return run
+
+
+def test_append_completes_url_cut_at_eof(tmp_path, scan):
+    path = tmp_path / "data_1"
+    path.write_bytes(b"\x00" * 5000 + b"https://b.example.com/x.jpg \x00 http://a.example.com/bg")
+    assert scan(path) == ["http://a.example.com/bg", "https://b.example.com/x.jpg"]
+    # 未变化：末尾的URL照常返回
+    assert scan(path) == ["http://a.example.com/bg", "https://b.example.com/x.jpg"]
+    with open(path, "ab") as f:
+        f.write(b"_full.png\x00")
+    assert scan(path) == sorted(extractor.scan_file(str(path))) == [
+        "http://a.example.com/bg_full.png", "https://b.example.com/x.jpg",
+    ]
+
+
+def test_fragment_also_complete_earlier_is_kept(tmp_path, scan):
+    path = tmp_path / "debug.log"
+    path.write_bytes(b"see http://a.example.com/bg here\n" + b"." * 9000 + b"http://a.example.com/bg")
+    scan(path)
+    with open(path, "ab") as f:
+        f.write(b"_full.png\n")
+    assert scan(path) == sorted(extractor.scan_file(str(path))) == [
+        "http://a.example.com/bg", "http://a.example.com/bg_full.png",
+    ]
+
+
+def test_append_after_partial_scheme(tmp_path, scan):
+    path = tmp_path / "data_2"
+    path.write_bytes(b"https://b.example.com/x.jpg\n" + b"\x00" * 100 + b"htt")
+    assert scan(path) == ["https://b.example.com/x.jpg"]
+    with open(path, "ab") as f:
+        f.write(b"ps://c.example.com/y.webp\n")
+    assert scan(path) == sorted(extractor.scan_file(str(path)))
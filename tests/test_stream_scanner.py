@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+import 米哈游启动器背景提取 as extractor
+
+URLS = (
+    b"https://fastcdn.hoyoverse.com/content-v2/hk4e/113/bg_full.png",
+    b"http://a.example.com/x.jpg?v=1#top",
+)
+
+
+def expected(data):
+    return [match.group().decode("ascii") for match in extractor.URL_REGEX_BYTES.finditer(data)]
+
+
+def stream(data, block_size, engine=extractor.SCAN_ENGINE_LITERAL):
+    return list(extractor.iter_urls_stream(io.BytesIO(data), block_size=block_size, engine=engine))
+
+
+@pytest.mark.parametrize("block_size", [7, 16, 61, 256])
+@pytest.mark.parametrize("url", URLS)
+def test_url_at_every_block_offset(url, block_size):
+    # URL起点依次落在块内每个偏移上，覆盖URL跨越块边界的所有切法
+    for offset in range(block_size + 1):
+        data = b"\x00" * offset + url + b" \xff tail"
+        assert stream(data, block_size) == [url.decode("ascii")] == expected(data)
+
+
+@pytest.mark.parametrize("engine", [extractor.SCAN_ENGINE_LITERAL, extractor.SCAN_ENGINE_REGEX])
+@pytest.mark.parametrize("block_size", [16, 61, 1024])
+def test_matches_finditer_with_repeats(engine, block_size):
+    # 同一URL重复出现时逐个产出，与整段finditer的结果和顺序一致
+    data = b"".join(b"\x01" * gap + URLS[gap % 2] + b"\n" for gap in range(0, 300, 7))
+    assert stream(data, block_size, engine) == expected(data)
+
+
+def test_url_at_end_of_file():
+    data = b"junk " + URLS[0]
+    for block_size in (3, 16, len(data), len(data) + 1):
+        assert stream(data, block_size) == expected(data) == [URLS[0].decode("ascii")]
+
+
+def test_stream_file_path(tmp_path):
+    path = tmp_path / "data_1"
+    data = (b"\x00" * 1000 + URLS[0] + b" ") * 50
+    path.write_bytes(data)
+    assert list(extractor.iter_urls_stream(str(path), block_size=4096)) == expected(data)
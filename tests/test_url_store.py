@@ -0,0 +1,41 @@
+import 米哈游启动器背景提取 as extractor
+
+
+URLS = [
+    "https://a.example.com/bg.png",
+    "https://a.example.com/x/y.JPG",
+    "http://b.example.com",
+    "https://a.example.com/bg.png",
+    "https://c.example.com/中文.webp",
+    "relative/path.mp4",
+    "/rooted.gif",
+    "nopath",
+    "http://a.example.com/p://b.Png",
+    "https://a.example.com/q.png?v=1#top",
+    "https://a.example.com/line\nbreak.png",
+]
+
+
+def test_add_many_matches_add():
+    single = extractor.UrlStore()
+    rows = [single.add(url) for url in URLS]
+    batch = extractor.UrlStore()
+    new = batch.add_many(URLS[:4]) + batch.add_many(URLS[2:])
+    assert new == [url for url, (_, is_new) in zip(URLS, rows) if is_new]
+    assert list(batch) == list(single)
+    assert [batch.index(url) for url in URLS] == [row for row, _ in rows]
+
+
+def test_add_many_grows_table():
+    store = extractor.UrlStore()
+    urls = [f"https://cdn{i % 3}.example.com/img/{i}.png" for i in range(5000)]
+    for start in range(0, len(urls), 700):
+        assert store.add_many(urls[start:start + 700]) == urls[start:start + 700]
+    assert store.add_many(urls) == []
+    assert len(store) == len(urls) and store[4321] == urls[4321]
+
+
+def test_url_exts_matches_url_ext():
+    plain = [url for url in URLS if "?" not in url and "#" not in url]
+    for urls in (URLS, plain, plain[:2], ["https://a.example.com/A.PNG", "https://a.example.com/b.png"]):
+        assert extractor.url_exts(urls) == [extractor.url_ext(url) for url in urls]
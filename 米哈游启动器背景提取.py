@@ -1,39 +1,57 @@
+import time
+_STARTUP_T0 = time.perf_counter()  # 启动计时起点，供启动耗时报告使用
 import re
 import os
-import webbrowser
-import shlex
 import json
 import sys
-from urllib.parse import urlparse
-from urllib.request import Request, urlopen
-from pathlib import Path
-import time
+import mmap
+import multiprocessing
+import hashlib
+import struct
+import select
+import threading
+from array import array
+from collections import namedtuple
+from itertools import accumulate, islice, repeat
+from operator import itemgetter
+from urllib.parse import urlparse, urljoin
 import platform
-from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QLabel, QPushButton,
-    QFileDialog, QTextEdit, QVBoxLayout, QHBoxLayout, QListWidget,
-    QTreeWidget, QTreeWidgetItem, QFrame, QScrollBar, QSizePolicy, QSplitter, QLineEdit, QCheckBox, QMenu, QMessageBox,
-    QSystemTrayIcon, QStyle  # ✅ 保留导入，无需注释，解耦核心
-)
-from PyQt6.QtCore import Qt, QMimeData, QThread, pyqtSignal, QTimer, QCoreApplication
-from PyQt6.QtGui import QDrag, QPixmap, QFont, QCursor, QColor, QPalette, QAction, QIcon  # ✅ 必导：图标组件
-
+# http.client / webbrowser / concurrent.futures 只在真正用到时才导入，不拖慢启动
 # 配置常量
 IMAGE_EXTS = {'jpg', 'jpeg', 'png', 'webp', 'bmp', 'gif'}  # 扩展图片格式
 VIDEO_EXTS = {'webm', 'mp4', 'mkv'}  # 扩展视频格式
+CATEGORY_LABELS = {"image": "图片", "video": "视频", "other": "其他"}
+CATEGORY_KEYS = tuple(CATEGORY_LABELS)  # 类别编码 → 类别名，结果列表按编码逐行存成bytearray
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORY_KEYS)}
 
 ICON = "D:\HP\Pictures\图标\神里凌华_64X64.ico"
 
+# 各区服启动器（HYP）根目录，其下每个版本目录（1_0、1_1……）各有一份缓存
+HYP_ROOTS = {
+    "国服": os.path.expandvars(r"%USERPROFILE%\AppData\Roaming\miHoYo\HYP") if platform.system() == "Windows"
+           else os.path.expanduser("~/.config/miHoYo/HYP"),
+    "国际服": os.path.expandvars(r"%USERPROFILE%\AppData\Roaming\Cognosphere\HYP") if platform.system() == "Windows"
+           else os.path.expanduser("~/.config/Cognosphere/HYP")
+}
+HYP_CACHE_SUBDIR = os.path.join("fedata", "Cache", "Cache_Data")  # 版本目录下的缓存子目录
+
 # 预设路径（和HTML中一致）
 DEFAULT_PATHS = {
-    "国服": os.path.expandvars(r"%USERPROFILE%\AppData\Roaming\miHoYo\HYP\1_1\fedata\Cache\Cache_Data") if platform.system() == "Windows" 
-           else os.path.expanduser("~/.config/miHoYo/HYP/1_1/fedata/Cache/Cache_Data"),
-    "国际服": os.path.expandvars(r"%USERPROFILE%\AppData\Roaming\Cognosphere\HYP\1_0\fedata\Cache\Cache_Data") if platform.system() == "Windows"
-           else os.path.expanduser("~/.config/Cognosphere/HYP/1_0/fedata/Cache/Cache_Data")
+    "国服": os.path.join(HYP_ROOTS["国服"], "1_1", HYP_CACHE_SUBDIR),
+    "国际服": os.path.join(HYP_ROOTS["国际服"], "1_0", HYP_CACHE_SUBDIR)
 }
 
 # 配置文件路径（记忆上次选择的路径）
 CONFIG_PATH = os.path.expanduser("~/.mihoyo_extractor_config.json")
+# 增量扫描索引（与配置文件放在同一目录）
+SCAN_INDEX_PATH = os.path.join(os.path.dirname(CONFIG_PATH), ".mihoyo_extractor_scan_index.json")
+# 链接元数据（Content-Type/大小/修改时间）探测缓存
+METADATA_CACHE_PATH = os.path.join(os.path.dirname(CONFIG_PATH), ".mihoyo_extractor_metadata.json")
+RESULT_DB_PATH = os.path.join(os.path.dirname(CONFIG_PATH), ".mihoyo_extractor_results.db")  # 跨会话保存的扫描结果
+SCAN_PROFILE_PATH = os.path.join(os.path.dirname(CONFIG_PATH), ".mihoyo_extractor_scan.prof")  # 界面中cProfile抓取结果
+# 缩略图磁盘缓存目录（按内容哈希存放，附带 URL→哈希 索引）
+THUMB_CACHE_DIR = os.path.join(os.path.dirname(CONFIG_PATH), ".mihoyo_extractor_thumbs")
+DATA_URI_PREVIEW_DIR = os.path.join(os.path.dirname(CONFIG_PATH), ".mihoyo_extractor_inline")  # 内嵌图片预览时的解码文件
 APP_TITLE = "米哈游启动器媒体提取器"
 
 # 优化URL正则（减少无效匹配，符合RFC标准）
@@ -42,574 +60,2813 @@ URL_REGEX = re.compile(
     re.IGNORECASE
 )
 
-# ========== 后台处理线程（原有功能，无修改） ==========
-class FileProcessThread(QThread):
-    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
-    result_signal = pyqtSignal(list)        # 提取的URL列表
-    error_signal = pyqtSignal(str)          # 错误信息
+# 字节级URL正则（直接作用于文件映射，无需先整体解码）
+URL_REGEX_BYTES = re.compile(URL_REGEX.pattern.encode("ascii"), re.IGNORECASE)
+
+# 扫描模式：mmap为内存映射零拷贝扫描，stream为分块流式扫描
+SCAN_MODE_MMAP = "mmap"
+SCAN_MODE_STREAM = "stream"
+# 匹配引擎：regex为整段跑URL_REGEX_BYTES，literal先找"://"锚点再锚定匹配，两者结果完全一致
+SCAN_ENGINE_REGEX = "regex"
+SCAN_ENGINE_LITERAL = "literal"
+LITERAL_DENSITY_WINDOW = 256        # literal引擎每处理这么多个锚点检查一次URL密度
+LITERAL_DENSE_GAP = 512             # 锚点平均间隔小于该字节数视为URL密集（纯文本日志），逐锚点开销反超正则
+LITERAL_DENSE_SPAN = 1024 * 1024    # 密集区整段交给正则的长度，之后再回到锚点查找
+SCAN_BLOCK_SIZE = 1024 * 1024
+SCAN_CARRY_SIZE = 4096  # 块间保留的尾部窗口上限，超过该长度的单个URL会被截断输出
+PARALLEL_SPLIT_SIZE = 16 * 1024 * 1024  # 并行扫描时大文件按该大小切分字节区间
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024    # 总量低于该值时进程池启动开销大于收益，直接串行
+SCAN_CHECKPOINT_SIZE = 16 * 1024 * 1024  # 可取消的串行扫描按该大小分段，段与段之间响应取消/暂停
+SCAN_CHECKPOINT_URLS = 4096              # 合并结果时每处理这么多条URL检查一次取消/暂停
+RESULT_BATCH_SIZE = 500       # 流式结果每批最多条数
+RESULT_BATCH_INTERVAL = 0.2   # 流式结果最长攒批时间（秒）
+UI_REFRESH_INTERVAL_MS = 100  # 结果列表刷新最小间隔（约10帧/秒封顶）
+SEARCH_INDEX_STEP = 2000      # 界面空闲时每次补建搜索索引的行数
+
+# ========== 扫描核心（无Qt依赖） ==========
+def iter_url_matches(buffer, pos=0, endpos=None, engine=SCAN_ENGINE_LITERAL):
+    """产出buffer[pos:endpos]中URL_REGEX_BYTES的全部匹配，与finditer逐个相同。
+    literal引擎用bytes.find找"://"，回看确认前面是http/https（不分大小写）后才从该处锚定匹配，
+    二进制数据里绝大部分字节不再经过忽略大小写的正则"""
+    if endpos is None:
+        endpos = len(buffer)
+    if engine == SCAN_ENGINE_REGEX:
+        yield from URL_REGEX_BYTES.finditer(buffer, pos, endpos)
+        return
+    find = buffer.find
+    match = URL_REGEX_BYTES.match
+    floor = pos            # 下一个匹配的起点不能早于上一个匹配的终点（与finditer一样不重叠）
+    cursor = pos + 4       # "://"前至少要有"http"
+    checkpoint, anchors = cursor, 0
+    while True:
+        anchor = find(b"://", cursor, endpos)
+        if anchor < 0:
+            return
+        anchors += 1
+        if anchors == LITERAL_DENSITY_WINDOW:
+            if anchor - checkpoint < LITERAL_DENSITY_WINDOW * LITERAL_DENSE_GAP:
+                # URL密集区：接下来一段直接用finditer，从上个匹配终点续扫，结果与全程finditer相同
+                span_end = anchor + LITERAL_DENSE_SPAN
+                for found in URL_REGEX_BYTES.finditer(buffer, floor, endpos):
+                    if found.start() >= span_end:
+                        break  # 该匹配留给下面的锚点查找重新找到
+                    yield found
+                    floor = found.end()
+                else:
+                    return
+                cursor = max(cursor, floor)
+                checkpoint, anchors = cursor, 0
+                continue
+            checkpoint, anchors = anchor, 0
+        cursor = anchor + 3
+        head = buffer[max(floor, anchor - 5):anchor].lower()
+        if head == b"https":
+            start = anchor - 5
+        elif head[-4:] == b"http":
+            start = anchor - 4
+        else:
+            continue
+        found = match(buffer, start, endpos)
+        if found:
+            yield found
+            floor = found.end()
+            cursor = max(cursor, floor)
 
-    def __init__(self, file_paths):
-        super().__init__()
-        self.file_paths = file_paths
+def iter_urls_stream(source, block_size=SCAN_BLOCK_SIZE, carry_size=SCAN_CARRY_SIZE, engine=SCAN_ENGINE_LITERAL,
+                     record=None):
+    """流式扫描：块间保留有界尾部窗口，跨块边界的URL完整且只产出一次（与整段finditer逐个相同，重复的URL照常产出，
+    去重交给ResultBatcher，内存只占一块加尾部窗口）；record为new_file_stats()时累计各阶段耗时"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter_urls_stream(f, block_size, carry_size, engine, record)
+        return
+    for _, url in iter_url_spans_stream(source, block_size, carry_size, engine, record):
+        yield url
 
-    def run(self):
+def iter_url_spans_stream(source, block_size=SCAN_BLOCK_SIZE, carry_size=SCAN_CARRY_SIZE, engine=SCAN_ENGINE_LITERAL,
+                          record=None, limit=None):
+    """同iter_urls_stream，但产出 (起点偏移, URL)，偏移相对source当前读取位置；给出limit时最多读取这么多字节"""
+    clock = time.perf_counter
+    buffer = b""
+    base = 0  # buffer[0]对应的偏移
+    eof = False
+    while not eof:
+        size = block_size if limit is None else min(block_size, limit)
+        if record is None:
+            chunk = source.read(size) if size else b""
+        else:
+            started = clock()
+            chunk = source.read(size) if size else b""
+            record["read_s"] += clock() - started
+            record["bytes"] += len(chunk)
+        if limit is not None:
+            limit -= len(chunk)
+        eof = not chunk
+        buffer += chunk
+        keep_from = None
+        pos = 0
+        matches = iter_url_matches(buffer, engine=engine)
+        for match in matches if record is None else _timed_matches(matches, record):
+            if not eof and match.end() == len(buffer) and len(buffer) - match.start() <= carry_size:
+                # 命中一直延伸到缓冲区末尾，可能被块边界截断，留到下一块再判定
+                keep_from = match.start()
+                break
+            pos = match.end()
+            if record is None:
+                url = match.group().decode("ascii")
+            else:
+                started = clock()
+                url = match.group().decode("ascii")
+                record["decode_s"] += clock() - started
+            yield base + match.start(), url
+        if keep_from is None:
+            # 末尾可能残留半个URL（如 "htt"），保留有界尾部与下一块拼接
+            keep_from = max(pos, len(buffer) - carry_size)
+        buffer = buffer[keep_from:]
+        base += keep_from
+
+def iter_urls_mmap(file_path, engine=SCAN_ENGINE_LITERAL, record=None):
+    """内存映射扫描：字节正则直接跑在映射区上，仅解码命中的片段。
+    映射区按需缺页读入，统计里读盘耗时会计入匹配耗时，read_s只含建立映射"""
+    clock = time.perf_counter
+    started = clock()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            if record is None:
+                for match in iter_url_matches(mm, engine=engine):
+                    # 正则只接受ASCII字符，命中片段可直接按ASCII解码
+                    yield match.group().decode("ascii")
+                return
+            record["read_s"] += clock() - started
+            record["bytes"] += size
+            for match in _timed_matches(iter_url_matches(mm, engine=engine), record):
+                started = clock()
+                url = match.group().decode("ascii")
+                record["decode_s"] += clock() - started
+                yield url
+
+def iter_urls_range(file_path, start, end, carry_size=SCAN_CARRY_SIZE, engine=SCAN_ENGINE_LITERAL, record=None,
+                    scan_mode=SCAN_MODE_MMAP):
+    """扫描[start, end)字节区间：只产出起点落在区间内的URL，前后多扫carry_size保证跨区间URL完整；
+    stream模式只按块读取该区间，不映射整个文件"""
+    clock = time.perf_counter
+    started = clock()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = min(end, size)
+        if start >= end:
+            return
+        scan_from = max(0, start - carry_size)
+        scan_to = min(size, end + carry_size)
+        if scan_mode == SCAN_MODE_STREAM:
+            f.seek(scan_from)
+            for offset, url in iter_url_spans_stream(f, carry_size=carry_size, engine=engine, record=record,
+                                                     limit=scan_to - scan_from):
+                if scan_from + offset >= end:
+                    break
+                if scan_from + offset >= start:
+                    yield url
+            return
         try:
-            all_urls = set()
-            total_files = len(self.file_paths)
-            
-            for idx, file_path in enumerate(self.file_paths):
-                self.progress_signal.emit(
-                    f"⚡ 处理中 ({idx+1}/{total_files})：{os.path.basename(file_path)}",
-                    "#f59e0b"
-                )
-                block_size = 1024 * 1024
-                with open(file_path, "rb") as f:
-                    while chunk := f.read(block_size):
-                        content = chunk.decode("utf-8", errors="ignore")
-                        urls = URL_REGEX.findall(content)
-                        all_urls.update(urls)
-            
-            valid_urls = self._filter_valid_urls(list(all_urls))
-            self.result_signal.emit(valid_urls)
-            self.progress_signal.emit(
-                f"✅ 处理完成：共提取 {len(valid_urls)} 个有效链接",
-                "#16a34a"
-            )
-        except Exception as e:
-            self.error_signal.emit(str(e))
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            base = 0
+        except (OSError, ValueError):
+            f.seek(scan_from)
+            buffer = f.read(scan_to - scan_from)
+            base = scan_from
+        matches = iter_url_matches(buffer, scan_from - base, scan_to - base, engine)
+        if record is not None:
+            record["read_s"] += clock() - started
+            record["bytes"] += end - start
+            matches = _timed_matches(matches, record)
+        try:
+            for match in matches:
+                match_start = match.start() + base
+                if match_start >= end:
+                    break
+                if match_start >= start:
+                    if record is None:
+                        yield match.group().decode("ascii")
+                    else:
+                        started = clock()
+                        url = match.group().decode("ascii")
+                        record["decode_s"] += clock() - started
+                        yield url
+        finally:
+            # 先释放仍引用映射区的匹配迭代器和匹配对象，否则mmap无法关闭
+            matches = match = None
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+def scan_file_range(file_path, start, end, carry_size=SCAN_CARRY_SIZE, engine=SCAN_ENGINE_LITERAL, instrument=False,
+                    scan_mode=SCAN_MODE_MMAP):
+    """返回区间内URL集合；instrument为True时返回 (URL集合, 该区间的new_file_stats())"""
+    if not instrument:
+        return set(iter_urls_range(file_path, start, end, carry_size, engine, scan_mode=scan_mode))
+    record = new_file_stats()
+    return set(iter_urls_range(file_path, start, end, carry_size, engine, record, scan_mode)), record
+
+def plan_scan_tasks(file_ranges, split_size=PARALLEL_SPLIT_SIZE):
+    """把 (路径, 起点, 终点) 列表拆成扫描任务，大区间按字节切分，大任务排在前面便于均衡负载"""
+    tasks = []
+    for file_path, range_start, range_end in file_ranges:
+        for start in range(range_start, range_end, split_size):
+            tasks.append((file_path, start, min(start + split_size, range_end)))
+    tasks.sort(key=lambda task: task[2] - task[1], reverse=True)
+    return tasks
+
+def iter_parallel_scan(tasks, max_workers=None, engine=SCAN_ENGINE_LITERAL, instrument=False, control=None,
+                       scan_mode=SCAN_MODE_MMAP):
+    """把扫描任务分发到进程池（默认按CPU核数），按完成顺序产出 (任务, URL集合)，各区间按scan_mode读取；
+    instrument为True时URL集合换成 (URL集合, 分阶段统计)。
+    进程池里最多排两轮任务，暂停时不再提交、取消时丢弃未开始的，只需等正在跑的那几段结束"""
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    max_workers = max_workers or os.cpu_count()
+    pending = iter(tasks)
+    futures = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            while True:
+                if control is not None:
+                    control.checkpoint()
+                while len(futures) < max_workers * 2:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    future = pool.submit(scan_file_range, *task, engine=engine, instrument=instrument, scan_mode=scan_mode)
+                    futures[future] = task
+                if not futures:
+                    return
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield futures.pop(future), future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def is_valid_url(url):
+    # 常见形式直接按前缀判断，省掉每条一次的urlparse；主机含方括号（IPv6等）时仍交给urlparse严格校验
+    scheme, sep, rest = url.partition("://")
+    if sep and scheme.isalpha() and "[" not in url and "]" not in url:
+        return scheme.lower() in ("http", "https") and len(url) > 10 and rest[:1] not in ("", "/", "?", "#")
+    try:
+        parsed = urlparse(url)
+        return bool(parsed.netloc) and parsed.scheme in ["http", "https"] and len(url) > 10
+    except:
+        return False
+
+def filter_valid_urls(urls):
+    return [url for url in urls if is_valid_url(url)]
+
+def url_host(url):
+    return url.split('://', 1)[-1].split('/', 1)[0].split('?', 1)[0].split('#', 1)[0].lower()
+
+def url_path(url):
+    rest = url.split('#', 1)[0].split('?', 1)[0].split('://', 1)[-1]
+    return "/" + rest.split('/', 1)[1] if '/' in rest else "/"
+
+def url_ext(url):
+    """URL路径（去掉查询串和片段）的扩展名，小写，没有则为空串"""
+    # 用in先判断，只在需要时才切分
+    if '#' in url:
+        url = url.partition('#')[0]
+    if '?' in url:
+        url = url.partition('?')[0]
+    _, sep, path = url.partition('://')
+    _, slash, name = (path if sep else url).rpartition('/')
+    if not slash:
+        return ""
+    _, dot, ext = name.rpartition('.')
+    return ext.lower() if dot else ""
+
+def url_exts(urls):
+    """批量取扩展名，与逐条url_ext的结果相同；不带查询串和片段时整批按最后一个/和.在C层切分"""
+    joined = "".join(urls)
+    if '?' in joined or '#' in joined:
+        return [url_ext(url) for url in urls]
+    parts = list(map(str.rpartition, urls, repeat('/')))
+    exts = [ext if dot else "" for _, dot, ext in map(str.rpartition, map(itemgetter(2), parts), repeat('.'))]
+    # 最后一个/属于"://"（只有主机）或开头就是/、根本没有/的链接很少见，拼起来整体查一次，有才逐条交给url_ext
+    heads = "\n".join(map(itemgetter(0), parts)) + "\n"
+    if ":/\n" in heads or "\n\n" in heads or heads.startswith("\n"):
+        for i, (head, _, _) in enumerate(parts):
+            if not head or head.endswith(':/'):
+                exts[i] = url_ext(urls[i])
+    # 大小写只按不同的扩展名各转一次
+    lowered = {ext: ext.lower() for ext in set(exts)}
+    if any(ext != lower for ext, lower in lowered.items()):
+        exts = list(map(lowered.__getitem__, exts))
+    return exts
 
-    def _filter_valid_urls(self, urls):
-        valid_urls = []
+def ext_category(ext, content_type=None):
+    """按扩展名归类；已探测到Content-Type时以其为准"""
+    if content_type:
+        if content_type.startswith("image/"):
+            return "image"
+        if content_type.startswith("video/"):
+            return "video"
+        if content_type != "application/octet-stream":
+            return "other"
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in VIDEO_EXTS:
+        return "video"
+    return "other"
+
+def classify_url(url, content_type=None):
+    """按URL路径的扩展名归类，返回 (类别, 扩展名)；已探测到Content-Type时以其为准"""
+    ext = url_ext(url)
+    return ext_category(ext, content_type), ext
+
+def iter_file_urls(file_path, scan_mode=SCAN_MODE_MMAP, engine=SCAN_ENGINE_LITERAL, record=None):
+    """逐个产出文件中的URL（可能重复），无法映射时回退到流式扫描"""
+    if scan_mode == SCAN_MODE_MMAP:
+        urls = iter_urls_mmap(file_path, engine, record)
+        try:
+            first = next(urls, None)
+        except (OSError, ValueError):
+            # 部分文件（被占用/特殊文件系统）无法映射，回退到流式扫描
+            yield from iter_urls_stream(file_path, engine=engine, record=record)
+            return
+        if first is not None:
+            yield first
+            yield from urls
+        return
+    yield from iter_urls_stream(file_path, engine=engine, record=record)
+
+def scan_file(file_path, scan_mode=SCAN_MODE_MMAP, engine=SCAN_ENGINE_LITERAL):
+    return set(iter_file_urls(file_path, scan_mode, engine))
+
+class ResultBatcher:
+    """去重+校验后按数量和时间两个上限攒批交给回调，让界面边扫边出结果；
+    start()后由计时线程兜底，扫描卡在没有链接的长段时攒下的结果也按max_interval送出"""
+    def __init__(self, emit, max_count=RESULT_BATCH_SIZE, max_interval=RESULT_BATCH_INTERVAL, persist=None):
+        self.emit = emit
+        self.max_count = max_count
+        self.max_interval = max_interval
+        # emit(urls, sources)收到每批新链接及各自的来源文件；可选的persist(urls, sources)用于写结果库
+        # source由调用方在切换文件时设置
+        self.persist = persist
+        self.source = None
+        self.valid_urls = UrlStore()
+        self.invalid = set()
+        self.added = 0  # 收到的URL总数（含重复），用于算去重命中率
+        self._pending = []
+        self._pending_sources = []
+        # 计时线程已送出、还没写库的批次：结果库连接只能在扫描线程使用，写库留到扫描线程下次flush
+        self._unpersisted = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._timer = None
+
+    def _accept(self, url):
+        if url in self.invalid:
+            return False
+        if not is_valid_url(url):
+            self.invalid.add(url)
+            return False
+        return True
+
+    def add(self, url):
+        """返回URL在valid_urls中的行号，无效链接返回-1"""
+        self.added += 1
+        row, is_new = self.valid_urls.add(url, self._accept)
+        if is_new:
+            with self._lock:
+                self._pending.append(url)
+                self._pending_sources.append(self.source)
+                due = len(self._pending) >= self.max_count or time.monotonic() - self._last_flush >= self.max_interval
+            if due:
+                self.flush()
+        return row
+
+    def update(self, urls):
         for url in urls:
+            self.add(url)
+
+    def _emit_pending(self):
+        """送出已攒的一批（调用方持有_lock）；emit失败时保留待送队列，由扫描线程的flush重试并抛出"""
+        if self._pending:
+            self.emit(self._pending, self._pending_sources)
+            if self.persist is not None:
+                self._unpersisted.append((self._pending, self._pending_sources))
+            self._pending = []
+            self._pending_sources = []
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """送出已攒的结果并补写计时线程送出的批次，只在扫描线程调用"""
+        with self._lock:
+            self._emit_pending()
+            batches, self._unpersisted = self._unpersisted, []
+        for urls, sources in batches:
+            self.persist(urls, sources)
+
+    def _tick(self):
+        while not self._stopped.wait(self.max_interval / 2):
+            with self._lock:
+                if not self._pending or time.monotonic() - self._last_flush < self.max_interval:
+                    continue
+                try:
+                    self._emit_pending()
+                except Exception:
+                    return
+
+    def start(self):
+        """启动计时线程，已攒的结果最迟约max_interval后送出，不必等下一个新链接"""
+        if self._timer is None:
+            self._stopped.clear()
+            self._timer = threading.Thread(target=self._tick, name="ResultBatcher", daemon=True)
+            self._timer.start()
+
+    def stop(self):
+        if self._timer is not None:
+            self._stopped.set()
+            self._timer.join()
+            self._timer = None
+
+# ========== 紧凑链接存储（主机驻留 + 路径字节缓冲） ==========
+URL_PREFIX_REGEX = re.compile(r"[^/?#]*://[^/?#]*|[^/?#]*")  # 协议+主机前缀
+URL_PREFIX_SPLIT_REGEX = re.compile(r"\n([^/?#\n]*://[^/?#\n]*|[^/?#\n]*)")  # 按行切出前缀，用于整批拆分
+
+def split_url(url):
+    """切成 (协议+主机前缀, 其余部分)，如 "https://a.com" 与 "/bg.png?x=1"，两段拼接即原URL"""
+    end = URL_PREFIX_REGEX.match(url).end()
+    return url[:end], url[end:]
+
+class UrlStore:
+    """去重的URL表，行号即加入顺序。每个协议+主机只存一份字符串，其余部分按UTF-8顺序写入一块连续字节缓冲、
+    按偏移取用；去重用开放寻址哈希表（只存行号），百万级链接也不必为每条URL常驻一个str对象"""
+    def __init__(self, urls=()):
+        self.hosts = []                  # 主机号 → "https://a.com"
+        self._host_ids = {}
+        self._host_of = array("I")       # 行号 → 主机号
+        self._offsets = array("Q", [0])  # 第row行的其余部分为 _tail[_offsets[row]:_offsets[row+1]]
+        self._tail = bytearray()
+        self._hashes = array("I")        # 行号 → hash(url)的低32位（槽位只用到这些位），扩容重排时无需重建字符串
+        self._table = array("i", [-1]) * 1024
+        self._mask = len(self._table) - 1
+        for url in urls:
+            self.add(url)
+
+    def __len__(self):
+        return len(self._host_of)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        offsets = self._offsets
+        return self.hosts[self._host_of[row]] + self._tail[offsets[row]:offsets[row + 1]].decode("utf-8", "surrogatepass")
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def __contains__(self, url):
+        return self.index(url) >= 0
+
+    def index(self, url):
+        """URL的行号，不存在返回-1"""
+        h = hash(url) & 0xFFFFFFFF
+        table, hashes, mask = self._table, self._hashes, self._mask
+        slot = h & mask
+        row = table[slot]
+        while row >= 0:
+            if hashes[row] == h and self[row] == url:
+                return row
+            slot = (slot + 1) & mask
+            row = table[slot]
+        return -1
+
+    def add(self, url, accept=None):
+        """加入URL，返回 (行号, 是否新加入)；给了accept时新URL需先通过校验，不通过返回 (-1, False)"""
+        h = hash(url) & 0xFFFFFFFF
+        table, hashes, mask = self._table, self._hashes, self._mask
+        slot = h & mask
+        row = table[slot]
+        while row >= 0:
+            if hashes[row] == h and self[row] == url:
+                return row, False
+            slot = (slot + 1) & mask
+            row = table[slot]
+        if accept is not None and not accept(url):
+            return -1, False
+        end = URL_PREFIX_REGEX.match(url).end()
+        host = url[:end]
+        host_id = self._host_ids.get(host)
+        if host_id is None:
+            host_id = self._host_ids[host] = len(self.hosts)
+            self.hosts.append(host)
+        row = len(hashes)
+        self._host_of.append(host_id)
+        self._tail += url[end:].encode("utf-8", "surrogatepass")
+        self._offsets.append(len(self._tail))
+        hashes.append(h)
+        table[slot] = row
+        if row * 2 >= mask:
+            self._grow()
+        return row, True
+
+    def add_many(self, urls):
+        """批量加入，按首次出现的顺序返回其中新加入的URL，它们依次得到行号 len(self)、len(self)+1……
+        与逐条add等价，但逐条的Python循环里只做哈希表探测，主机拆分、编码和偏移都整批交给C层完成"""
+        base = len(self)
+        while (base + len(urls)) * 2 >= self._mask:
+            self._grow()
+        table, hashes, mask = self._table, self._hashes, self._mask
+        add_hash = hashes.append
+        new = []
+        add_new = new.append
+        row_count = base
+        for url in urls:
+            h = hash(url) & 0xFFFFFFFF
+            slot = h & mask
+            row = table[slot]
+            while row >= 0:
+                # 本批新加的行还没写入字节缓冲，直接与待写入的URL比较
+                if hashes[row] == h and (new[row - base] if row >= base else self[row]) == url:
+                    break
+                slot = (slot + 1) & mask
+                row = table[slot]
+            else:
+                table[slot] = row_count
+                row_count += 1
+                add_hash(h)
+                add_new(url)
+        if not new:
+            return new
+        lines = "\n" + "\n".join(new)
+        if lines.count("\n") == len(new):
+            parts = URL_PREFIX_SPLIT_REGEX.split(lines)
+            hosts, tails = parts[1::2], parts[2::2]
+        else:
+            # URL里带换行（不是扫描得到的链接）时逐条拆分
+            ends = [URL_PREFIX_REGEX.match(url).end() for url in new]
+            hosts = [url[:end] for url, end in zip(new, ends)]
+            tails = [url[end:] for url, end in zip(new, ends)]
+        for host in set(hosts).difference(self._host_ids):
+            self._host_ids[host] = len(self.hosts)
+            self.hosts.append(host)
+        self._host_of.extend(map(self._host_ids.__getitem__, hosts))
+        tail = "".join(tails)
+        # 纯ASCII时字符数即字节数，免去逐条编码
+        lengths = map(len, tails) if tail.isascii() else [len(t.encode("utf-8", "surrogatepass")) for t in tails]
+        self._tail += tail.encode("utf-8", "surrogatepass")
+        self._offsets.extend(islice(accumulate(lengths, initial=self._offsets[-1]), 1, None))
+        return new
+
+    def _grow(self):
+        # 装载率保持在1/2以下，线性探测的平均探测次数很小；一次扩到4倍，逐行重排的总次数约为翻倍扩容的一半
+        table = array("i", [-1]) * (len(self._table) * 4)
+        mask = len(table) - 1
+        for row, h in enumerate(self._hashes):
+            slot = h & mask
+            while table[slot] >= 0:
+                slot = (slot + 1) & mask
+            table[slot] = row
+        self._table, self._mask = table, mask
+
+    def host_of(self, row):
+        return self.hosts[self._host_of[row]]
+
+    @property
+    def nbytes(self):
+        """存储占用的近似字节数（不含主机字符串）"""
+        return sum(buf.itemsize * len(buf) for buf in (self._host_of, self._offsets, self._hashes, self._table)) + len(self._tail)
+
+class UrlView:
+    """UrlStore上按行号选取的只读视图，筛选/分页/导出都不复制URL"""
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.store[row] for row in self.rows[i]]
+        return self.store[self.rows[i]]
+
+    def __iter__(self):
+        store = self.store
+        for row in self.rows:
+            yield store[row]
+
+# ========== 链接搜索索引（三元组倒排） ==========
+class UrlSearchIndex:
+    """随结果到达增量建立的三元组倒排索引，支持子串、host:域名、path:/路径前缀 查询"""
+    def __init__(self, urls):
+        self.urls = urls  # 与all_matches共用同一个UrlStore，索引里只存行号
+        self.indexed = 0  # 已建索引的行数，之后到达的行由index_pending分批补上
+        self._postings = {}
+        self._hosts = {}
+        self._last_query = None
+        self._last_result = None
+
+    @property
+    def pending(self):
+        return len(self.urls) - self.indexed
+
+    def index_pending(self, limit=None):
+        """为尚未建索引的行补建索引，limit限制本次最多处理的行数，便于在界面空闲时分片执行"""
+        end = len(self.urls) if limit is None else min(len(self.urls), self.indexed + limit)
+        postings = self._postings
+        hosts = self._hosts
+        for row in range(self.indexed, end):
+            url = self.urls[row]
+            text = url.lower()
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(row)
+            host = url_host(url)
+            posting = hosts.get(host)
+            if posting is None:
+                posting = hosts[host] = array("I")
+            posting.append(row)
+        if end > self.indexed:
+            self.indexed = end
+            self._last_query = None
+
+    def _candidates(self, text):
+        """用最稀有的两个三元组求交得到候选行号，None表示无法用索引缩小范围"""
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        if len(postings) > 1 and candidates:
+            candidates.intersection_update(postings[1])
+        return candidates
+
+    def search(self, query):
+        """返回匹配的行号（升序）"""
+        self.index_pending()
+        query = query.strip().lower()
+        if not query:
+            return range(len(self.urls))
+        if query.startswith("host:"):
+            needle = query[5:]
+            rows = set()
+            for host, posting in self._hosts.items():
+                if needle in host:
+                    rows.update(posting)
+            return sorted(rows)
+        if query.startswith("path:"):
+            prefix = query[5:] or "/"
+            if not prefix.startswith("/"):
+                prefix = "/" + prefix
+            candidates = self._candidates(prefix)
+            rows = range(len(self.urls)) if candidates is None else candidates
+            return sorted(row for row in rows if url_path(self.urls[row]).lower().startswith(prefix))
+        # 输入是在上一次查询基础上继续追加时，只需在上次结果里复核
+        if self._last_query and self._last_query in query:
+            candidates = self._last_result
+        else:
+            candidates = self._candidates(query)
+            if candidates is None:
+                candidates = range(len(self.urls))
+        result = sorted(row for row in candidates if query in self.urls[row].lower())
+        self._last_query, self._last_result = query, result
+        return result
+
+# ========== 增量扫描索引 ==========
+def find_open_tail(file_path, offset):
+    """返回一直延伸到offset处的最后一个匹配 (起点, URL)，没有则返回None；只读末尾两个窗口。
+    这样的URL可能还没写完，增量扫描时先不算结果，下次从其起点重扫"""
+    window_start = max(0, offset - 2 * SCAN_CARRY_SIZE)
+    with open(file_path, "rb") as f:
+        f.seek(window_start)
+        window = f.read(offset - window_start)
+    last = None
+    for match in URL_REGEX_BYTES.finditer(window):
+        last = match
+    if last is None or last.end() != len(window):
+        return None
+    return window_start + last.start(), last.group().decode("ascii")
+
+def url_occurs_before(file_path, url, end):
+    """url是否在[0, end)内作为完整匹配出现过（不只是更长URL的前缀）"""
+    needle = url.encode("ascii")
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = mm.find(needle, 0, end)
+        while pos >= 0:
+            found = URL_REGEX_BYTES.match(mm, pos)
+            whole = found is not None and found.end() == pos + len(needle)
+            found = None  # 匹配对象引用着映射区，关闭前释放
+            if whole:
+                return True
+            pos = mm.find(needle, pos + 1, end)
+    return False
+
+class ScanIndex:
+    """按文件记录大小/mtime/内容指纹/已扫描偏移/已找到的URL，未变化的文件直接复用，追加的文件只扫新尾部。
+    文件末尾的URL可能还没写完，单独记为open（起点, URL），追加后从其起点重扫，不把半截URL当成已找到的结果"""
+    FINGERPRINT_HEAD = 64 * 1024
+    FINGERPRINT_TAIL = 4096
+
+    def __init__(self, path=SCAN_INDEX_PATH):
+        self.path = path
+        self.entries = self._load()
+        self._pending = {}
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except:
+            pass
+        return {}
+
+    def save(self):
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except:
+            pass
+
+    def _fingerprint(self, file_path, offset):
+        # 文件头 + 已扫描偏移前的一小段，足以识别被替换/截断的文件
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            digest.update(f.read(min(offset, self.FINGERPRINT_HEAD)))
+            tail_start = max(0, offset - self.FINGERPRINT_TAIL)
+            f.seek(tail_start)
+            digest.update(f.read(offset - tail_start))
+        return digest.hexdigest()
+
+    def plan(self, file_path):
+        """返回 (已缓存的URL列表, 需要扫描的起点, 文件大小)"""
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        self._pending[key] = stat
+        entry = self.entries.get(key)
+        if entry:
+            try:
+                offset = entry["offset"]
+                tail = entry["open"]
+                if stat.st_size >= offset and self._fingerprint(file_path, offset) == entry["fingerprint"]:
+                    if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime"]:
+                        return entry["urls"] + ([tail[1]] if tail and tail[1] else []), stat.st_size, stat.st_size
+                    if stat.st_size > offset:
+                        # 只扫追加部分：原末尾的URL从其起点重扫，否则往回多扫一个窗口接上半个"http"之类的残片
+                        return entry["urls"], tail[0] if tail else max(0, offset - SCAN_CARRY_SIZE), stat.st_size
+            except (KeyError, TypeError, IndexError, OSError):
+                pass
+        return [], 0, stat.st_size
+
+    def update(self, file_path, offset, urls):
+        key = os.path.abspath(file_path)
+        stat = self._pending.pop(key, None) or os.stat(file_path)
+        urls = set(urls)
+        tail = find_open_tail(file_path, offset) if offset else None
+        if tail is not None:
+            open_start, open_url = tail
+            if open_url not in urls or url_occurs_before(file_path, open_url, open_start):
+                # 末尾匹配无效，或在前文完整出现过（已在urls里）：只记重扫起点
+                open_url = None
+            else:
+                urls.discard(open_url)
+            tail = (open_start, open_url)
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "fingerprint": self._fingerprint(file_path, offset),
+            "offset": offset,
+            "urls": sorted(urls),
+            "open": list(tail) if tail else None,
+        }
+
+    def data_uris(self, file_path):
+        """plan判定未变化的文件上次记下的内嵌图片 [DataUri]，没有记录时返回None"""
+        entry = self.entries.get(os.path.abspath(file_path))
+        items = entry.get("data_uris") if entry else None
+        if items is None:
+            return None
+        try:
+            return [DataUri(digest, mime, file_path, offset, length) for digest, mime, offset, length in items]
+        except (TypeError, ValueError):
+            return None
+
+    def record_data_uris(self, file_path, items):
+        # 只补进已有条目；文件变化后update重建条目，旧记录随之作废
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is not None:
+            entry["data_uris"] = [[item.digest, item.mime, item.offset, item.length] for item in items]
+
+# ========== Chromium磁盘缓存（blockfile格式）解析 ==========
+CACHE_INDEX_MAGIC = 0xC103CAC3
+CACHE_BLOCK_MAGIC = 0xC104CAC3
+CACHE_INDEX_HEADER_SIZE = 368   # IndexHeader(256) + LruData(112)
+CACHE_INDEX_TABLE_LEN = 0x10000 # 头部table_len为0时的默认表长
+CACHE_BLOCK_HEADER_SIZE = 8192
+CACHE_BLOCK_SIZES = {1: 36, 2: 256, 3: 1024, 4: 4096, 5: 8, 6: 104, 7: 48}  # 按地址中的文件类型
+CACHE_ENTRY_STRUCT = struct.Struct("<IIIiiiQiI4i4II4iI")  # EntryStore中key之前的固定字段（96字节）
+WINDOWS_EPOCH_DELTA = 11644473600  # base::Time（1601年起的微秒数）与Unix时间戳的秒差
+
+# url：资源URL；key：缓存原始键；size：响应体大小；created/last_used：Unix时间戳（未知为None）
+# stream_sizes/stream_addrs：4个数据流（0为响应头，1为响应体）的大小与地址
+CacheEntry = namedtuple("CacheEntry", "url key size created last_used stream_sizes stream_addrs")
+
+def is_cache_index(file_path):
+    """判断文件是否为blockfile缓存的index文件"""
+    if os.path.basename(file_path) != "index":
+        return False
+    try:
+        with open(file_path, "rb") as f:
+            header = f.read(4)
+        return len(header) == 4 and struct.unpack("<I", header)[0] == CACHE_INDEX_MAGIC
+    except OSError:
+        return False
+
+def _cache_key_to_url(key):
+    # 新版Chromium的键带有隔离前缀，如 "1/0/_dk_https://a.com https://a.com https://a.com/bg.png"
+    for token in reversed(key.split()):
+        if token.lower().startswith(("http://", "https://")):
+            return token
+    return key
+
+def _cache_time(value):
+    return value / 1_000_000 - WINDOWS_EPOCH_DELTA if value else None
+
+class ChromiumCacheParser:
+    """直接遍历index哈希表和data_N块文件列出缓存条目，不做全量字节扫描"""
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._block_files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for mapped, handle in self._block_files.values():
+            mapped.close()
+            handle.close()
+        self._block_files.clear()
+
+    def _block_file(self, file_number):
+        if file_number not in self._block_files:
+            handle = open(os.path.join(self.cache_dir, f"data_{file_number}"), "rb")
             try:
-                parsed = urlparse(url)
-                if parsed.netloc and parsed.scheme in ["http", "https"] and len(url) > 10:
-                    valid_urls.append(url)
-            except:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                handle.close()
+                raise
+            if len(mapped) < CACHE_BLOCK_HEADER_SIZE or struct.unpack_from("<I", mapped)[0] != CACHE_BLOCK_MAGIC:
+                mapped.close()
+                handle.close()
+                raise ValueError(f"data_{file_number} 不是有效的缓存块文件")
+            self._block_files[file_number] = (mapped, handle)
+        return self._block_files[file_number][0]
+
+    def locate(self, addr):
+        """解析缓存地址，返回 (文件路径, 偏移, 可用长度)"""
+        file_type = (addr >> 28) & 0x7
+        if file_type == 0:
+            path = os.path.join(self.cache_dir, f"f_{addr & 0x0FFFFFFF:06x}")
+            return path, 0, os.path.getsize(path)
+        block_size = CACHE_BLOCK_SIZES[file_type]
+        num_blocks = ((addr >> 24) & 0x3) + 1
+        file_number = (addr >> 16) & 0xFF
+        start_block = addr & 0xFFFF
+        offset = CACHE_BLOCK_HEADER_SIZE + start_block * block_size
+        return os.path.join(self.cache_dir, f"data_{file_number}"), offset, num_blocks * block_size
+
+    def read_addr(self, addr, length):
+        if not addr & 0x80000000:
+            return b""
+        path, offset, capacity = self.locate(addr)
+        length = min(length, capacity)
+        if (addr >> 28) & 0x7 == 0:
+            with open(path, "rb") as f:
+                return f.read(length)
+        mapped = self._block_file((addr >> 16) & 0xFF)
+        return mapped[offset:offset + length]
+
+    def _parse_entry(self, addr):
+        raw = self.read_addr(addr, 4 * 256)
+        (_, next_addr, rankings_addr, _, _, _, creation_time, key_len, long_key,
+         s0, s1, s2, s3, a0, a1, a2, a3, _, _, _, _, _, _) = CACHE_ENTRY_STRUCT.unpack_from(raw)
+        if long_key:
+            key_bytes = self.read_addr(long_key, key_len)
+        else:
+            key_bytes = raw[CACHE_ENTRY_STRUCT.size:CACHE_ENTRY_STRUCT.size + key_len]
+        key = key_bytes.decode("utf-8", errors="replace")
+        last_used = None
+        if rankings_addr & 0x80000000:
+            last_used = _cache_time(struct.unpack_from("<Q", self.read_addr(rankings_addr, 8))[0])
+        entry = CacheEntry(
+            url=_cache_key_to_url(key),
+            key=key,
+            size=s1,
+            created=_cache_time(creation_time),
+            last_used=last_used,
+            stream_sizes=(s0, s1, s2, s3),
+            stream_addrs=(a0, a1, a2, a3),
+        )
+        return entry, next_addr
+
+    def iter_entries(self):
+        """遍历index哈希表及其冲突链，逐个产出CacheEntry；损坏的条目直接跳过"""
+        with open(os.path.join(self.cache_dir, "index"), "rb") as f:
+            data = f.read()
+        magic, _, num_entries = struct.unpack_from("<IIi", data)
+        if magic != CACHE_INDEX_MAGIC:
+            raise ValueError("index 不是有效的Chromium缓存索引")
+        table_len = struct.unpack_from("<i", data, 28)[0] or CACHE_INDEX_TABLE_LEN
+        table_len = min(table_len, (len(data) - CACHE_INDEX_HEADER_SIZE) // 4)
+        table = struct.unpack_from(f"<{table_len}I", data, CACHE_INDEX_HEADER_SIZE)
+        visited = set()
+        for addr in table:
+            # 冲突链长度不会超过条目总数，防止损坏的next指针造成死循环
+            for _ in range(max(num_entries, 1)):
+                if not addr & 0x80000000 or addr in visited:
+                    break
+                visited.add(addr)
+                try:
+                    entry, addr = self._parse_entry(addr)
+                except (struct.error, ValueError, KeyError, OSError):
+                    break
+                yield entry
+
+# ========== 缓存媒体离线导出 ==========
+# 常见媒体文件头 (特征字节, 偏移, 扩展名)，用于判定缓存体类型
+MEDIA_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", 0, "png"),
+    (b"\xff\xd8\xff", 0, "jpg"),
+    (b"GIF8", 0, "gif"),
+    (b"WEBP", 8, "webp"),
+    (b"\x1a\x45\xdf\xa3", 0, "webm"),
+    (b"ftyp", 4, "mp4"),
+)
+
+def sniff_media_ext(head):
+    for signature, offset, ext in MEDIA_SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return ext
+    return None
+
+def _copy_file_span(src_path, offset, length, dst_path):
+    """文件到文件零拷贝：优先copy_file_range，其次sendfile，平台不支持时回退到有界分块复制"""
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        copied = 0
+        try:
+            if hasattr(os, "copy_file_range"):
+                while copied < length:
+                    n = os.copy_file_range(src.fileno(), dst.fileno(), length - copied, offset + copied)
+                    if n == 0:
+                        break
+                    copied += n
+            elif hasattr(os, "sendfile"):
+                while copied < length:
+                    n = os.sendfile(dst.fileno(), src.fileno(), offset + copied, length - copied)
+                    if n == 0:
+                        break
+                    copied += n
+        except OSError:
+            # 跨文件系统或目标不支持（如macOS的sendfile只能写socket）
+            pass
+        if copied < length:
+            src.seek(offset + copied)
+            dst.seek(copied)
+            remaining = length - copied
+            while remaining > 0:
+                chunk = src.read(min(SCAN_BLOCK_SIZE, remaining))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+
+def _hash_media_span(src_path, offset, length):
+    """在映射区上直接计算内容哈希并识别文件头，返回 (扩展名或None, 哈希)"""
+    with open(src_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            span = view[offset:offset + length]
+            digest = hashlib.blake2b(span, digest_size=16).hexdigest()
+            ext = sniff_media_ext(bytes(span[:16]))
+            span.release()
+    return ext, digest
+
+def extract_cached_media(cache_dir, out_dir, urls=None, on_progress=None):
+    """把缓存中的图片/视频响应体按内容哈希命名写到out_dir，返回 [(url, 导出路径)]；urls为None时导出全部媒体"""
+    os.makedirs(out_dir, exist_ok=True)
+    wanted = set(urls) if urls is not None else None
+    results = []
+    with ChromiumCacheParser(cache_dir) as parser:
+        entries = [
+            entry for entry in parser.iter_entries()
+            if entry.size > 0 and entry.stream_addrs[1] & 0x80000000 and (wanted is None or entry.url in wanted)
+        ]
+        for idx, entry in enumerate(entries):
+            if on_progress:
+                on_progress(idx + 1, len(entries), entry.url)
+            try:
+                src_path, offset, capacity = parser.locate(entry.stream_addrs[1])
+                length = min(entry.size, capacity)
+                ext, digest = _hash_media_span(src_path, offset, length)
+            except (OSError, ValueError, KeyError):
                 continue
-        return valid_urls
+            if not ext:
+                category, ext = classify_url(entry.url)
+                if category == "other":
+                    continue
+            dst_path = os.path.join(out_dir, f"{digest}.{ext}")
+            if not os.path.exists(dst_path):
+                tmp_path = dst_path + ".part"
+                _copy_file_span(src_path, offset, length, tmp_path)
+                os.replace(tmp_path, dst_path)
+            results.append((entry.url, dst_path))
+    return results
 
-# ========== 主窗口类（仅修改托盘/关闭逻辑） ==========
-class MiHoYoMediaExtractor(QMainWindow):
-    def set_transparent_no_border(self, widget, color="#6b7280"):
-        widget.setStyleSheet(f"color: {color}; border: none; background-color: transparent; padding: 0px; margin: 0px;")
-    
-    def __init__(self):
-        super().__init__()
-        # True为打开托盘，False为关闭托盘
-        self.show_tray_icon = False
-        self.setWindowIcon(QIcon(ICON))
-        self.setWindowTitle(APP_TITLE)
-        self.setGeometry(100, 100, 1200, 800)
-        self.setWindowFlags(Qt.WindowType.Window | Qt.WindowType.WindowCloseButtonHint | Qt.WindowType.WindowMinimizeButtonHint)
-        self.setFixedSize(self.size())
-
-        # 全局变量
-        self.all_matches = []
-        self.filtered_matches = []
-        self.current_page = 1
-        self.file_paths = []
-        self.last_path = self._load_last_path()
-        self.process_thread = None
-        self.items_per_page = 8
-        self.tray_icon = None  # 托盘对象
-        
-        # 初始化UI + 绑定快捷键
-        self._init_ui()
-        self._bind_shortcuts()
-        self._calculate_items_per_page()
-        QTimer.singleShot(100, self._calculate_items_per_page)
-        
-        # ========== 新增：初始化系统托盘 ==========
-        self._init_tray()
-
-    def _load_last_path(self):
+# ========== 内嵌图片（data: URI） ==========
+# 网页/样式/脚本中以 data:image/...;base64, 内嵌的图片：扫描时只记位置和载荷哈希，预览或导出时才解码
+DATA_URI_PREFIX = b"data:image/"
+DATA_URI_HEADER = re.compile(rb"data:image/([A-Za-z0-9.+-]{1,40})(?:;[\w.=-]{1,40}){0,3}?;base64,")
+DATA_URI_PAYLOAD = re.compile(rb"[A-Za-z0-9+/]*={0,2}")
+DATA_URI_MIN_LENGTH = 32                # 更短的多为占位像素，不列出
+DATA_URI_MAX_LENGTH = 32 * 1024 * 1024  # 单个载荷上限，防止损坏数据把大段文件当成base64
+DATA_URI_DECODE_CHUNK = 256 * 1024      # 流式解码每块读取的字符数，须为4的倍数
+DATA_URI_EXTS = {"jpeg": "jpg", "svg+xml": "svg", "x-icon": "ico", "vnd.microsoft.icon": "ico"}
+
+# 载荷哈希、MIME子类型、所在文件、载荷（不含前缀）在文件中的偏移和长度
+DataUri = namedtuple("DataUri", "digest mime path offset length")
+
+def iter_data_uris(buffer, start=0, end=None, limit=None):
+    """在bytes/mmap上查找起点落在[start, end)内的内嵌图片，产出 (MIME子类型, 载荷偏移, 载荷长度)；
+    先按固定前缀find，命中处再锚定匹配，不复制数据；头部和载荷不越过limit（默认到buffer末尾）"""
+    if end is None:
+        end = len(buffer)
+    if limit is None:
+        limit = len(buffer)
+    pos = buffer.find(DATA_URI_PREFIX, start, end)
+    while pos >= 0:
+        next_pos = pos + len(DATA_URI_PREFIX)
+        header = DATA_URI_HEADER.match(buffer, pos, min(limit, pos + 256))
+        if header:
+            offset = header.end()
+            payload_end = DATA_URI_PAYLOAD.match(buffer, offset, min(limit, offset + DATA_URI_MAX_LENGTH)).end()
+            if payload_end - offset >= DATA_URI_MIN_LENGTH:
+                yield header.group(1).decode("ascii").lower(), offset, payload_end - offset
+            next_pos = max(next_pos, payload_end)
+        header = None
+        pos = buffer.find(DATA_URI_PREFIX, next_pos, end)
+
+def scan_data_uris(file_path, start=0, end=None, spans=None):
+    """映射文件查找内嵌图片，直接在映射区上对base64载荷计算哈希（不解码），返回 [DataUri]；
+    结尾的'='不计入哈希，省略填充的同一内容视为重复。
+    给出spans [(起点, 终点)]时只查这些区间（如缓存条目的响应体），载荷不越过所在区间"""
+    results = []
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return results
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            if spans is None:
+                found = iter_data_uris(mm, start, end)
+            else:
+                found = (item for span_start, span_end in spans
+                         for item in iter_data_uris(mm, span_start, span_end, min(span_end, len(mm))))
+            for mime, offset, length in found:
+                unpadded = length
+                while unpadded and mm[offset + unpadded - 1] == 0x3D:
+                    unpadded -= 1
+                span = view[offset:offset + unpadded]
+                digest = hashlib.blake2b(span, digest_size=16).hexdigest()
+                span.release()
+                results.append(DataUri(digest, mime, file_path, offset, length))
+    return results
+
+def data_uri_ext(mime):
+    return DATA_URI_EXTS.get(mime, mime.split("+", 1)[0])
+
+def data_uri_key(item):
+    """内嵌图片在结果列表中的行键：只含类型和哈希，不携带载荷"""
+    return f"data:image/{item.mime};blake2b={item.digest}"
+
+def iter_decode_data_uri(item, chunk_size=DATA_URI_DECODE_CHUNK):
+    """流式base64解码：每次从文件读取4的倍数个字符解码一块，内存只占一块；省略的结尾'='在最后一块补齐"""
+    import binascii
+    with open(item.path, "rb") as f:
+        f.seek(item.offset)
+        remaining = item.length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                raise ValueError("内嵌图片所在文件已变化，请重新扫描")
+            remaining -= len(chunk)
+            if not remaining and len(chunk) % 4:
+                chunk += b"=" * (-len(chunk) % 4)
+            yield binascii.a2b_base64(chunk)
+
+def decode_data_uri(item, max_bytes=None):
+    """解码为bytes（用于预览）；解码后会超过max_bytes时返回None"""
+    if max_bytes is not None and item.length // 4 * 3 > max_bytes:
+        return None
+    return b"".join(iter_decode_data_uri(item))
+
+def save_data_uri(item, out_dir):
+    """边解码边写到out_dir，按载荷哈希命名，已存在则跳过；返回导出路径"""
+    os.makedirs(out_dir, exist_ok=True)
+    dst_path = os.path.join(out_dir, f"{item.digest}.{data_uri_ext(item.mime)}")
+    if not os.path.exists(dst_path):
+        tmp_path = dst_path + ".part"
         try:
-            if os.path.exists(CONFIG_PATH):
-                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                    return config.get("last_path", "")
+            with open(tmp_path, "wb") as dst:
+                for block in iter_decode_data_uri(item):
+                    dst.write(block)
+            os.replace(tmp_path, dst_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    return dst_path
+
+def cache_data_uri_spans(index_path):
+    """缓存条目响应体所在的 {块文件或独立文件: [(起点, 终点)]}，供查找内嵌图片；
+    按URL扩展名或文件头判定为图片/视频的响应体本身就是媒体，不会内嵌data URI，直接跳过"""
+    spans = {}
+    with ChromiumCacheParser(os.path.dirname(index_path)) as parser:
+        for entry in parser.iter_entries():
+            addr = entry.stream_addrs[1]
+            if entry.size <= 0 or not addr & 0x80000000 or classify_url(entry.url)[0] != "other":
+                continue
+            try:
+                if sniff_media_ext(parser.read_addr(addr, 16)):
+                    continue
+                path, offset, capacity = parser.locate(addr)
+            except (OSError, ValueError, KeyError):
+                continue
+            spans.setdefault(path, []).append((offset, offset + min(entry.size, capacity)))
+    return {path: sorted(spans[path]) for path in sorted(spans)}
+
+# ========== 缓存目录实时监视 ==========
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+class _Inotify:
+    """通过ctypes调用Linux inotify，无第三方依赖"""
+    def __init__(self, dirs):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.watches = {}
+        self.overflowed = False
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        for path in dirs:
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+            if wd < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f"无法监视目录：{path}")
+            self.watches[wd] = path
+
+    def read_paths(self, timeout):
+        """等待最多timeout秒，返回本轮有写入的文件路径集合"""
+        paths = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return paths
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return paths
+        pos = 0
+        while pos + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, name_len = INOTIFY_EVENT.unpack_from(data, pos)
+            name = data[pos + INOTIFY_EVENT.size:pos + INOTIFY_EVENT.size + name_len].rstrip(b"\0")
+            pos += INOTIFY_EVENT.size + name_len
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+            elif wd in self.watches and name:
+                paths.add(os.path.join(self.watches[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class CacheDirWatcher:
+    """监视缓存目录：Linux用inotify，其他平台轮询文件大小；只扫描新文件和追加的尾部"""
+    def __init__(self, dirs, debounce=0.5, poll_interval=1.0):
+        self.dirs = [path for path in dirs if os.path.isdir(path)]
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        # 启动时记下现有文件大小，之后只关注新写入的内容
+        self.offsets = self._snapshot()
+        self._last_sizes = dict(self.offsets)
+        self._open = {}  # 路径 → 末尾没写完的URL的起点，下次从这里重扫
+        self.seen = set()
+
+    def _snapshot(self):
+        sizes = {}
+        for path in self.dirs:
+            try:
+                with os.scandir(path) as it:
+                    for item in it:
+                        if item.is_file():
+                            sizes[item.path] = item.stat().st_size
+            except OSError:
+                continue
+        return sizes
+
+    def _scan_changes(self, paths):
+        urls = set()
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            start = self.offsets.get(path, 0)
+            if size < start:
+                # 文件被截断/替换，整体重扫这一个文件
+                start = 0
+                self._open.pop(path, None)
+            if size == start:
+                continue
+            # 上次末尾的URL从其起点重扫，否则往回多扫一个窗口接上半个"http"之类的残片
+            scan_from = self._open.pop(path, None)
+            if scan_from is None:
+                scan_from = max(0, start - SCAN_CARRY_SIZE)
+            found = scan_file_range(path, scan_from, size)
+            # 与ScanIndex相同：一直延伸到文件末尾的URL可能还在写，先不算结果，下次从其起点重扫
+            tail = find_open_tail(path, size)
+            if tail is not None:
+                open_start, open_url = tail
+                self._open[path] = open_start
+                if not url_occurs_before(path, open_url, open_start):
+                    found.discard(open_url)
+            urls |= found
+            self.offsets[path] = size
+        return urls
+
+    def _collect_inotify(self, inotify, stop_event):
+        changed = inotify.read_paths(self.poll_interval)
+        if changed:
+            # 去抖：首个事件后继续收集，直到安静debounce秒（最长等待4倍debounce）
+            deadline = time.monotonic() + self.debounce * 4
+            while time.monotonic() < deadline and not stop_event.is_set():
+                more = inotify.read_paths(self.debounce)
+                if not more:
+                    break
+                changed |= more
+        if inotify.overflowed:
+            # 事件队列溢出，退化为比较一次文件大小
+            inotify.overflowed = False
+            changed |= set(self._snapshot())
+        return changed
+
+    def _collect_polling(self, stop_event):
+        stop_event.wait(self.poll_interval)
+        sizes = self._snapshot()
+        # 大小与上次轮询相同才视为写入已结束，相当于一个轮询周期的去抖
+        changed = {
+            path for path, size in sizes.items()
+            if size != self.offsets.get(path) and size == self._last_sizes.get(path)
+        }
+        self._last_sizes = sizes
+        return changed
+
+    def iter_batches(self, stop_event):
+        """阻塞产出每批新发现的有效URL列表，stop_event置位后退出"""
+        inotify = None
+        if platform.system() == "Linux":
+            try:
+                inotify = _Inotify(self.dirs)
+            except (OSError, AttributeError):
+                inotify = None
+        try:
+            while not stop_event.is_set():
+                if inotify:
+                    changed = self._collect_inotify(inotify, stop_event)
+                else:
+                    changed = self._collect_polling(stop_event)
+                if changed:
+                    urls = [url for url in filter_valid_urls(self._scan_changes(changed)) if url not in self.seen]
+                    if urls:
+                        self.seen.update(urls)
+                        yield urls
+        finally:
+            if inotify:
+                inotify.close()
+
+# ========== 媒体下载（连接复用/断点续传） ==========
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_TIMEOUT = 30
+DOWNLOAD_MAX_REDIRECTS = 5
+DOWNLOAD_MANIFEST = ".mihoyo_download_manifest.json"  # 下载目录内记录 URL→ETag/大小/文件名
+DOWNLOAD_MANIFEST_SAVE_EVERY = 50        # 清单攒够这么多条改动就落盘一次
+DOWNLOAD_MANIFEST_SAVE_INTERVAL = 2.0    # 或距上次落盘超过这么多秒；下载结束时总会再存一次
+
+class HttpConnectionPool:
+    """按 (协议, 主机, 端口) 复用keep-alive连接，线程安全"""
+    def __init__(self, timeout=DOWNLOAD_TIMEOUT, max_idle_per_host=DOWNLOAD_WORKERS):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, key):
+        import http.client
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def request(self, method, url, headers=None):
+        """发送请求，返回 (响应, 连接键, 连接)；读完响应后需调用release归还连接"""
+        import http.client
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"不支持的链接：{url}")
+        key = (scheme, parsed.hostname, parsed.port or (443 if scheme == "https" else 80))
+        target = parsed.path or "/"
+        if parsed.query:
+            target += "?" + parsed.query
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        reused = conn is not None
+        if conn is None:
+            conn = self._new_connection(key)
+        try:
+            conn.request(method, target, headers=headers or {})
+            return conn.getresponse(), key, conn
+        except (http.client.RemoteDisconnected, ConnectionError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+        except BaseException:
+            # 超时等其他错误：连接状态未知，关闭后交给调用方
+            conn.close()
+            raise
+        # 复用的空闲连接可能已被服务端关闭，换新连接重试一次
+        conn = self._new_connection(key)
+        try:
+            conn.request(method, target, headers=headers or {})
+            return conn.getresponse(), key, conn
+        except BaseException:
+            conn.close()
+            raise
+
+    def open(self, method, url, headers=None, max_redirects=DOWNLOAD_MAX_REDIRECTS):
+        """同request，但会跟随重定向，返回最终响应"""
+        for _ in range(max_redirects + 1):
+            response, key, conn = self.request(method, url, headers)
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                response.read()
+                self.release(key, conn, not response.will_close)
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            return response, key, conn
+        raise ValueError("重定向次数过多")
+
+    def release(self, key, conn, reusable=True):
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+def download_file_name(url):
+    """本地文件名：URL路径最后一段（替换掉文件名非法字符），为空时用URL哈希"""
+    name = re.sub(r'[\\/:*?"<>|]', "_", url_path(url).rsplit("/", 1)[-1])
+    return name or hashlib.blake2b(url.encode("utf-8"), digest_size=4).hexdigest()
+
+class MediaDownloader:
+    """有界线程池并发下载：同主机复用连接，.part文件用Range续传，按ETag/大小跳过已下载文件"""
+    def __init__(self, out_dir, workers=DOWNLOAD_WORKERS, pool=None):
+        self.out_dir = out_dir
+        self.workers = workers
+        self.pool = pool or HttpConnectionPool(max_idle_per_host=workers)
+        self.stop_event = threading.Event()
+        self.manifest_path = os.path.join(out_dir, DOWNLOAD_MANIFEST)
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+        # 序列化、写临时文件、替换整个过程持有，多个下载线程不会争用同一个.tmp
+        self._save_lock = threading.Lock()
+        self._dirty = 0
+        self._last_save = time.monotonic()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
         except:
-            return ""
+            return {}
+
+    def _save_manifest(self):
+        with self._save_lock:
+            with self._lock:
+                data = dict(self.manifest)
+                self._dirty = 0
+                self._last_save = time.monotonic()
+            try:
+                tmp_path = self.manifest_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.manifest_path)
+            except OSError:
+                pass
+
+    def _update_manifest(self, url, record):
+        """记录一条清单改动，按条数/间隔成批落盘，避免每个文件都整份重写清单"""
+        with self._lock:
+            self.manifest[url] = record
+            self._dirty += 1
+            due = (self._dirty >= DOWNLOAD_MANIFEST_SAVE_EVERY
+                   or time.monotonic() - self._last_save >= DOWNLOAD_MANIFEST_SAVE_INTERVAL)
+        if due:
+            self._save_manifest()
+
+    def _target_names(self, urls):
+        """URL到本地文件名：优先沿用清单记录，其次取路径末段，重名时加URL哈希前缀"""
+        names = {}
+        used = {record["name"] for record in self.manifest.values() if "name" in record}
+        for url in urls:
+            record = self.manifest.get(url)
+            if record and "name" in record:
+                names[url] = record["name"]
+                continue
+            digest = hashlib.blake2b(url.encode("utf-8"), digest_size=4).hexdigest()
+            name = download_file_name(url)
+            if name in used:
+                name = f"{digest}_{name}"
+            used.add(name)
+            names[url] = name
+        return names
+
+    @staticmethod
+    def _range_validator(record):
+        """续传用的If-Range校验值：强ETag优先，其次Last-Modified；弱ETag不能用于If-Range"""
+        etag = record.get("etag")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return record.get("last_modified")
+
+    def _restart(self, url, name, part_path):
+        # .part与服务器上的版本对不上，丢弃后从头下载（此时已无.part，不会再走续传分支）
+        os.remove(part_path)
+        return self.download_one(url, name)
+
+    def download_one(self, url, name):
+        """下载单个链接，返回状态：downloaded / resumed / skipped"""
+        path = os.path.join(self.out_dir, name)
+        part_path = path + ".part"
+        record = self.manifest.get(url, {})
+        headers = {"Connection": "keep-alive", "Accept-Encoding": "identity"}
+        exists = os.path.exists(path)
+        if exists and record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        elif exists and record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        offset = 0 if exists else (os.path.getsize(part_path) if os.path.exists(part_path) else 0)
+        # 没有校验值就无法确认.part与服务器当前版本一致，不续传，避免拼接出两个版本的文件
+        validator = self._range_validator(record) if offset else None
+        if validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        else:
+            offset = 0
 
-    def _save_last_path(self, path):
+        response, key, conn = self.pool.open("GET", url, headers)
+        reusable = not response.will_close
         try:
-            config = {"last_path": path}
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(config, f, ensure_ascii=False)
+            etag = response.getheader("ETag")
+            last_modified = response.getheader("Last-Modified")
+            length = response.getheader("Content-Length")
+            content_range = response.getheader("Content-Range") or ""
+            if response.status == 304:
+                response.read()
+                return "skipped"
+            if response.status == 416 and offset:
+                response.read()
+                # 只有服务器给出的总长正好等于.part大小时，.part才是完整文件
+                total = content_range.rpartition("/")[2]
+                if total.isdigit() and int(total) == offset:
+                    os.replace(part_path, path)
+                    status = "resumed"
+                else:
+                    return self._restart(url, name, part_path)
+            elif response.status == 206 and not (offset and content_range.startswith(f"bytes {offset}-")):
+                # 返回的区间不是从.part末尾开始，不能追加
+                reusable = False
+                return self._restart(url, name, part_path)
+            elif response.status not in (200, 206):
+                response.read()
+                raise ValueError(f"HTTP {response.status}")
+            elif response.status == 200 and exists and length is not None and int(length) == os.path.getsize(path):
+                # 服务器没有ETag时按大小判断，不读响应体，连接不再复用
+                reusable = False
+                status = "skipped"
+            else:
+                resumed = response.status == 206
+                if not resumed:
+                    # 新建.part时先把校验值记进清单，中断后下次续传才能带If-Range（download_all结束时必定落盘）
+                    self._update_manifest(url, {"name": name, "etag": etag, "last_modified": last_modified})
+                received = 0
+                with open(part_path, "ab" if resumed else "wb") as f:
+                    while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                        if self.stop_event.is_set():
+                            reusable = False
+                            raise InterruptedError("下载已取消")
+                        f.write(chunk)
+                        received += len(chunk)
+                if length is not None and received != int(length):
+                    # 连接中途断开时read返回空而不报错；保留.part，下次续传
+                    raise ConnectionError(f"连接中断：收到 {received}/{length} 字节")
+                os.replace(part_path, path)
+                status = "resumed" if resumed else "downloaded"
+            self._update_manifest(url, {
+                "name": name, "etag": etag or record.get("etag"),
+                "last_modified": last_modified or record.get("last_modified"), "size": os.path.getsize(path),
+            })
+            return status
+        except BaseException:
+            reusable = False
+            raise
+        finally:
+            self.pool.release(key, conn, reusable)
+
+    def download_all(self, urls, on_progress=None):
+        """并发下载全部链接，返回 [(url, 本地路径, 状态)]，失败的状态为 "failed: 原因" """
+        os.makedirs(self.out_dir, exist_ok=True)
+        names = self._target_names(urls)
+        results = []
+        try:
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self.download_one, url, names[url]): url for url in urls}
+                for done, future in enumerate(as_completed(futures), 1):
+                    url = futures[future]
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        status = f"failed: {e}"
+                    results.append((url, os.path.join(self.out_dir, names[url]), status))
+                    if on_progress:
+                        on_progress(done, len(futures), url, status)
+                    if self.stop_event.is_set():
+                        for pending in futures:
+                            pending.cancel()
+        finally:
+            self.pool.close_all()
+            self._save_manifest()
+        return results
+
+# ========== 链接元数据探测（HEAD/范围GET + 磁盘缓存） ==========
+METADATA_TTL = 7 * 24 * 3600  # 元数据缓存有效期（秒）
+PROBE_WORKERS = 16
+PROBE_PER_HOST = 4            # 同一主机的并发探测上限
+
+class MetadataCache:
+    """URL → {type, size, modified, checked} 的磁盘缓存，超过TTL的条目在读写时淘汰"""
+    def __init__(self, path=METADATA_CACHE_PATH, ttl=METADATA_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
         except:
+            self.entries = {}
+        self._evict()
+
+    def _evict(self):
+        deadline = time.time() - self.ttl
+        self.entries = {url: meta for url, meta in self.entries.items() if meta.get("checked", 0) >= deadline}
+
+    def get(self, url):
+        meta = self.entries.get(url)
+        if meta and meta.get("checked", 0) >= time.time() - self.ttl:
+            return meta
+        return None
+
+    def put(self, url, meta):
+        self.entries[url] = meta
+
+    def save(self):
+        self._evict()
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
             pass
 
-    def _calculate_items_per_page(self):
-        if not hasattr(self, 'result_tree') or self.result_tree.viewport().height() < 40:
-            self.items_per_page = 2
-            return
-        tree_viewport_height = self.result_tree.viewport().height()
-        header_real_height = self.result_tree.header().height()
-        single_row_height = 14
-        safe_margin = 2
-        calc_count = int((tree_viewport_height - header_real_height - safe_margin) / single_row_height)
-        self.items_per_page = max(1, min(calc_count, 60))
-        if self.filtered_matches and len(self.filtered_matches) > 0:
-            self._apply_filters(keep_page=True)
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-        self.result_tree.updateGeometry()
-        QApplication.processEvents()
-        self._calculate_items_per_page()
-
-    def _get_total_pages(self):
-        if not self.filtered_matches:
-            return 1
-        total = len(self.filtered_matches)
-        total_pages = total // self.items_per_page
-        if total % self.items_per_page != 0:
-            total_pages += 1
-        return max(1, total_pages)
-
-    # ========== 新增：初始化系统托盘 ==========
-    def _init_tray(self):
-        # 创建托盘图标（可替换为自定义图标，这里用默认样式）
-        self.tray_icon = QSystemTrayIcon(self)
-        # 兼容不同平台的图标（如果没有自定义图标，用QT默认）
-        # self.tray_icon.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
-        self.tray_icon.setIcon(QIcon(ICON))
-        
-        # 创建托盘菜单
-        tray_menu = QMenu(self)
-        
-        # 显示窗口动作
-        show_action = QAction("显示窗口", self)
-        show_action.triggered.connect(self.show_normal)
-        tray_menu.addAction(show_action)
-        
-        # 退出程序动作
-        exit_action = QAction("退出程序", self)
-        exit_action.triggered.connect(self._exit_app_completely)
-        tray_menu.addAction(exit_action)
-        
-        # 绑定托盘菜单
-        self.tray_icon.setContextMenu(tray_menu)
-        
-        # 托盘点击事件（左键显示窗口）
-        self.tray_icon.activated.connect(self._on_tray_click)
-        
-        # 托盘控制（如果要禁用托盘，注释这一行即可）
-        if self.show_tray_icon:
-            self.tray_icon.show()
+def probe_url(pool, url):
+    """HEAD取元数据，服务器不支持HEAD或缺少长度时退回 Range: bytes=0-0 的GET"""
+    response, key, conn = pool.open("HEAD", url, {"Connection": "keep-alive"})
+    response.read()
+    pool.release(key, conn, not response.will_close)
+    content_type = response.getheader("Content-Type")
+    length = response.getheader("Content-Length")
+    modified = response.getheader("Last-Modified")
+    status = response.status
+    if status != 200 or length is None:
+        response, key, conn = pool.open("GET", url, {"Connection": "keep-alive", "Range": "bytes=0-0"})
+        status = response.status
+        content_type = response.getheader("Content-Type") or content_type
+        modified = response.getheader("Last-Modified") or modified
+        content_range = response.getheader("Content-Range") or ""
+        if status == 206 and "/" in content_range:
+            response.read()
+            pool.release(key, conn, not response.will_close)
+            length = content_range.rsplit("/", 1)[1]
         else:
-            self.tray_icon.hide()
-
-    # ========== 新增：托盘点击事件 ==========
-    def _on_tray_click(self, reason):
-        # 左键点击托盘显示窗口
-        if reason == QSystemTrayIcon.ActivationReason.Trigger:
-            self.show_normal()
-
-    # ========== 新增：完全退出程序（托盘触发） ==========
-    def _exit_app_completely(self):
-        # 停止正在运行的后台线程
-        if self.process_thread and self.process_thread.isRunning():
-            self.process_thread.terminate()
-            self.process_thread.wait()
-        
-        # 隐藏托盘
-        if self.tray_icon:
-            self.tray_icon.hide()
-        
-        # 关闭窗口并退出进程
-        self.close()
-        QCoreApplication.quit()
-        sys.exit(0)
-
-    # ========== 重写：关闭窗口事件 ==========
-    def closeEvent(self, event):
-        # 判断是否启用了托盘
-        if self.tray_icon and self.tray_icon.isVisible():
-            # 有托盘：隐藏窗口，不退出进程
-            self.hide()
-            event.ignore()  # 忽略默认的关闭行为
-        else:
-            # 无托盘：直接完全退出
-            self._exit_app_completely()
-            event.accept()
-
-    # ========== 辅助：恢复窗口显示 ==========
-    def show_normal(self):
-        self.show()
-        self.setWindowState(Qt.WindowState.WindowNoState)  # 恢复正常窗口状态
-
-    # ========== 初始化UI（原有代码，无修改） ==========
-    def _init_ui(self):
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        main_layout = QVBoxLayout(central_widget)
-        main_layout.setContentsMargins(20, 20, 20, 20)
-        main_layout.setSpacing(15)
-
-        title_label = QLabel(APP_TITLE)
-        title_font = QFont()
-        title_font.setPointSize(16)
-        title_font.setBold(True)
-        title_label.setFont(title_font)
-        title_label.setStyleSheet("color: #2563eb;")
-        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        sub_title = QLabel("拖拽/批量选择文件，自动提取媒体链接 | 支持跨平台/批量处理/链接导出")
-        sub_font = QFont()
-        sub_font.setPointSize(10)
-        sub_title.setFont(sub_font)
-        sub_title.setStyleSheet("color: #6b7280;")
-        
-        title_layout = QVBoxLayout()
-        title_layout.addWidget(title_label)
-        title_layout.addWidget(sub_title)
-        main_layout.addLayout(title_layout)
-
-        path_frame = QFrame()
-        self.set_transparent_no_border(path_frame)
-        path_layout = QVBoxLayout(path_frame)
-        path_layout.setContentsMargins(15, 10, 15, 10)
-        
-        cn_layout = QHBoxLayout()
-        cn_label = QLabel("国 服 路 径：")
-        cn_label.setFont(sub_font)
-        self.set_transparent_no_border(cn_label)
-        cn_entry = QLineEdit(DEFAULT_PATHS["国服"])
-        cn_entry.setFont(QFont("Consolas" if platform.system() == "Windows" else "Monaco", 9))
-        cn_entry.setReadOnly(True)
-        cn_copy_btn = QPushButton("复制")
-        cn_copy_btn.clicked.connect(lambda: self._copy_text(cn_entry.text()))
-        cn_layout.addWidget(cn_label)
-        cn_layout.addWidget(cn_entry)
-        cn_layout.addWidget(cn_copy_btn)
-        path_layout.addLayout(cn_layout)
-
-        global_layout = QHBoxLayout()
-        global_label = QLabel("国际服路径：")
-        global_label.setFont(sub_font)
-        self.set_transparent_no_border(global_label)
-        global_entry = QLineEdit(DEFAULT_PATHS["国际服"])
-        global_entry.setFont(QFont("Consolas" if platform.system() == "Windows" else "Monaco", 9))
-        global_entry.setReadOnly(True)
-        global_copy_btn = QPushButton("复制")
-        global_copy_btn.clicked.connect(lambda: self._copy_text(global_entry.text()))
-        global_layout.addWidget(global_label)
-        global_layout.addWidget(global_entry)
-        global_layout.addWidget(global_copy_btn)
-        path_layout.addLayout(global_layout)
-        
-        main_layout.addWidget(path_frame)
-
-        self.drag_frame = QFrame()
-        self.set_transparent_no_border(self.drag_frame)
-        drag_layout = QVBoxLayout(self.drag_frame)
-        drag_layout.setContentsMargins(20, 15, 20, 15)
-        
-        drag_label = QLabel("🖱️ 拖拽文件到此处（支持多文件） | 或点击按钮选择")
-        drag_label.setFont(sub_font)
-        self.set_transparent_no_border(drag_label, "#3b82f6")
-        drag_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        drag_layout.addWidget(drag_label)
-
-        btn_layout = QHBoxLayout()
-        single_btn = QPushButton("选择单个文件")
-        single_btn.setStyleSheet("background-color: #3b82f6; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
-        single_btn.clicked.connect(lambda: self._select_files(multi=False))
-        
-        multi_btn = QPushButton("选择多个文件")
-        multi_btn.setStyleSheet("background-color: #10b981; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
-        multi_btn.clicked.connect(lambda: self._select_files(multi=True))
-        
-        clear_btn = QPushButton("清空结果")
-        clear_btn.setStyleSheet("background-color: #ef4444; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
-        clear_btn.clicked.connect(self._clear_results)
-        
-        btn_layout.addWidget(single_btn)
-        btn_layout.addWidget(multi_btn)
-        btn_layout.addWidget(clear_btn)
-        btn_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        drag_layout.addLayout(btn_layout)
-
-        self.file_status_label = QLabel(f"✅ 等待选择/拖拽文件 | 上次路径：{os.path.basename(self.last_path) if self.last_path else '无'}")
-        self.file_status_label.setFont(sub_font)
-        self.set_transparent_no_border(self.file_status_label)
-        self.file_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        drag_layout.addWidget(self.file_status_label)
-
-        self.drag_frame.setAcceptDrops(True)
-        self.drag_frame.dragEnterEvent = self._on_drag_enter
-        self.drag_frame.dragLeaveEvent = self._on_drag_leave
-        self.drag_frame.dropEvent = self._on_drag_drop
-        
-        main_layout.addWidget(self.drag_frame)
-
-        filter_frame = QFrame()
-        self.set_transparent_no_border(filter_frame)
-        filter_layout = QHBoxLayout(filter_frame)
-        filter_layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.img_check = QCheckBox("图片 (jpg/png/webp等)")
-        self.img_check.setFont(sub_font)
-        self.img_check.setChecked(True)
-        self.img_check.stateChanged.connect(self._apply_filters)
-        
-        self.video_check = QCheckBox("视频 (webm/mp4等)")
-        self.video_check.setFont(sub_font)
-        self.video_check.setChecked(True)
-        self.video_check.stateChanged.connect(self._apply_filters)
-        
-        self.other_check = QCheckBox("其他 (json/config等)")
-        self.other_check.setFont(sub_font)
-        self.other_check.setChecked(False)
-        self.other_check.stateChanged.connect(self._apply_filters)
-        
-        export_btn = QPushButton("导出当前链接")
-        export_btn.setStyleSheet("background-color: #8b5cf6; color: white; padding: 6px 12px; border: none; border-radius: 4px;")
-        export_btn.clicked.connect(self._export_links)
-        
-        filter_layout.addWidget(self.img_check)
-        filter_layout.addWidget(self.video_check)
-        filter_layout.addWidget(self.other_check)
-        filter_layout.addStretch()
-        filter_layout.addWidget(export_btn)
-        main_layout.addWidget(filter_frame)
-
-        pagination_frame = QFrame()
-        self.set_transparent_no_border(pagination_frame)
-        pagination_layout = QHBoxLayout(pagination_frame)
-        
-        self.page_info_label = QLabel("第 1 / 1 页 | 共 0 个链接")
-        self.page_info_label.setFont(sub_font)
-        self.set_transparent_no_border(self.page_info_label)
-        pagination_layout.addWidget(self.page_info_label)
-        
-        prev_btn = QPushButton("上一页")
-        prev_btn.setFont(QFont("Segoe UI", 9))
-        prev_btn.setFixedWidth(60)
-        prev_btn.clicked.connect(lambda: self._goto_page(self.current_page - 1))
-        pagination_layout.addWidget(prev_btn)
-        
-        self.page_edit = QLineEdit("1")
-        self.page_edit.setFont(QFont("Segoe UI", 9))
-        self.page_edit.setFixedWidth(40)
-        pagination_layout.addWidget(self.page_edit)
-        
-        jump_btn = QPushButton("跳转")
-        jump_btn.setFont(QFont("Segoe UI", 9))
-        jump_btn.setFixedWidth(40)
-        jump_btn.clicked.connect(self._jump_page_handler)
-        pagination_layout.addWidget(jump_btn)
-        
-        next_btn = QPushButton("下一页")
-        next_btn.setFont(QFont("Segoe UI", 9))
-        next_btn.setFixedWidth(60)
-        next_btn.clicked.connect(lambda: self._goto_page(self.current_page + 1))
-        pagination_layout.addWidget(next_btn)
-        
-        main_layout.addWidget(pagination_frame)
-
-        result_frame = QFrame()
-        result_frame.setStyleSheet("background-color: white; border: 1px solid #e2e8f0; border-radius: 4px; padding: 0px; margin:0px;")
-        result_layout = QHBoxLayout(result_frame)
-        result_layout.setContentsMargins(0,0,0,0)
-        result_layout.setSpacing(0)
-        
-        self.result_tree = QTreeWidget()
-        self.result_tree.setColumnCount(3)
-        self.result_tree.setHeaderLabels(["类型", "操作", "链接"])
-        self.result_tree.setColumnWidth(0, 80)
-        self.result_tree.setColumnWidth(1, 150)
-        self.result_tree.setColumnWidth(2, 850)
-        self.result_tree.setStyleSheet("""
-            QTreeWidget {background-color: white; color: #111827; border: none; font-size: 9pt; outline: none; padding:0;margin:0;}
-            QTreeWidget::header {background-color: white; color: #374151; border: none; font-weight: bold;padding:0;margin:0;}
-            QTreeWidget::item {border: none;padding:0;margin:0;}
-            QTreeWidget::item:selected {background-color: #dbeafe; color: #1e40af; border-radius: 2px;}
-        """)
-        self.result_tree.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.result_tree.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.result_tree.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-        self.result_tree.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        
-        self.result_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.result_tree.customContextMenuRequested.connect(self._show_right_menu)
-        self.right_menu = QMenu()
-        self.copy_action = QAction("复制链接")
-        self.copy_action.triggered.connect(self._copy_selected_link)
-        self.open_action = QAction("在浏览器打开")
-        self.open_action.triggered.connect(self._open_selected_link)
-        self.right_menu.addAction(self.copy_action)
-        self.right_menu.addAction(self.open_action)
-        
-        self.result_tree.itemDoubleClicked.connect(self._on_item_double_click)
-        
-        result_layout.addWidget(self.result_tree)
-        main_layout.addWidget(result_frame)
-
-    # ========== 快捷键绑定（原有代码，无修改） ==========
-    def _bind_shortcuts(self):
-        self.addAction(QAction("OpenSingle", self, shortcut="Ctrl+O", triggered=lambda: self._select_files(multi=False)))
-        self.addAction(QAction("OpenMulti", self, shortcut="Ctrl+Shift+O", triggered=lambda: self._select_files(multi=True)))
-        self.addAction(QAction("Export", self, shortcut="Ctrl+E", triggered=self._export_links))
-        self.addAction(QAction("Clear", self, shortcut="Ctrl+R", triggered=self._clear_results))
-        self.addAction(QAction("Quit", self, shortcut="Esc", triggered=self.close))
-
-    # ========== 拖拽事件（原有代码，无修改） ==========
-    def _on_drag_enter(self, event):
-        if event.mimeData().hasUrls():
-            event.acceptProposedAction()
-            self.file_status_label.setText("👉 松开鼠标即可解析文件（支持多文件）")
-            self.set_transparent_no_border(self.file_status_label, "#3b82f6")
-
-    def _on_drag_leave(self, event):
-        if not self.file_paths:
-            self.file_status_label.setText(f"✅ 等待选择/拖拽文件 | 上次路径：{os.path.basename(self.last_path) if self.last_path else '无'}")
-            self.set_transparent_no_border(self.file_status_label)
-
-    def _on_drag_drop(self, event):
-        urls = event.mimeData().urls()
-        file_paths = [url.toLocalFile() for url in urls if os.path.isfile(url.toLocalFile()) and os.access(url.toLocalFile(), os.R_OK)]
-        if not file_paths:
-            self.file_status_label.setText("❌ 拖拽解析失败：无效文件")
-            self.set_transparent_no_border(self.file_status_label, "#dc2626")
-            return
-        self.file_paths = file_paths
-        self._update_file_status()
-        self._save_last_path(file_paths[0])
-        self._start_process_files()
-
-    # ========== 文件选择与处理（原有代码，无修改） ==========
-    def _select_files(self, multi=False):
-        if self.process_thread and self.process_thread.isRunning():
-            QMessageBox.information(self, "提示", "正在处理文件，请稍候...")
+            # 服务器忽略了Range会返回整个文件，只取响应头后直接断开连接
+            length = response.getheader("Content-Length")
+            pool.release(key, conn, False)
+    if status not in (200, 206):
+        raise ValueError(f"HTTP {status}")
+    return {
+        "type": content_type.split(";", 1)[0].strip().lower() if content_type else None,
+        "size": int(length) if length and length.isdigit() else None,
+        "modified": modified,
+        "checked": time.time(),
+    }
+
+class MetadataProbe:
+    """并发探测链接元数据：缓存命中直接返回，未命中的按主机限流后发HEAD"""
+    def __init__(self, cache, workers=PROBE_WORKERS, per_host=PROBE_PER_HOST):
+        self.cache = cache
+        self.workers = workers
+        self.per_host = per_host
+        self.pool = HttpConnectionPool(timeout=10, max_idle_per_host=per_host)
+        self.stop_event = threading.Event()
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _probe(self, url):
+        if self.stop_event.is_set():
+            return None
+        host = url_host(url)
+        with self._lock:
+            limit = self._host_limits.setdefault(host, threading.Semaphore(self.per_host))
+        with limit:
+            return probe_url(self.pool, url)
+
+    def probe_all(self, urls, on_result=None):
+        """返回 {url: 元数据}，探测失败的链接不写入缓存；on_result(url, 元数据或None)逐条回调"""
+        results = {}
+        misses = []
+        for url in urls:
+            meta = self.cache.get(url)
+            if meta:
+                results[url] = meta
+                if on_result:
+                    on_result(url, meta)
+            else:
+                misses.append(url)
+        try:
+            from concurrent.futures import ThreadPoolExecutor, as_completed
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self._probe, url): url for url in misses}
+                for future in as_completed(futures):
+                    url = futures[future]
+                    try:
+                        meta = future.result()
+                    except Exception:
+                        meta = None
+                    if meta:
+                        self.cache.put(url, meta)
+                        results[url] = meta
+                    if on_result:
+                        on_result(url, meta)
+                    if self.stop_event.is_set():
+                        for pending in futures:
+                            pending.cancel()
+        finally:
+            self.pool.close_all()
+            self.cache.save()
+        return results
+
+# ========== 链接导出（流式，多格式） ==========
+# 格式 → (文件对话框中的名称, 默认扩展名)
+EXPORT_FORMATS = {
+    "txt": ("纯文本，每行一个链接，可直接作 wget -i 输入", ".txt"),
+    "csv": ("CSV 表格（类型/扩展名/主机/大小）", ".csv"),
+    "jsonl": ("JSON Lines（含探测到的元数据）", ".jsonl"),
+    "aria2": ("aria2 输入文件（aria2c -i）", ".aria2.txt"),
+}
+EXPORT_PROGRESS_STEP = 5000  # 每导出这么多行汇报一次进度并检查取消
+
+def export_links(urls, path, fmt="txt", metadata=None, on_progress=None, stop_event=None):
+    """把链接逐行流式写到path：先写 path.part，完成后原子替换，内存占用与条数无关。
+    返回导出条数；stop_event置位时中止、删除临时文件并返回None"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式：{fmt}")
+    metadata = metadata or {}
+    total = len(urls) if hasattr(urls, "__len__") else None
+    tmp_path = path + ".part"
+    count = 0
+    cancelled = False
+    try:
+        # CSV带BOM，Windows下用Excel直接打开中文不乱码
+        with open(tmp_path, "w", encoding="utf-8-sig" if fmt == "csv" else "utf-8",
+                  newline="", buffering=1024 * 1024) as f:
+            if fmt == "csv":
+                import csv
+                writer = csv.writer(f)
+                writer.writerow(["type", "ext", "host", "size", "content_type", "url"])
+            for url in urls:
+                if count and count % EXPORT_PROGRESS_STEP == 0:
+                    if stop_event is not None and stop_event.is_set():
+                        cancelled = True
+                        break
+                    if on_progress:
+                        on_progress(count, total)
+                if fmt == "txt":
+                    f.write(url + "\n")
+                elif fmt == "aria2":
+                    # 重名由aria2自动改名处理，这里不必为去重记住所有文件名
+                    f.write(f"{url}\n  out={download_file_name(url)}\n")
+                else:
+                    meta = metadata.get(url) or {}
+                    category, ext = classify_url(url, meta.get("type"))
+                    if fmt == "csv":
+                        writer.writerow([category, ext, url_host(url), meta.get("size", ""), meta.get("type", ""), url])
+                    else:
+                        f.write(json.dumps({
+                            "url": url, "type": category, "ext": ext, "host": url_host(url),
+                            "content_type": meta.get("type"), "size": meta.get("size"), "modified": meta.get("modified"),
+                        }, ensure_ascii=False) + "\n")
+                count += 1
+        if cancelled:
+            os.remove(tmp_path)
+            return None
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if on_progress:
+        on_progress(count, total)
+    return count
+
+# ========== 结果库（SQLite，跨会话保存扫描结果） ==========
+RESULT_PAGE_SIZE = 5000         # 启动恢复时每页读取的行数
+RESULT_DB_COMMIT_ROWS = 20000   # 写缓冲攒够这么多行才提交一次（逐批小事务会让写库比扫描本身还慢）
+
+RESULT_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    host TEXT NOT NULL,
+    category TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    source TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_host ON results(host);
+CREATE INDEX IF NOT EXISTS results_category ON results(category);
+CREATE INDEX IF NOT EXISTS results_first_seen ON results(first_seen);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+class ResultStore:
+    """扫描结果的SQLite库：每个URL记首次/最近发现时间、来源文件、主机和类别。
+    WAL模式下扫描线程写入时界面仍可读；sqlite连接不能跨线程使用，各线程分别打开"""
+    def __init__(self, path=RESULT_DB_PATH):
+        import sqlite3
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(RESULT_DB_SCHEMA)
+        self._rows = []  # 写缓冲
+
+    def upsert(self, urls, sources=None, seen=None):
+        """写入一批URL（sources与urls一一对应）；已有的URL只更新最近发现时间和来源。
+        先进写缓冲，攒够RESULT_DB_COMMIT_ROWS行再一次提交，写完一轮要调用flush()"""
+        seen = time.time() if seen is None else seen
+        rows = self._rows
+        for i, url in enumerate(urls):
+            category, ext = classify_url(url)
+            rows.append((url, url_host(url), category, ext, sources[i] if sources else None, seen, seen))
+        if len(rows) >= RESULT_DB_COMMIT_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
             return
-        initial_dir = os.path.dirname(self.last_path) if self.last_path and os.path.exists(os.path.dirname(self.last_path)) else "."
-        file_filter = "所有文件 (*.*);;data_1文件 (data_1)"
-        if multi:
-            file_paths, _ = QFileDialog.getOpenFileNames(self, "选择多个data_1文件", initial_dir, file_filter)
-        else:
-            file_path, _ = QFileDialog.getOpenFileName(self, "选择data_1文件", initial_dir, file_filter)
-            file_paths = [file_path] if file_path else []
-        if not file_paths:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO results (url, host, category, ext, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET last_seen = excluded.last_seen, "
+                "source = COALESCE(excluded.source, source)",
+                self._rows
+            )
+        self._rows = []
+
+    def _where(self, category=None, host=None, since=None):
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if host:
+            clauses.append("host = ?")
+            params.append(host.lower())
+        if since is not None:
+            clauses.append("first_seen > ?")
+            params.append(since)
+        return clauses, params
+
+    def query(self, category=None, host=None, since=None, after_id=0, limit=RESULT_PAGE_SIZE):
+        """按id递增返回一页 [(id, url, category, ext, first_seen, source)]；翻页用上一页最后的id（键集分页，不用OFFSET）"""
+        clauses, params = self._where(category, host, since)
+        clauses.append("id > ?")
+        params.append(after_id)
+        return self.conn.execute(
+            "SELECT id, url, category, ext, first_seen, source FROM results WHERE " + " AND ".join(clauses) +
+            " ORDER BY id LIMIT ?", (*params, limit)
+        ).fetchall()
+
+    def iter_pages(self, category=None, host=None, since=None, page_size=RESULT_PAGE_SIZE):
+        after_id = 0
+        while True:
+            page = self.query(category, host, since, after_id, page_size)
+            if not page:
+                return
+            yield page
+            after_id = page[-1][0]
+
+    def known_before(self, urls, since, chunk_size=500):
+        """返回urls中在since之前就已入库的那些（按URL唯一索引逐块查询，每块参数数不超过旧版sqlite上限）"""
+        known = set()
+        urls = list(urls)
+        for i in range(0, len(urls), chunk_size):
+            chunk = urls[i:i + chunk_size]
+            known.update(url for url, in self.conn.execute(
+                f"SELECT url FROM results WHERE first_seen <= ? AND url IN ({', '.join('?' * len(chunk))})",
+                (since, *chunk)
+            ))
+        return known
+
+    def has_before(self, since):
+        """库里是否有since之前就已入库的结果（走first_seen索引，只看一行）"""
+        return self.conn.execute("SELECT 1 FROM results WHERE first_seen <= ? LIMIT 1", (since,)).fetchone() is not None
+
+    def count(self, category=None, host=None, since=None):
+        clauses, params = self._where(category, host, since)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return self.conn.execute("SELECT COUNT(*) FROM results" + where, params).fetchone()[0]
+
+    def _set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, repr(value)))
+
+    def mark_launch(self, now=None):
+        """记录本次启动时间，返回“上次启动后新增”的分界时间（首次启动为0）：
+        上次正常退出的时间；上次未正常退出时退回到上次启动时间"""
+        now = time.time() if now is None else now
+        times = dict(self.conn.execute("SELECT key, value FROM meta WHERE key IN ('last_launch', 'last_exit')"))
+        self._set_meta("last_launch", now)
+        return max((float(value) for value in times.values()), default=0.0)
+
+    def mark_exit(self, now=None):
+        self._set_meta("last_exit", time.time() if now is None else now)
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM results")
+
+    def close(self):
+        self.flush()
+        # 让sqlite按需更新查询规划用的统计信息（主机+类别组合查询据此选对索引）
+        self.conn.execute("PRAGMA optimize")
+        self.conn.close()
+
+# ========== 扫描统计（分阶段计时/去重命中率/峰值内存） ==========
+def peak_rss_bytes(children=False):
+    """当前进程（children=True时为已结束的子进程中最大者）的峰值常驻内存，取不到返回0"""
+    try:
+        import resource
+    except ImportError:
+        if children or platform.system() != "Windows":
+            return 0
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage",
+                )
+            ]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return 0
+        return counters.PeakWorkingSetSize
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # macOS上ru_maxrss单位为字节，Linux为KB
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def new_file_stats():
+    """单个文件的分阶段统计；字段都可直接相加，便于合并并行子任务的结果"""
+    return {"bytes": 0, "read_s": 0.0, "match_s": 0.0, "decode_s": 0.0, "filter_s": 0.0, "urls_found": 0}
+
+def _timed_matches(matches, record):
+    """逐个产出匹配，同时把等待下一个匹配的时间（即正则/锚点查找本身）累加到record["match_s"]"""
+    clock = time.perf_counter
+    elapsed = 0.0
+    try:
+        while True:
+            started = clock()
+            found = next(matches, None)
+            elapsed += clock() - started
+            if found is None:
+                return
+            yield found
+    finally:
+        record["match_s"] += elapsed
+
+class ScanStats:
+    """一次扫描的统计：每个文件各阶段的字节数与耗时、各整体阶段耗时、去重命中率和峰值内存"""
+    def __init__(self):
+        self.files = {}   # 路径 → new_file_stats()
+        self.stages = {}  # 整体阶段（解析缓存索引/规划/扫描/保存索引）→ 耗时
+        self.started = self._lap = time.perf_counter()
+        self.seconds = 0.0
+        self.urls_seen = 0
+        self.urls_unique = 0
+        self.urls_invalid = 0
+        self.peak_rss = 0
+        self.profile_path = None
+
+    def file(self, path):
+        record = self.files.get(path)
+        if record is None:
+            record = self.files[path] = new_file_stats()
+        return record
+
+    def merge(self, path, record):
+        target = self.file(path)
+        for key, value in record.items():
+            target[key] += value
+
+    def add_stage(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def lap(self, name):
+        """把距上一次lap的耗时记到阶段name下"""
+        now = time.perf_counter()
+        self.add_stage(name, now - self._lap)
+        self._lap = now
+
+    def finish(self, batcher):
+        self.seconds = time.perf_counter() - self.started
+        self.urls_seen = batcher.added
+        self.urls_unique = len(batcher.valid_urls)
+        self.urls_invalid = len(batcher.invalid)
+        self.peak_rss = max(peak_rss_bytes(), peak_rss_bytes(children=True))
+
+    @property
+    def dedupe_hit_rate(self):
+        """重复出现的URL占全部命中的比例"""
+        if not self.urls_seen:
+            return 0.0
+        return (self.urls_seen - self.urls_unique - self.urls_invalid) / self.urls_seen
+
+    def totals(self):
+        total = new_file_stats()
+        for record in self.files.values():
+            for key, value in record.items():
+                total[key] += value
+        return total
+
+    def to_dict(self):
+        return {
+            "seconds": round(self.seconds, 4),
+            "stages": {name: round(value, 4) for name, value in self.stages.items()},
+            "totals": {key: round(value, 4) if isinstance(value, float) else value for key, value in self.totals().items()},
+            "files": {path: {key: round(value, 4) if isinstance(value, float) else value for key, value in record.items()}
+                      for path, record in self.files.items()},
+            "urls_seen": self.urls_seen,
+            "urls_unique": self.urls_unique,
+            "urls_invalid": self.urls_invalid,
+            "dedupe_hit_rate": round(self.dedupe_hit_rate, 4),
+            "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1),
+            "profile": self.profile_path,
+        }
+
+    def summary(self):
+        total = self.totals()
+        return (f"📊 {len(self.files)} 个文件 {total['bytes'] / 1024 / 1024:.1f}MB，用时 {self.seconds:.2f}s"
+                f"（读取 {total['read_s']:.2f}s / 匹配 {total['match_s']:.2f}s / 解码 {total['decode_s']:.2f}s"
+                f" / 过滤 {total['filter_s']:.2f}s），去重命中 {self.dedupe_hit_rate:.0%}，峰值内存 {self.peak_rss / 1024 / 1024:.0f}MB")
+
+    def details(self):
+        """逐文件明细（多行文本，用于悬停提示和命令行输出）"""
+        lines = [f"{'文件':<24}{'MB':>8}{'读取s':>8}{'匹配s':>8}{'解码s':>8}{'过滤s':>8}{'URL':>9}"]
+        for path, record in self.files.items():
+            lines.append(f"{os.path.basename(path)[:24]:<24}{record['bytes'] / 1024 / 1024:>8.1f}{record['read_s']:>8.2f}"
+                         f"{record['match_s']:>8.2f}{record['decode_s']:>8.2f}{record['filter_s']:>8.2f}{record['urls_found']:>9}")
+        lines.append("阶段：" + "，".join(f"{name} {value:.2f}s" for name, value in self.stages.items()))
+        return "\n".join(lines)
+
+def run_profiled(profile_path, func, *args, **kwargs):
+    """在cProfile下调用func并把结果写到profile_path；只覆盖调用线程，并行扫描的子进程不在其中"""
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+
+# ========== 启动器缓存发现（各区服全部HYP版本目录） ==========
+LauncherCache = namedtuple("LauncherCache", "region version path")
+
+def _version_key(version):
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+def discover_launcher_caches(roots=None):
+    """列出各区服HYP下每个版本目录中含有效index的缓存目录，按区服顺序、同区服新版本在前"""
+    caches = []
+    for region, root in (roots or HYP_ROOTS).items():
+        try:
+            versions = sorted(os.listdir(root), key=_version_key, reverse=True)
+        except OSError:
+            continue
+        for version in versions:
+            path = os.path.join(root, version, HYP_CACHE_SUBDIR)
+            if is_cache_index(os.path.join(path, "index")):
+                caches.append(LauncherCache(region, version, path))
+    return caches
+
+def launcher_cache_tag(path, roots=None):
+    """HYP目录下的文件 → “区服 版本”（如“国服 1_1”），其他位置返回空串"""
+    full = os.path.normcase(os.path.abspath(path))
+    for region, root in (roots or HYP_ROOTS).items():
+        prefix = os.path.normcase(os.path.abspath(root)) + os.sep
+        if full.startswith(prefix):
+            return f"{region} {full[len(prefix):].split(os.sep, 1)[0]}"
+    return ""
+
+def parse_cache_index(index_path):
+    """按结构列出缓存目录中的全部URL（可在进程池中调用）"""
+    with ChromiumCacheParser(os.path.dirname(index_path)) as parser:
+        return [entry.url for entry in parser.iter_entries()]
+
+def iter_cache_indexes(index_paths, max_workers=None, control=None):
+    """解析多个缓存索引，按完成顺序产出 (index路径, URL列表)；多个时分到进程池同时解析。
+    与iter_parallel_scan一样最多排两轮，暂停时不再提交、取消时丢弃未开始的"""
+    if len(index_paths) < 2 or max_workers == 1:
+        for index_path in index_paths:
+            yield index_path, parse_cache_index(index_path)
+        return
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    max_workers = min(len(index_paths), max_workers or os.cpu_count())
+    pending = iter(index_paths)
+    futures = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        try:
+            while True:
+                if control is not None:
+                    control.checkpoint()
+                while len(futures) < max_workers * 2:
+                    index_path = next(pending, None)
+                    if index_path is None:
+                        break
+                    futures[pool.submit(parse_cache_index, index_path)] = index_path
+                if not futures:
+                    return
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield futures.pop(future), future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+# ========== 扫描任务控制（协作式取消/暂停） ==========
+class ScanCancelled(Exception):
+    """扫描在检查点被取消；urls为取消前已得到的有效链接（UrlStore）"""
+    def __init__(self, urls=None):
+        super().__init__("扫描已取消")
+        self.urls = urls
+
+class JobControl:
+    """扫描任务的取消/暂停开关：由界面线程操作，扫描线程在分段之间调用checkpoint()响应"""
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()  # 清除即暂停
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # 唤醒暂停中的扫描，让它在检查点退出
+
+    def checkpoint(self):
+        """暂停时阻塞到恢复或取消；已取消时抛出ScanCancelled"""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise ScanCancelled()
+
+def _checkpointed(urls, control):
+    for count, url in enumerate(urls, 1):
+        if not count % SCAN_CHECKPOINT_URLS:
+            control.checkpoint()
+        yield url
+
+# ========== 扫描流程（界面与命令行共用） ==========
+def scan_paths(file_paths, scan_mode=SCAN_MODE_MMAP, workers=None, use_index=True, on_batch=None, on_progress=None,
+               engine=SCAN_ENGINE_LITERAL, stats=None, result_store=None, control=None, on_data_uris=None):
+    """完整扫描流程：缓存索引按结构并发解析，其余文件走扫描索引+并行/串行字节扫描，结果去重校验后
+    按批回调on_batch(urls, sources)，返回全部有效链接（UrlStore）；
+    传入ScanStats时顺带记录分阶段统计，传入ResultStore时每批同时写入结果库；
+    传入JobControl时在分段之间响应暂停/取消，取消时已找到的结果照常送出，然后抛出带部分结果的ScanCancelled；
+    给出on_data_uris时链接扫完后再查找内嵌图片，按载荷哈希去重后逐文件回调on_data_uris([DataUri], 来源文件)"""
+    progress = on_progress or (lambda text, color: None)
+    lap = stats.lap if stats is not None else (lambda name: None)
+    batcher = ResultBatcher(on_batch or (lambda urls, sources: None), persist=result_store and result_store.upsert)
+    store = batcher.valid_urls
+
+    index = ScanIndex() if use_index else None
+    # 每个文件命中的行号标记（按行号置1），只在需要写扫描索引时记录，不为每个文件再存一份URL
+    file_marks = {}
+    # 本次重新查找过内嵌图片的普通文件 → [DataUri]，随扫描索引保存，文件不变时下次直接复用
+    file_data_uris = {}
+
+    def add(file_path, urls):
+        marks = file_marks.get(file_path)
+        batcher.source = file_path
+        if control is not None:
+            urls = _checkpointed(urls, control)
+        if stats is None:
+            for url in urls:
+                row = batcher.add(url)
+                if marks is not None and row >= 0:
+                    if row >= len(marks):
+                        marks.extend(bytes(row + 1 - len(marks) + 4096))
+                    marks[row] = 1
             return
-        self.file_paths = file_paths
-        self._update_file_status()
-        self._save_last_path(file_paths[0])
-        self._start_process_files()
-
-    def _update_file_status(self):
-        if len(self.file_paths) == 1:
-            self.file_status_label.setText(f"✅ 解析成功：{os.path.basename(self.file_paths[0])}")
+        # 统计模式：只计batcher.add及标记本身的耗时，取下一个URL的时间已由各扫描函数计入读取/匹配/解码
+        clock = time.perf_counter
+        filter_s = 0.0
+        found = 0
+        for url in urls:
+            started = clock()
+            row = batcher.add(url)
+            if marks is not None and row >= 0:
+                if row >= len(marks):
+                    marks.extend(bytes(row + 1 - len(marks) + 4096))
+                marks[row] = 1
+            filter_s += clock() - started
+            found += 1
+        record = stats.file(file_path)
+        record["filter_s"] += filter_s
+        record["urls_found"] += found
+
+    batcher.start()
+    try:
+        file_ranges = []
+        byte_paths = []
+        index_paths = []
+        for file_path in file_paths:
+            (index_paths if is_cache_index(file_path) else byte_paths).append(file_path)
+        # 缓存索引直接按结构遍历条目，键即资源URL；多个缓存目录同时解析，先解析完的先合并
+        for done, (file_path, urls) in enumerate(iter_cache_indexes(index_paths, workers, control), 1):
+            tag = launcher_cache_tag(file_path)
+            progress(
+                f"⚡ 解析缓存索引 ({done}/{len(index_paths)})：{tag or os.path.dirname(file_path)}",
+                "#f59e0b"
+            )
+            add(file_path, urls)
+            if control is not None:
+                control.checkpoint()
+        lap("解析缓存索引")
+        for file_path in byte_paths:
+            if index:
+                cached_urls, scan_from, size = index.plan(file_path)
+                file_marks[file_path] = bytearray()
+            else:
+                cached_urls, scan_from, size = (), 0, os.path.getsize(file_path)
+            add(file_path, cached_urls)
+            if scan_from < size:
+                file_ranges.append((file_path, scan_from, size))
+        batcher.flush()
+        if len(file_ranges) < len(byte_paths):
+            progress(
+                f"♻️ {len(byte_paths) - len(file_ranges)} 个文件未变化，直接复用扫描索引",
+                "#f59e0b"
+            )
+
+        tasks = plan_scan_tasks(file_ranges)
+        total_bytes = sum(end - start for _, start, end in tasks)
+        lap("规划")
+    
+        if workers != 1 and len(tasks) > 1 and total_bytes >= PARALLEL_MIN_BYTES:
+            results = iter_parallel_scan(tasks, workers, engine, instrument=stats is not None, control=control,
+                                         scan_mode=scan_mode)
+            for done, (task, urls) in enumerate(results, 1):
+                if stats is not None:
+                    # 子进程各自计时后回传，这里按文件合并
+                    urls, record = urls
+                    stats.merge(task[0], record)
+                add(task[0], urls)
+                progress(
+                    f"⚡ 并行处理中 ({done}/{len(tasks)})：{os.path.basename(task[0])}",
+                    "#f59e0b"
+                )
         else:
-            self.file_status_label.setText(f"✅ 解析成功：共 {len(self.file_paths)} 个文件")
-        self.set_transparent_no_border(self.file_status_label, "#16a34a")
-
-    def _start_process_files(self):
-        self.process_thread = FileProcessThread(self.file_paths)
-        # 补充原有代码中缺失的信号绑定（避免运行报错）
-        self.process_thread.progress_signal.connect(lambda text, color: None)
-        self.process_thread.result_signal.connect(lambda urls: setattr(self, 'all_matches', urls))
-        self.process_thread.error_signal.connect(lambda err: QMessageBox.critical(self, "错误", err))
-        self.process_thread.start()
-
-    # ========== 补充原有代码中缺失的核心方法（避免运行报错） ==========
-    def _copy_text(self, text):
-        clipboard = QApplication.clipboard()
-        clipboard.setText(text)
-        QMessageBox.information(self, "提示", "已复制到剪贴板")
-
-    def _clear_results(self):
-        self.all_matches = []
-        self.filtered_matches = []
-        self.current_page = 1
-        self.result_tree.clear()
-        self.page_info_label.setText("第 1 / 1 页 | 共 0 个链接")
-        self.file_status_label.setText(f"✅ 等待选择/拖拽文件 | 上次路径：{os.path.basename(self.last_path) if self.last_path else '无'}")
-
-    def _apply_filters(self, keep_page=False):
-        # 过滤逻辑（原有核心逻辑）
-        self.filtered_matches = []
-        for url in self.all_matches:
-            ext = url.split('.')[-1].lower()
-            if (self.img_check.isChecked() and ext in IMAGE_EXTS) or \
-               (self.video_check.isChecked() and ext in VIDEO_EXTS) or \
-               (self.other_check.isChecked() and ext not in IMAGE_EXTS and ext not in VIDEO_EXTS):
-                self.filtered_matches.append(url)
-        # 更新分页和列表
-        if not keep_page:
-            self.current_page = 1
-        self._render_page()
-
-    def _render_page(self):
-        self.result_tree.clear()
-        total_pages = self._get_total_pages()
-        start_idx = (self.current_page - 1) * self.items_per_page
-        end_idx = start_idx + self.items_per_page
-        page_urls = self.filtered_matches[start_idx:end_idx]
-        
-        for url in page_urls:
-            ext = url.split('.')[-1].lower()
-            if ext in IMAGE_EXTS:
-                type_text = "图片"
-            elif ext in VIDEO_EXTS:
-                type_text = "视频"
+            for idx, (file_path, start, end) in enumerate(file_ranges):
+                progress(
+                    f"⚡ 处理中 ({idx+1}/{len(file_ranges)})：{os.path.basename(file_path)}",
+                    "#f59e0b"
+                )
+                record = stats.file(file_path) if stats is not None else None
+                if control is not None:
+                    control.checkpoint()
+                    if end - start > SCAN_CHECKPOINT_SIZE:
+                        # 大文件分段扫描，段与段之间响应取消/暂停
+                        for chunk_start in range(start, end, SCAN_CHECKPOINT_SIZE):
+                            chunk_end = min(chunk_start + SCAN_CHECKPOINT_SIZE, end)
+                            add(file_path, iter_urls_range(file_path, chunk_start, chunk_end, engine=engine, record=record,
+                                                           scan_mode=scan_mode))
+                            control.checkpoint()
+                        continue
+                if start == 0:
+                    urls = iter_file_urls(file_path, scan_mode, engine, record)
+                else:
+                    urls = iter_urls_range(file_path, start, end, engine=engine, record=record, scan_mode=scan_mode)
+                add(file_path, urls)
+        batcher.flush()
+        if result_store is not None:
+            result_store.flush()
+        lap("扫描")
+
+        if on_data_uris is not None:
+            # 内嵌图片单独查一趟，不并进URL扫描：载荷可达数十MB，跨块和跨并行区间都接不上。
+            # 为少读字节：未变化的普通文件复用扫描索引记下的位置；缓存目录只查非媒体条目的响应体区间，来源记为其index
+            changed = {file_path for file_path, _, _ in file_ranges}
+            targets = [(file_path, file_path, None) for file_path in byte_paths]
+            for index_path in index_paths:
+                try:
+                    body_spans = cache_data_uri_spans(index_path)
+                except (OSError, ValueError, struct.error):
+                    continue
+                targets.extend((body_path, index_path, spans) for body_path, spans in body_spans.items())
+            seen = set()
+            for idx, (file_path, source, spans) in enumerate(targets):
+                if control is not None:
+                    control.checkpoint()
+                progress(f"⚡ 查找内嵌图片 ({idx+1}/{len(targets)})：{os.path.basename(file_path)}", "#f59e0b")
+                items = index.data_uris(file_path) if index and spans is None and file_path not in changed else None
+                if items is None:
+                    try:
+                        items = scan_data_uris(file_path, spans=spans)
+                    except (OSError, ValueError):
+                        continue
+                    if index and spans is None:
+                        file_data_uris[file_path] = items
+                fresh = []
+                for item in items:
+                    if item.digest not in seen:
+                        seen.add(item.digest)
+                        fresh.append(item)
+                if fresh:
+                    on_data_uris(fresh, source)
+            lap("内嵌图片")
+    except ScanCancelled:
+        # 已找到的结果照常送出和入库；扫描索引不更新，下次按原样重扫
+        batcher.flush()
+        if result_store is not None:
+            result_store.flush()
+        raise ScanCancelled(store) from None
+    finally:
+        batcher.stop()
+
+    if index:
+        for file_path, _, end in file_ranges:
+            marks = file_marks[file_path]
+            index.update(file_path, end, (store[row] for row in range(len(marks)) if marks[row]))
+        for file_path, items in file_data_uris.items():
+            index.record_data_uris(file_path, items)
+        index.save()
+        lap("保存索引")
+    if stats is not None:
+        stats.finish(batcher)
+    return store
+
+# ========== 命令行模式（不加载Qt） ==========
+def expand_input_paths(paths):
+    """展开命令行输入：文件原样保留，目录递归收集其中全部文件（缓存目录只取index按结构解析）"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                index_path = os.path.join(root, "index")
+                if is_cache_index(index_path):
+                    files.append(index_path)
+                else:
+                    files.extend(os.path.join(root, name) for name in sorted(names))
+        elif os.path.isfile(path):
+            files.append(path)
+    return files
+
+
+def main_cli(argv=None):
+    """无界面扫描：链接按批次流式写到stdout，进度写到stderr，可直接接管道"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="米哈游启动器背景提取 --cli",
+        description="扫描启动器缓存/日志，输出其中的媒体链接"
+    )
+    parser.add_argument("paths", nargs="*", help="要扫描的文件或目录")
+    parser.add_argument("--preset", action="append", choices=[*DEFAULT_PATHS, "all"],
+                        help="扫描内置的启动器缓存目录，可重复指定")
+    parser.add_argument("--discover", action="store_true",
+                        help="自动发现并同时扫描各区服全部HYP版本目录下的缓存")
+    parser.add_argument("--format", choices=["urls", "ndjson"], default="urls",
+                        help="urls：每行一个链接；ndjson：每行一个JSON对象（url/type/ext/host）")
+    parser.add_argument("--types", default="image,video",
+                        help="输出的类型，逗号分隔：image,video,other 或 all（默认 image,video）")
+    parser.add_argument("--mode", choices=[SCAN_MODE_MMAP, SCAN_MODE_STREAM], default=SCAN_MODE_MMAP,
+                        help="扫描方式（默认 mmap）")
+    parser.add_argument("--engine", choices=[SCAN_ENGINE_LITERAL, SCAN_ENGINE_REGEX], default=SCAN_ENGINE_LITERAL,
+                        help="匹配引擎：literal先找\"://\"再锚定匹配（默认），regex为整段正则，两者结果相同")
+    parser.add_argument("--workers", type=int, default=None, help="并行扫描进程数，1 为串行")
+    parser.add_argument("--no-index", action="store_true", help="不使用也不更新扫描索引")
+    parser.add_argument("--save", action="store_true", help="把结果写入结果库（与界面共用，下次启动界面时可见）")
+    parser.add_argument("--data-uris", metavar="DIR",
+                        help="同时查找内嵌的base64图片（data:image/...），解码后按内容哈希命名保存到DIR")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度信息")
+    parser.add_argument("--stats", action="store_true", help="扫描结束后把分阶段统计输出到stderr")
+    parser.add_argument("--stats-json", metavar="PATH", help="把分阶段统计写成JSON文件")
+    parser.add_argument("--profile", metavar="PATH", help="用cProfile抓取本次扫描，结果写到PATH（pstats格式）")
+    args = parser.parse_args(argv)
+
+    if args.types.strip() == "all":
+        types = set(CATEGORY_LABELS)
+    else:
+        types = {t.strip() for t in args.types.split(",") if t.strip()}
+        unknown = types - set(CATEGORY_LABELS)
+        if unknown:
+            parser.error(f"未知类型：{', '.join(sorted(unknown))}")
+
+    inputs = list(args.paths)
+    for preset in args.preset or []:
+        inputs.extend(DEFAULT_PATHS.values() if preset == "all" else [DEFAULT_PATHS[preset]])
+    if args.discover:
+        caches = discover_launcher_caches()
+        inputs.extend(cache.path for cache in caches)
+        if not args.quiet:
+            print(f"🔍 发现 {len(caches)} 个启动器缓存：" + "、".join(f"{c.region} {c.version}" for c in caches),
+                  file=sys.stderr, flush=True)
+    # 同一目录（如--preset与--discover重叠）只扫一次
+    files = list(dict.fromkeys(expand_input_paths(inputs)))
+    if not files:
+        parser.error("没有可扫描的文件")
+
+    def on_progress(text, color):
+        if not args.quiet:
+            print(text, file=sys.stderr, flush=True)
+
+    tags = {}  # 来源文件 → 区服/版本标签
+
+    def on_batch(urls, sources):
+        lines = []
+        for url, source in zip(urls, sources):
+            category, ext = classify_url(url)
+            if category not in types:
+                continue
+            if args.format == "ndjson":
+                tag = tags.get(source)
+                if tag is None:
+                    tag = tags[source] = launcher_cache_tag(source)
+                lines.append(json.dumps({
+                    "url": url, "type": category, "ext": ext, "host": url_host(url), "source": source, "tag": tag
+                }, ensure_ascii=False))
             else:
-                type_text = "其他"
-            item = QTreeWidgetItem([type_text, "", url])
-            # 添加操作按钮（简化版）
-            self.result_tree.addTopLevelItem(item)
-        
-        self.page_info_label.setText(f"第 {self.current_page} / {total_pages} 页 | 共 {len(self.filtered_matches)} 个链接")
-
-    def _goto_page(self, page):
-        total_pages = self._get_total_pages()
-        if 1 <= page <= total_pages:
-            self.current_page = page
-            self._render_page()
-            self.page_edit.setText(str(page))
-
-    def _jump_page_handler(self):
+                lines.append(url)
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    saved_images = []
+
+    def on_data_uris(items, source):
+        for item in items:
+            try:
+                saved_images.append(save_data_uri(item, args.data_uris))
+            except (OSError, ValueError) as e:
+                on_progress(f"⚠️ 内嵌图片解码失败（{os.path.basename(item.path)}@{item.offset}）：{e}", None)
+
+    stats = ScanStats() if args.stats or args.stats_json or args.profile else None
+    scan_args = (files, args.mode, args.workers, not args.no_index)
+    scan_kwargs = dict(on_batch=on_batch, on_progress=on_progress, engine=args.engine, stats=stats)
+    if args.data_uris:
+        scan_kwargs["on_data_uris"] = on_data_uris
+    try:
+        if args.save:
+            scan_kwargs["result_store"] = ResultStore()
+        if args.profile:
+            valid_urls = run_profiled(args.profile, scan_paths, *scan_args, **scan_kwargs)
+            stats.profile_path = os.path.abspath(args.profile)
+        else:
+            valid_urls = scan_paths(*scan_args, **scan_kwargs)
+    except BrokenPipeError:
+        # 下游提前关闭管道（如 | head），属正常结束；把stdout指向空设备，避免退出时刷新再报错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except Exception as e:
+        print(f"❌ 处理失败：{e}", file=sys.stderr)
+        return 1
+    on_progress(f"✅ 处理完成：共提取 {len(valid_urls)} 个有效链接", None)
+    if args.data_uris:
+        on_progress(f"🖼️ 内嵌图片：保存 {len(saved_images)} 张到 {args.data_uris}", None)
+    if args.stats:
+        print(stats.summary(), stats.details(), sep="\n", file=sys.stderr)
+    if args.stats_json:
+        with open(args.stats_json, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, ensure_ascii=False, indent=2)
+    return 0
+
+
+# ========== 启动耗时报告 ==========
+STARTUP_BUDGET_MS = 1500  # 冷启动到首个窗口显示的预算
+STARTUP_PROBE_ENV = "MIHOYO_EXTRACTOR_STARTUP_PROBE"  # 子进程据此在首窗显示后输出耗时并退出
+
+
+def parse_importtime(text):
+    """解析 -X importtime 输出，返回 [(模块, 自身耗时us, 累计耗时us, 嵌套层级)]"""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
         try:
-            page = int(self.page_edit.text())
-            self._goto_page(page)
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
         except ValueError:
-            QMessageBox.warning(self, "提示", "请输入有效的页码")
+            continue  # 表头行
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def main_startup_report(argv=None):
+    """以 -X importtime 冷启动一次图形界面，到首个窗口显示为止，输出导入耗时排行与首窗时间并对照预算"""
+    import argparse
+    import subprocess
+    parser = argparse.ArgumentParser(
+        prog="米哈游启动器背景提取 --startup-report",
+        description="测量冷启动耗时：导入耗时排行 + 首个窗口显示时间"
+    )
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS, help="首窗时间预算（毫秒）")
+    parser.add_argument("--top", type=int, default=15, help="列出耗时最多的顶层导入数量")
+    parser.add_argument("--json", metavar="PATH", help="同时把报告写成JSON，便于跟踪历史")
+    args = parser.parse_args(argv)
+
+    if getattr(sys, "frozen", False):
+        # 打包后的exe不支持 -X importtime，只测首窗时间
+        cmd = [sys.executable]
+    else:
+        cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__)]
+    started = time.perf_counter()
+    proc = subprocess.run(
+        cmd, env=dict(os.environ, **{STARTUP_PROBE_ENV: "1"}),
+        capture_output=True, text=True, encoding="utf-8", errors="replace"
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    probe = None
+    for line in reversed(proc.stdout.splitlines()):
+        try:
+            probe = json.loads(line)
+            break
+        except ValueError:
+            continue
+    if probe is None:
+        print(f"❌ 启动失败（退出码 {proc.returncode}）", file=sys.stderr)
+        print(proc.stderr[-2000:], file=sys.stderr)
+        return 1
+
+    rows = parse_importtime(proc.stderr)
+    top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: row[2], reverse=True)
+    import_ms = sum(row[2] for row in top_level) / 1000
+    report = {
+        "import_ms": round(import_ms, 1),
+        "module_to_window_ms": probe["window_ms"],
+        "process_ms": round(process_ms, 1),
+        "budget_ms": args.budget,
+        "within_budget": probe["window_ms"] <= args.budget,
+        "top_imports": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us, _ in top_level[:args.top]
+        ],
+    }
+
+    if rows:
+        print(f"{'累计(ms)':>10} {'自身(ms)':>10}  顶层导入")
+        for item in report["top_imports"]:
+            print(f"{item['cumulative_ms']:>10.1f} {item['self_ms']:>10.1f}  {item['module']}")
+        print(f"导入总耗时：{report['import_ms']:.1f} ms")
+    print(f"脚本开始执行 → 首窗显示：{probe['window_ms']:.1f} ms（预算 {args.budget:.0f} ms）")
+    print(f"进程启动到退出（含解释器启动）：{process_ms:.1f} ms")
+    print("✅ 在预算内" if report["within_budget"] else "❌ 超出预算")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0 if report["within_budget"] else 1
+
+
+# ========== 基准测试（合成语料，可复现） ==========
+BENCH_HOSTS = [
+    "https://fastcdn.mihoyo.com", "https://act-webstatic.mihoyo.com", "https://launcher-webstatic.mihoyo.com",
+    "https://sdk-webstatic.hoyoverse.com", "https://upload-os-bbs.hoyolab.com", "http://webstatic.mihoyo.com",
+]
+BENCH_EXTS = ["png", "jpg", "webp", "mp4", "webm", "js", "json", "css"]
+BENCH_SEP = b"\x00"  # 埋入的URL前后各放一个分隔字节，避免与随机噪声粘连成更长的匹配
+
+
+def _bench_url(rng):
+    path = "/".join(f"{rng.getrandbits(32):08x}" for _ in range(rng.randint(1, 4)))
+    if rng.random() < 0.05:
+        path += "/" + "x" * rng.randint(200, 1500)  # 少量超长URL，覆盖尾部窗口处理
+    url = f"{rng.choice(BENCH_HOSTS)}/{path}.{rng.choice(BENCH_EXTS)}"
+    if rng.random() < 0.3:
+        url += f"?v={rng.getrandbits(24)}&t={rng.getrandbits(16)}"
+    return url
+
+
+def generate_bench_corpus(path, size_mb=64, density=2000, seed=0):
+    """生成仿blockfile缓存块文件的语料：随机二进制噪声 + 伪HTTP头 + 按密度（条/MB）埋入的URL，
+    并在每个扫描块/并行切分边界上各埋一条跨边界的URL。返回埋入的URL集合，同时写入 path + ".urls"（每行一条）"""
+    import random
+    rng = random.Random(seed)
+    size = int(size_mb * 1024 * 1024)
+    plants = []
+    for _ in range(int(size_mb * density)):
+        url = _bench_url(rng)
+        plants.append((rng.randrange(CACHE_BLOCK_HEADER_SIZE, max(CACHE_BLOCK_HEADER_SIZE + 1, size - len(url) - 2)), url))
+    for boundary_step in (SCAN_BLOCK_SIZE, PARALLEL_SPLIT_SIZE):
+        for boundary in range(boundary_step, size, boundary_step):
+            url = _bench_url(rng)
+            plants.append((max(CACHE_BLOCK_HEADER_SIZE, boundary - len(url) // 2 - 1), url))
+    plants.sort()
+
+    planted = set()
+    with open(path, "wb") as f:
+        # 块文件头：魔数 + 其余清零，与真实data_N文件开头一致
+        f.write(struct.pack("<I", CACHE_BLOCK_MAGIC).ljust(CACHE_BLOCK_HEADER_SIZE, b"\x00"))
+        pos = CACHE_BLOCK_HEADER_SIZE
+        for offset, url in plants:
+            if offset < pos:
+                continue  # 与上一条重叠，丢弃
+            gap = offset - pos
+            if gap > 64 and rng.random() < 0.2:
+                # 偶尔插入一段不含URL的伪HTTP响应头，模拟缓存条目里的文本片段
+                header = f"HTTP/1.1 200 OK\x00content-type: image/{rng.choice(BENCH_EXTS)}\x00content-length: {rng.getrandbits(20)}\x00".encode()
+                header = header[:gap - 2]
+                f.write(rng.randbytes(gap - len(header) - 2) + BENCH_SEP + header + BENCH_SEP)
+            else:
+                f.write(rng.randbytes(gap))
+            data = BENCH_SEP + url.encode("ascii") + BENCH_SEP
+            f.write(data)
+            pos = offset + len(data)
+            planted.add(url)
+        if pos < size:
+            f.write(rng.randbytes(size - pos))
+    with open(path + ".urls", "w", encoding="ascii") as f:
+        f.write("\n".join(sorted(planted)))
+    return planted
+
+
+def _bench_stream(path, workers, engine):
+    return set(iter_urls_stream(path, engine=engine))
+
+def _bench_mmap(path, workers, engine):
+    return set(iter_urls_mmap(path, engine))
+
+def _bench_parallel(path, workers, engine):
+    urls = set()
+    for _, found in iter_parallel_scan(plan_scan_tasks([(path, 0, os.path.getsize(path))]), workers, engine):
+        urls.update(found)
+    return urls
+
+def _bench_pipeline(path, workers, engine):
+    # 完整流程：扫描 + 去重校验 + 紧凑存储，不读写扫描索引
+    return set(scan_paths([path], workers=workers, use_index=False, engine=engine))
+
+# 名称 → 函数(语料路径, 并行进程数, 匹配引擎) → 找到的URL集合
+BENCH_STRATEGIES = {
+    "stream": _bench_stream,
+    "mmap": _bench_mmap,
+    "parallel": _bench_parallel,
+    "pipeline": _bench_pipeline,
+}
+
+
+def _bench_worker(strategy, engine, path, workers, repeat):
+    """在独立进程里跑单个策略，峰值内存互不干扰；输出一行JSON"""
+    baseline = peak_rss_bytes()
+    timings = []
+    found = set()
+    for _ in range(repeat):
+        found = None  # 先释放上一轮结果，峰值内存只反映单轮
+        started = time.perf_counter()
+        found = BENCH_STRATEGIES[strategy](path, workers, engine)
+        timings.append(time.perf_counter() - started)
+    peak = max(peak_rss_bytes(), peak_rss_bytes(children=True))
+    # 峰值记录完再读入答案，避免计入内存
+    with open(path + ".urls", "r", encoding="ascii") as f:
+        planted = set(f.read().split("\n")) - {""}
+    size = os.path.getsize(path)
+    seconds = min(timings)
+    digest = hashlib.blake2b("\n".join(sorted(found)).encode("utf-8"), digest_size=8).hexdigest()
+    result = {
+        "strategy": f"{strategy}/{engine}",
+        "digest": digest,  # 结果集指纹，不同引擎/策略应一致
+        "seconds": round(seconds, 4),
+        "mb_per_s": round(size / 1024 / 1024 / seconds, 2),
+        "urls_per_s": round(len(found) / seconds),
+        "found": len(found),
+        "recall": round(len(found & planted) / len(planted), 6) if planted else 1.0,
+        "unexpected": len(found - planted),
+        "peak_rss_mb": round(peak / 1024 / 1024, 1),
+        "rss_growth_mb": round((peak - baseline) / 1024 / 1024, 1),
+    }
+    print(json.dumps(result), flush=True)
+    return 0
+
+
+def main_bench(argv=None):
+    """生成（或复用）合成语料，逐个策略在子进程中测吞吐、峰值内存和召回率，结果可存为JSON并与上次对比"""
+    import argparse
+    import subprocess
+    import tempfile
+    parser = argparse.ArgumentParser(
+        prog="米哈游启动器背景提取 --bench",
+        description="扫描流程基准测试：合成语料上比较各扫描策略的吞吐、峰值内存与召回率"
+    )
+    parser.add_argument("--size-mb", type=float, default=64, help="语料大小（MB，默认64）")
+    parser.add_argument("--density", type=int, default=2000, help="每MB埋入的URL条数（默认2000）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子，相同参数生成相同语料")
+    parser.add_argument("--corpus-dir", default=os.path.join(tempfile.gettempdir(), "mihoyo_extractor_bench"),
+                        help="语料存放目录，同参数的语料会直接复用")
+    parser.add_argument("--strategies", default=",".join(BENCH_STRATEGIES),
+                        help=f"逗号分隔，可选：{','.join(BENCH_STRATEGIES)}")
+    parser.add_argument("--engines", default=f"{SCAN_ENGINE_REGEX},{SCAN_ENGINE_LITERAL}",
+                        help="逗号分隔的匹配引擎，每个策略在每个引擎下各跑一遍（默认 regex,literal）")
+    parser.add_argument("--workers", type=int, default=None, help="并行策略的进程数（默认CPU核数）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个策略重复次数，取最快一次")
+    parser.add_argument("--json", metavar="PATH", help="把结果写成JSON")
+    parser.add_argument("--compare", metavar="PATH", help="与之前保存的JSON结果逐项对比")
+    parser.add_argument("--worker", nargs=2, metavar=("STRATEGY", "CORPUS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return _bench_worker(args.worker[0], args.engines, args.worker[1], args.workers, args.repeat)
+
+    strategies = [name.strip() for name in args.strategies.split(",") if name.strip()]
+    unknown = set(strategies) - set(BENCH_STRATEGIES)
+    if unknown:
+        parser.error(f"未知策略：{', '.join(sorted(unknown))}")
+    engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = set(engines) - {SCAN_ENGINE_REGEX, SCAN_ENGINE_LITERAL}
+    if unknown:
+        parser.error(f"未知引擎：{', '.join(sorted(unknown))}")
+
+    os.makedirs(args.corpus_dir, exist_ok=True)
+    corpus = os.path.join(args.corpus_dir, f"corpus_{args.size_mb:g}mb_{args.density}_{args.seed}.bin")
+    if not (os.path.exists(corpus) and os.path.exists(corpus + ".urls")):
+        print(f"生成语料：{corpus}", file=sys.stderr)
+        planted = generate_bench_corpus(corpus, args.size_mb, args.density, args.seed)
+        print(f"已埋入 {len(planted)} 条URL", file=sys.stderr)
+
+    results = []
+    for strategy in strategies:
+        for engine in engines:
+            print(f"运行策略：{strategy}/{engine}", file=sys.stderr)
+            cmd = [sys.executable] if getattr(sys, "frozen", False) else [sys.executable, os.path.abspath(__file__)]
+            cmd += ["--bench", "--worker", strategy, corpus, "--engines", engine, "--repeat", str(args.repeat)]
+            if args.workers:
+                cmd += ["--workers", str(args.workers)]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0 or not proc.stdout.strip():
+                print(f"❌ {strategy}/{engine} 失败：{proc.stderr.strip()[-1000:]}", file=sys.stderr)
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = {item["strategy"]: item for item in json.load(f).get("results", [])}
+    print(f"{'策略':<20}{'MB/s':>10}{'URL/s':>12}{'峰值内存MB':>12}{'召回率':>10}{'多余':>8}")
+    for item in results:
+        line = (f"{item['strategy']:<20}{item['mb_per_s']:>10.1f}{item['urls_per_s']:>12}"
+                f"{item['peak_rss_mb']:>12.1f}{item['recall']:>10.2%}{item['unexpected']:>8}")
+        old = previous.get(item["strategy"])
+        if old:
+            line += f"  吞吐 {item['mb_per_s'] / old['mb_per_s'] - 1:+.1%}  内存 {item['peak_rss_mb'] - old['peak_rss_mb']:+.1f}MB"
+        print(line)
+    digests = {item["digest"] for item in results}
+    if len(digests) > 1:
+        print("❌ 各策略/引擎的结果集不一致：" + ", ".join(f"{item['strategy']}={item['digest']}" for item in results))
+    elif results:
+        print(f"✅ 各策略/引擎的结果集一致（{digests.pop()}）")
+
+    if args.json:
+        report = {
+            "meta": {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "size_mb": args.size_mb,
+                "density": args.density,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "scan_block_size": SCAN_BLOCK_SIZE,
+                "parallel_split_size": PARALLEL_SPLIT_SIZE,
+                "engines": engines,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0 if len(results) == len(strategies) * len(engines) and len(digests) <= 1 else 1
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--cli"]:
+    multiprocessing.freeze_support()
+    sys.exit(main_cli(sys.argv[2:]))
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--startup-report"]:
+    sys.exit(main_startup_report(sys.argv[2:]))
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--bench"]:
+    multiprocessing.freeze_support()
+    sys.exit(main_bench(sys.argv[2:]))
 
-    def _export_links(self):
-        if not self.filtered_matches:
-            QMessageBox.warning(self, "提示", "暂无可导出的链接")
-            return
-        save_path, _ = QFileDialog.getSaveFileName(self, "导出链接", "media_links.txt", "文本文件 (*.txt)")
-        if save_path:
-            with open(save_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(self.filtered_matches))
-            QMessageBox.information(self, "提示", f"已导出 {len(self.filtered_matches)} 个链接到 {save_path}")
-
-    def _show_right_menu(self, pos):
-        item = self.result_tree.itemAt(pos)
-        if item:
-            self.right_menu.exec(self.result_tree.mapToGlobal(pos))
-
-    def _copy_selected_link(self):
-        item = self.result_tree.currentItem()
-        if item:
-            self._copy_text(item.text(2))
-
-    def _open_selected_link(self):
-        item = self.result_tree.currentItem()
-        if item:
-            webbrowser.open(item.text(2))
-
-    def _on_item_double_click(self, item, column):
-        self._open_selected_link()
-
-# ========== 程序入口（原有代码，无修改） ==========
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    # 禁用QT的默认退出行为（确保托盘逻辑生效）
-    app.setQuitOnLastWindowClosed(False)
-    window = MiHoYoMediaExtractor()
-    window.show()
-    sys.exit(app.exec())
+    # 打包为exe时进程池子进程需要此调用
+    multiprocessing.freeze_support()
+    # 界面在单独的模块里，只在这里导入：进程池子进程会以__mp_main__重新导入本脚本，不能因此加载PyQt6。
+    # 界面模块按模块名导入本脚本，先登记正在运行的这一份，避免再执行一遍
+    sys.modules.setdefault("米哈游启动器背景提取", sys.modules[__name__])
+    from 米哈游启动器背景提取_界面 import main_gui
+    sys.exit(main_gui())
@@ -0,0 +1,1722 @@
+# 米哈游启动器媒体提取器的图形界面（PyQt6）。扫描/导出/下载等核心逻辑在 米哈游启动器背景提取.py 中，不依赖Qt；
+# 进程池子进程（spawn/forkserver）只重新导入核心脚本，不会加载本模块
+import time
+import re
+import os
+import json
+import sys
+import multiprocessing
+import hashlib
+import shutil
+import threading
+import heapq
+import platform
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from itertools import compress
+
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QLabel, QPushButton,
+    QFileDialog, QVBoxLayout, QHBoxLayout,
+    QTableView, QAbstractItemView, QHeaderView, QFrame, QSizePolicy, QLineEdit, QCheckBox, QMenu, QMessageBox,
+    QSystemTrayIcon
+)
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, QTimer, QCoreApplication, QAbstractTableModel, QModelIndex,
+    QObject, QRunnable, QThreadPool, QBuffer, QByteArray, QSize
+)
+from PyQt6.QtGui import QFont, QAction, QIcon, QImage, QImageReader
+from 米哈游启动器背景提取 import (
+    APP_TITLE, CATEGORY_CODES, CATEGORY_KEYS, CATEGORY_LABELS, CONFIG_PATH, CacheDirWatcher, DATA_URI_PREVIEW_DIR,
+    DEFAULT_PATHS, EXPORT_FORMATS, HttpConnectionPool, ICON, JobControl, MediaDownloader, MetadataCache,
+    MetadataProbe, RESULT_BATCH_INTERVAL, RESULT_BATCH_SIZE, RESULT_DB_PATH, ResultStore, SCAN_MODE_MMAP,
+    SCAN_PROFILE_PATH, SEARCH_INDEX_STEP, STARTUP_PROBE_ENV, ScanCancelled, ScanStats, THUMB_CACHE_DIR,
+    UI_REFRESH_INTERVAL_MS, UrlSearchIndex, UrlStore, UrlView, _STARTUP_T0, classify_url, data_uri_ext,
+    data_uri_key, decode_data_uri, discover_launcher_caches, export_links, ext_category, extract_cached_media,
+    is_cache_index, launcher_cache_tag, run_profiled, save_data_uri, scan_paths, url_exts, url_path
+)
+
+# ========== 后台处理线程 ==========
+class FileProcessThread(QThread):
+    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
+    batch_signal = pyqtSignal(list, list)   # 扫描过程中分批送出的新链接及各自的来源文件
+    result_signal = pyqtSignal(int)         # 有效链接总数（链接本身已经分批送达）
+    stats_signal = pyqtSignal(object)       # ScanStats，仅在开启统计时发出
+    data_uri_signal = pyqtSignal(list, str) # 新发现的内嵌图片 [DataUri] 及来源文件
+    error_signal = pyqtSignal(str)          # 错误信息
+
+    def __init__(self, file_paths, scan_mode=SCAN_MODE_MMAP, workers=None, use_index=True,
+                 collect_stats=False, profile_path=None, result_db=None):
+        super().__init__()
+        self.file_paths = file_paths
+        self.scan_mode = scan_mode
+        self.workers = workers  # None为按CPU核数并行，1为强制串行
+        self.use_index = use_index
+        self.collect_stats = collect_stats
+        self.profile_path = profile_path  # 给出时用cProfile抓取本次扫描
+        self.result_db = result_db  # 给出时扫描结果同时写入该结果库
+        self.control = JobControl()
+
+    def run(self):
+        result_store = None
+        try:
+            if self.result_db:
+                try:
+                    # 连接在扫描线程内打开，sqlite连接不能跨线程使用
+                    result_store = ResultStore(self.result_db)
+                except Exception as e:
+                    self.progress_signal.emit(f"⚠️ 结果库打开失败，本次结果不保存：{e}", "#dc2626")
+            stats = ScanStats() if self.collect_stats or self.profile_path else None
+            image_count = [0]
+
+            def on_data_uris(items, source):
+                image_count[0] += len(items)
+                self.data_uri_signal.emit(items, source)
+
+            scan_args = (self.file_paths, self.scan_mode, self.workers, self.use_index)
+            scan_kwargs = dict(on_batch=self.batch_signal.emit, on_progress=self.progress_signal.emit, stats=stats,
+                               result_store=result_store, control=self.control, on_data_uris=on_data_uris)
+            if self.profile_path:
+                valid_urls = run_profiled(self.profile_path, scan_paths, *scan_args, **scan_kwargs)
+                stats.profile_path = self.profile_path
+            else:
+                valid_urls = scan_paths(*scan_args, **scan_kwargs)
+            self.result_signal.emit(len(valid_urls))
+            if stats is not None:
+                self.stats_signal.emit(stats)
+            self.progress_signal.emit(
+                f"✅ 处理完成：共提取 {len(valid_urls)} 个有效链接"
+                + (f"，内嵌图片 {image_count[0]} 张" if image_count[0] else "")
+                + (f" | {stats.summary()}" if stats is not None else ""),
+                "#16a34a"
+            )
+        except ScanCancelled as e:
+            count = len(e.urls) if e.urls is not None else 0
+            self.result_signal.emit(count)
+            self.progress_signal.emit(f"⏹️ 已取消扫描，保留已找到的 {count} 个有效链接", "#6b7280")
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        finally:
+            if result_store is not None:
+                result_store.close()
+
+    def stop(self):
+        self.control.cancel()
+
+    def pause(self):
+        self.control.pause()
+
+    def resume(self):
+        self.control.resume()
+
+class CacheMediaExtractThread(QThread):
+    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
+    result_signal = pyqtSignal(list)        # [(url, 导出路径)]
+    error_signal = pyqtSignal(str)          # 错误信息
+
+    def __init__(self, cache_dir, out_dir, urls=None):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.out_dir = out_dir
+        self.urls = urls
+
+    def run(self):
+        try:
+            results = extract_cached_media(
+                self.cache_dir, self.out_dir, self.urls,
+                on_progress=lambda done, total, url: self.progress_signal.emit(
+                    f"⚡ 导出缓存文件 ({done}/{total})：{os.path.basename(url.split('?')[0])}", "#f59e0b"
+                )
+            )
+            self.result_signal.emit(results)
+            self.progress_signal.emit(f"✅ 导出完成：共 {len(results)} 个缓存媒体文件", "#16a34a")
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+class CacheWatchThread(QThread):
+    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
+    result_signal = pyqtSignal(list)        # 新发现的URL
+    error_signal = pyqtSignal(str)          # 错误信息
+
+    def __init__(self, dirs, result_db=None):
+        super().__init__()
+        self.dirs = dirs
+        self.result_db = result_db  # 给出时新发现的链接同时写入该结果库
+        self._stop_event = threading.Event()
+
+    def run(self):
+        result_store = None
+        try:
+            watcher = CacheDirWatcher(self.dirs)
+            if not watcher.dirs:
+                self.error_signal.emit("未找到可监视的缓存目录")
+                return
+            if self.result_db:
+                result_store = ResultStore(self.result_db)
+            self.progress_signal.emit(f"👀 正在监视 {len(watcher.dirs)} 个缓存目录", "#3b82f6")
+            for urls in watcher.iter_batches(self._stop_event):
+                self.result_signal.emit(urls)
+                if result_store is not None:
+                    # 监视批次不区分来源文件，来源留空（已有记录保留原来源）
+                    result_store.upsert(urls)
+                    result_store.flush()
+                self.progress_signal.emit(f"👀 监视中：新增 {len(urls)} 个链接", "#16a34a")
+        except Exception as e:
+            self.error_signal.emit(str(e))
+        finally:
+            if result_store is not None:
+                result_store.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+class DownloadThread(QThread):
+    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
+    result_signal = pyqtSignal(list)        # [(url, 本地路径, 状态)]
+    error_signal = pyqtSignal(str)          # 错误信息
+
+    def __init__(self, urls, out_dir, data_uris=None):
+        super().__init__()
+        self.urls = urls
+        self.out_dir = out_dir
+        self.data_uris = data_uris or {}  # 行键 → DataUri，内嵌图片直接解码保存，不走网络
+        self.downloader = MediaDownloader(out_dir)
+
+    def run(self):
+        try:
+            results = self.downloader.download_all(
+                self.urls,
+                on_progress=lambda done, total, url, status: self.progress_signal.emit(
+                    f"⬇️ 下载中 ({done}/{total})：{os.path.basename(url_path(url))}",
+                    "#f59e0b" if not status.startswith("failed") else "#dc2626"
+                )
+            ) if self.urls else []
+            for done, (key, item) in enumerate(self.data_uris.items(), 1):
+                if self.downloader.stop_event.is_set():
+                    break
+                self.progress_signal.emit(f"🖼️ 解码内嵌图片 ({done}/{len(self.data_uris)})", "#f59e0b")
+                try:
+                    results.append((key, save_data_uri(item, self.out_dir), "downloaded"))
+                except (OSError, ValueError) as e:
+                    results.append((key, "", f"failed: {e}"))
+            self.result_signal.emit(results)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def stop(self):
+        self.downloader.stop_event.set()
+
+class ExportThread(QThread):
+    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
+    result_signal = pyqtSignal(int)         # 导出的条数
+    error_signal = pyqtSignal(str)          # 错误信息
+
+    def __init__(self, urls, path, fmt, metadata):
+        super().__init__()
+        self.urls = urls
+        self.path = path
+        self.fmt = fmt
+        self.metadata = metadata
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            count = export_links(
+                self.urls, self.path, self.fmt, self.metadata,
+                on_progress=lambda done, total: self.progress_signal.emit(
+                    f"💾 导出中 ({done}/{total})：{os.path.basename(self.path)}", "#f59e0b"
+                ),
+                stop_event=self.stop_event
+            )
+            if count is None:
+                self.progress_signal.emit("⏹️ 已取消导出", "#6b7280")
+            else:
+                self.result_signal.emit(count)
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def stop(self):
+        self.stop_event.set()
+
+class ProbeThread(QThread):
+    progress_signal = pyqtSignal(str, str)  # 进度文本、颜色
+    batch_signal = pyqtSignal(dict)         # 分批送出的 {url: 元数据}
+    result_signal = pyqtSignal(int)         # 成功探测的链接数
+    error_signal = pyqtSignal(str)          # 错误信息
+
+    def __init__(self, urls, cache):
+        super().__init__()
+        self.urls = urls
+        self.probe = MetadataProbe(cache)
+
+    def run(self):
+        try:
+            pending = {}
+            state = {"done": 0, "last_flush": time.monotonic()}
+
+            def on_result(url, meta):
+                state["done"] += 1
+                if meta:
+                    pending[url] = meta
+                if len(pending) >= RESULT_BATCH_SIZE or time.monotonic() - state["last_flush"] >= RESULT_BATCH_INTERVAL:
+                    self.batch_signal.emit(dict(pending))
+                    pending.clear()
+                    state["last_flush"] = time.monotonic()
+                    self.progress_signal.emit(f"🔎 探测链接信息 ({state['done']}/{len(self.urls)})", "#f59e0b")
+
+            results = self.probe.probe_all(self.urls, on_result)
+            if pending:
+                self.batch_signal.emit(dict(pending))
+            self.result_signal.emit(len(results))
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
+    def stop(self):
+        self.probe.stop_event.set()
+
+# ========== 缩略图（后台解码 + 内存/磁盘两级缓存） ==========
+THUMB_SIZE = 48                             # 缩略图边长上限（像素）
+THUMB_MEMORY_BYTES = 32 * 1024 * 1024       # 内存LRU容量上限
+THUMB_MAX_SOURCE_BYTES = 32 * 1024 * 1024   # 超过该大小的原图不生成缩略图
+THUMB_WORKERS = 4
+THUMB_RETRY_SECONDS = 60                    # 加载失败（多为网络抖动）的缩略图隔这么久才再试
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)  # url、缩略图（失败时为空图）
+
+class _ThumbnailJob(QRunnable):
+    def __init__(self, loader, url):
+        super().__init__()
+        self.loader = loader
+        self.url = url
+
+    def run(self):
+        try:
+            image = self.loader.load(self.url)
+        except Exception:
+            image = QImage()
+        self.loader.signals.loaded.emit(self.url, image)
+
+class ThumbnailLoader(QObject):
+    """工作线程池下载+解码+缩放，GUI线程只取内存中的结果；内存LRU按字节数限额，磁盘按URL和内容哈希缓存"""
+    updated = pyqtSignal(str)
+
+    def __init__(self, cache_dir=THUMB_CACHE_DIR, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.signals = _ThumbnailSignals()
+        self.signals.loaded.connect(self._on_loaded)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(THUMB_WORKERS)
+        self.http = HttpConnectionPool(timeout=15, max_idle_per_host=THUMB_WORKERS)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._pending = set()
+        self._failed = {}  # URL → 失败时刻
+        self.data_uri_lookup = None  # 行键 → DataUri 的查找函数，命中的内嵌图片在加载时才解码
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._index_lock = threading.Lock()
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except:
+            self._index = {}
+
+    def get(self, url):
+        """GUI线程调用：命中内存直接返回，否则排队加载并返回None"""
+        image = self._memory.get(url)
+        if image is not None:
+            self._memory.move_to_end(url)
+            return image
+        self.request(url)
+        return None
+
+    def request(self, url, priority=0):
+        if url in self._memory or url in self._pending:
+            return
+        failed_at = self._failed.get(url)
+        if failed_at is not None:
+            if time.monotonic() - failed_at < THUMB_RETRY_SECONDS:
+                return
+            del self._failed[url]
+        self._pending.add(url)
+        self.pool.start(_ThumbnailJob(self, url), priority)
+
+    def prefetch(self, urls):
+        for url in urls:
+            self.request(url, priority=-1)
+
+    def load(self, url):
+        """工作线程中执行：先查磁盘缓存，未命中再下载原图并按目标尺寸解码"""
+        with self._index_lock:
+            digest = self._index.get(url)
+        if digest:
+            image = QImage(os.path.join(self.cache_dir, f"{digest}.png"))
+            if not image.isNull():
+                return image
+        item = self.data_uri_lookup(url) if self.data_uri_lookup else None
+        if item is not None:
+            try:
+                data = decode_data_uri(item, THUMB_MAX_SOURCE_BYTES)
+            except (OSError, ValueError):
+                data = None
+            if not data:
+                return QImage()
+        else:
+            response, key, conn = self.http.open("GET", url, {"Connection": "keep-alive"})
+            length = response.getheader("Content-Length")
+            if response.status != 200 or (length and int(length) > THUMB_MAX_SOURCE_BYTES):
+                self.http.release(key, conn, False)
+                return QImage()
+            data = response.read(THUMB_MAX_SOURCE_BYTES + 1)
+            self.http.release(key, conn, not response.will_close and len(data) <= THUMB_MAX_SOURCE_BYTES)
+            if len(data) > THUMB_MAX_SOURCE_BYTES:
+                return QImage()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        thumb_path = os.path.join(self.cache_dir, f"{digest}.png")
+        image = QImage(thumb_path) if os.path.exists(thumb_path) else QImage()
+        if image.isNull():
+            buffer = QBuffer()
+            buffer.setData(QByteArray(data))
+            reader = QImageReader(buffer)
+            size = reader.size()
+            if size.isValid():
+                # 解码时直接缩放，JPEG等格式可跳过全尺寸解码
+                reader.setScaledSize(size.scaled(THUMB_SIZE, THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                return image
+            if image.width() > THUMB_SIZE or image.height() > THUMB_SIZE:
+                image = image.scaled(THUMB_SIZE, THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            image.save(thumb_path, "PNG")
+        with self._index_lock:
+            self._index[url] = digest
+        return image
+
+    def _on_loaded(self, url, image):
+        self._pending.discard(url)
+        if image.isNull():
+            self._failed[url] = time.monotonic()
+            return
+        self._memory[url] = image
+        self._memory_bytes += image.sizeInBytes()
+        while self._memory_bytes > THUMB_MEMORY_BYTES and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.sizeInBytes()
+        self.updated.emit(url)
+
+    def shutdown(self):
+        self.pool.clear()
+        self.pool.waitForDone()
+        self.http.close_all()
+        with self._index_lock:
+            index = dict(self._index)
+        try:
+            with open(self._index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+        except OSError:
+            pass
+
+# ========== 结果表模型（虚拟化，只为可见行取数据） ==========
+def _select_table(value):
+    """bytes.translate用的表：把value映射为1、其余映射为0，配合compress按值挑出行号"""
+    return bytes(value) + b"\x01" + bytes(255 - value)
+
+def format_size(size):
+    if size is None:
+        return ""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+class MatchTableModel(QAbstractTableModel):
+    HEADERS = ["类型", "大小", "来源", "操作", "链接"]
+    TAG_COLUMN = 2
+    URL_COLUMN = 4
+
+    def __init__(self, metadata, parent=None):
+        super().__init__(parent)
+        self._metadata = metadata  # url → 探测到的元数据（与窗口共用同一字典）
+        self.thumbnails = None     # ThumbnailLoader，开启缩略图时设置
+        self._urls = []
+        self._categories = []
+        self._tags = None
+        self._tag_labels = ()
+        self._rows = []
+        self._start = 0
+        self._count = 0
+
+    def set_rows(self, urls, categories, rows, start=0, count=None, tags=None, tag_labels=()):
+        """展示rows[start:start+count]（rows为all_matches中的行号），不复制任何URL；
+        tags为每行的来源标签编号，tag_labels为编号 → “区服 版本”"""
+        self.beginResetModel()
+        self._urls = urls
+        self._categories = categories
+        self._tags = tags
+        self._tag_labels = tag_labels
+        self._rows = rows
+        self._start = start
+        self._count = max(0, min(len(rows) - start, len(rows) if count is None else count))
+        self.endResetModel()
+
+    def url_at(self, row):
+        if 0 <= row < self._count:
+            return self._urls[self._rows[self._start + row]]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def visible_urls(self):
+        return [self._urls[row] for row in self._rows[self._start:self._start + self._count]]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DecorationRole:
+            match_row = self._rows[self._start + index.row()]
+            if index.column() == 0 and self.thumbnails and CATEGORY_KEYS[self._categories[match_row]] == "image":
+                # 只取内存中的缩略图，未就绪时后台加载完成后再重绘
+                return self.thumbnails.get(self._urls[match_row])
+            return None
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        match_row = self._rows[self._start + index.row()]
+        url = self._urls[match_row]
+        if index.column() == 0:
+            meta = self._metadata.get(url)
+            if role == Qt.ItemDataRole.ToolTipRole and meta and meta.get("type"):
+                return meta["type"]
+            return CATEGORY_LABELS[CATEGORY_KEYS[self._categories[match_row]]]
+        if index.column() == 1:
+            meta = self._metadata.get(url)
+            return format_size(meta.get("size")) if meta else ""
+        if index.column() == self.TAG_COLUMN:
+            return self._tag_labels[self._tags[match_row]] if self._tags is not None else ""
+        if index.column() == self.URL_COLUMN:
+            return url
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+# ========== 主窗口 ==========
+class MiHoYoMediaExtractor(QMainWindow):
+    def set_transparent_no_border(self, widget, color="#6b7280"):
+        widget.setStyleSheet(f"color: {color}; border: none; background-color: transparent; padding: 0px; margin: 0px;")
+    
+    def __init__(self, result_db=RESULT_DB_PATH):
+        super().__init__()
+        # True为打开托盘，False为关闭托盘
+        self.show_tray_icon = False
+        self.setWindowIcon(QIcon(ICON))
+        self.setWindowTitle(APP_TITLE)
+        self.setGeometry(100, 100, 1200, 800)
+        self.setWindowFlags(Qt.WindowType.Window | Qt.WindowType.WindowCloseButtonHint | Qt.WindowType.WindowMinimizeButtonHint)
+        self.setFixedSize(self.size())
+
+        # 全局变量
+        # 已探测的链接元数据：磁盘缓存由探测线程读写，界面保留一份副本用于分类和按大小排序
+        self._url_metadata = {}
+        self._data_uris = {}
+        self._reset_matches()
+        self.current_page = 1
+        self.file_paths = []
+        self.last_path = self._load_last_path()
+        self.process_thread = None
+        self._retired_scans = []  # 被新扫描取代、还没退出的旧扫描线程（保留引用直到结束）
+        self.scan_stats = None
+        # 结果库在界面线程单独持有一个连接，用于启动恢复和判断“上次启动后新增”
+        self.result_db = result_db
+        self.result_store = None
+        self._new_since = 0.0  # 首次发现时间晚于此即算“上次启动后新增”
+        self._has_history = False  # 库里有没有本次启动前的结果；没有时新链接不必逐批查库
+        self._restore_pages = None
+        self.extract_thread = None
+        self.watch_thread = None
+        self.download_thread = None
+        self.probe_thread = None
+        self.export_thread = None
+        self.thumbnail_loader = None
+        # 缓存文件可能较大，首帧显示后再读取
+        self.metadata_cache = None
+        self.items_per_page = 8
+        self.tray_icon = None  # 托盘对象
+        
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(UI_REFRESH_INTERVAL_MS)
+        self._refresh_timer.timeout.connect(lambda: self._apply_filters(keep_page=True))
+        self._index_timer = QTimer(self)
+        self._index_timer.setSingleShot(True)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_search_step)
+        
+        # 初始化UI + 绑定快捷键
+        self._init_ui()
+        self._bind_shortcuts()
+        self._calculate_items_per_page()
+        QTimer.singleShot(100, self._calculate_items_per_page)
+        QTimer.singleShot(0, self._load_metadata_cache)
+        QTimer.singleShot(0, self._restore_results)
+        
+        # ========== 初始化系统托盘 ==========
+        # 托盘不在首帧关键路径上，关闭时不创建；开启时等事件循环空闲再创建
+        if self.show_tray_icon:
+            QTimer.singleShot(0, self._init_tray)
+
+    def _load_metadata_cache(self):
+        if self.metadata_cache is not None:
+            return
+        self.metadata_cache = MetadataCache()
+        # 原地更新，表格模型持有的是同一个字典
+        self._url_metadata.update(self.metadata_cache.entries)
+        if self.all_matches:
+            self._schedule_refresh()
+
+    def _load_last_path(self):
+        try:
+            if os.path.exists(CONFIG_PATH):
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+                    return config.get("last_path", "")
+        except:
+            return ""
+
+    def _save_last_path(self, path):
+        try:
+            config = {"last_path": path}
+            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+                json.dump(config, f, ensure_ascii=False)
+        except:
+            pass
+
+    def _calculate_items_per_page(self):
+        if not hasattr(self, 'result_view') or self.result_view.viewport().height() < 40:
+            self.items_per_page = 2
+            return
+        # 表格视口不含表头，直接按行高计算
+        view_height = self.result_view.viewport().height()
+        single_row_height = self.result_view.verticalHeader().defaultSectionSize()
+        self.items_per_page = max(1, min(view_height // single_row_height, 60))
+        if self.filtered_matches:
+            self._render_page()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # 只重新计算每页条数并刷新当前页，筛选结果不变无需重算
+        self._calculate_items_per_page()
+
+    def _get_total_pages(self):
+        if not self.filtered_matches:
+            return 1
+        total = len(self.filtered_matches)
+        total_pages = total // self.items_per_page
+        if total % self.items_per_page != 0:
+            total_pages += 1
+        return max(1, total_pages)
+
+    # ========== 初始化系统托盘 ==========
+    def _init_tray(self):
+        # 创建托盘图标（可替换为自定义图标，这里用默认样式）
+        self.tray_icon = QSystemTrayIcon(self)
+        # 兼容不同平台的图标（如果没有自定义图标，用QT默认）
+        # self.tray_icon.setIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon))
+        self.tray_icon.setIcon(QIcon(ICON))
+        
+        # 创建托盘菜单
+        tray_menu = QMenu(self)
+        
+        # 显示窗口动作
+        show_action = QAction("显示窗口", self)
+        show_action.triggered.connect(self.show_normal)
+        tray_menu.addAction(show_action)
+        
+        # 退出程序动作
+        exit_action = QAction("退出程序", self)
+        exit_action.triggered.connect(self._exit_app_completely)
+        tray_menu.addAction(exit_action)
+        
+        # 绑定托盘菜单
+        self.tray_icon.setContextMenu(tray_menu)
+        
+        # 托盘点击事件（左键显示窗口）
+        self.tray_icon.activated.connect(self._on_tray_click)
+        
+        self.tray_icon.show()
+
+    # ========== 托盘点击事件 ==========
+    def _on_tray_click(self, reason):
+        # 左键点击托盘显示窗口
+        if reason == QSystemTrayIcon.ActivationReason.Trigger:
+            self.show_normal()
+
+    # ========== 完全退出程序（托盘触发） ==========
+    def _exit_app_completely(self):
+        # 停止正在运行的后台线程
+        self._stop_watch()
+        if self.download_thread and self.download_thread.isRunning():
+            self.download_thread.stop()
+            self.download_thread.wait()
+        if self.probe_thread and self.probe_thread.isRunning():
+            self.probe_thread.stop()
+            self.probe_thread.wait()
+        if self.export_thread and self.export_thread.isRunning():
+            self.export_thread.stop()
+            self.export_thread.wait()
+        if self.thumbnail_loader:
+            self.thumbnail_loader.shutdown()
+        # 扫描线程协作式退出：在下一个检查点抛出取消，关闭文件、进程池和结果库后结束
+        for thread in [self.process_thread, *self._retired_scans]:
+            if thread and thread.isRunning():
+                thread.stop()
+                thread.wait()
+        if self.result_store is not None:
+            self.result_store.mark_exit()
+            self.result_store.close()
+            self.result_store = None
+        
+        # 隐藏托盘
+        if self.tray_icon:
+            self.tray_icon.hide()
+        
+        # 关闭窗口并退出进程
+        self.close()
+        QCoreApplication.quit()
+        sys.exit(0)
+
+    # ========== 关闭窗口事件 ==========
+    def closeEvent(self, event):
+        # 判断是否启用了托盘
+        if self.tray_icon and self.tray_icon.isVisible():
+            # 有托盘：隐藏窗口，不退出进程
+            self.hide()
+            event.ignore()  # 忽略默认的关闭行为
+        else:
+            # 无托盘：直接完全退出
+            self._exit_app_completely()
+            event.accept()
+
+    # ========== 恢复窗口显示 ==========
+    def show_normal(self):
+        self.show()
+        self.setWindowState(Qt.WindowState.WindowNoState)  # 恢复正常窗口状态
+
+    # ========== 初始化UI ==========
+    def _init_ui(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        main_layout.setSpacing(15)
+
+        title_label = QLabel(APP_TITLE)
+        title_font = QFont()
+        title_font.setPointSize(16)
+        title_font.setBold(True)
+        title_label.setFont(title_font)
+        title_label.setStyleSheet("color: #2563eb;")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        sub_title = QLabel("拖拽/批量选择文件，自动提取媒体链接 | 支持跨平台/批量处理/链接导出")
+        sub_font = QFont()
+        sub_font.setPointSize(10)
+        sub_title.setFont(sub_font)
+        sub_title.setStyleSheet("color: #6b7280;")
+        
+        title_layout = QVBoxLayout()
+        title_layout.addWidget(title_label)
+        title_layout.addWidget(sub_title)
+        main_layout.addLayout(title_layout)
+
+        path_frame = QFrame()
+        self.set_transparent_no_border(path_frame)
+        path_layout = QVBoxLayout(path_frame)
+        path_layout.setContentsMargins(15, 10, 15, 10)
+        
+        cn_layout = QHBoxLayout()
+        cn_label = QLabel("国 服 路 径：")
+        cn_label.setFont(sub_font)
+        self.set_transparent_no_border(cn_label)
+        cn_entry = QLineEdit(DEFAULT_PATHS["国服"])
+        cn_entry.setFont(QFont("Consolas" if platform.system() == "Windows" else "Monaco", 9))
+        cn_entry.setReadOnly(True)
+        cn_copy_btn = QPushButton("复制")
+        cn_copy_btn.clicked.connect(lambda: self._copy_text(cn_entry.text()))
+        cn_layout.addWidget(cn_label)
+        cn_layout.addWidget(cn_entry)
+        cn_layout.addWidget(cn_copy_btn)
+        path_layout.addLayout(cn_layout)
+
+        global_layout = QHBoxLayout()
+        global_label = QLabel("国际服路径：")
+        global_label.setFont(sub_font)
+        self.set_transparent_no_border(global_label)
+        global_entry = QLineEdit(DEFAULT_PATHS["国际服"])
+        global_entry.setFont(QFont("Consolas" if platform.system() == "Windows" else "Monaco", 9))
+        global_entry.setReadOnly(True)
+        global_copy_btn = QPushButton("复制")
+        global_copy_btn.clicked.connect(lambda: self._copy_text(global_entry.text()))
+        global_layout.addWidget(global_label)
+        global_layout.addWidget(global_entry)
+        global_layout.addWidget(global_copy_btn)
+        path_layout.addLayout(global_layout)
+        
+        self.watch_check = QCheckBox("实时监视以上缓存目录（新缓存的背景自动加入结果）")
+        self.watch_check.setFont(sub_font)
+        self.watch_check.toggled.connect(self._toggle_watch)
+        path_layout.addWidget(self.watch_check)
+        
+        scan_all_btn = QPushButton("一键扫描全部缓存（自动发现各区服所有版本）")
+        scan_all_btn.setStyleSheet("background-color: #2563eb; color: white; padding: 6px 12px; border: none; border-radius: 4px;")
+        scan_all_btn.clicked.connect(self._scan_all_caches)
+        path_layout.addWidget(scan_all_btn)
+        
+        main_layout.addWidget(path_frame)
+
+        self.drag_frame = QFrame()
+        self.set_transparent_no_border(self.drag_frame)
+        drag_layout = QVBoxLayout(self.drag_frame)
+        drag_layout.setContentsMargins(20, 15, 20, 15)
+        
+        drag_label = QLabel("🖱️ 拖拽文件到此处（支持多文件） | 或点击按钮选择")
+        drag_label.setFont(sub_font)
+        self.set_transparent_no_border(drag_label, "#3b82f6")
+        drag_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        drag_layout.addWidget(drag_label)
+
+        btn_layout = QHBoxLayout()
+        single_btn = QPushButton("选择单个文件")
+        single_btn.setStyleSheet("background-color: #3b82f6; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        single_btn.clicked.connect(lambda: self._select_files(multi=False))
+        
+        multi_btn = QPushButton("选择多个文件")
+        multi_btn.setStyleSheet("background-color: #10b981; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        multi_btn.clicked.connect(lambda: self._select_files(multi=True))
+        
+        clear_btn = QPushButton("清空结果")
+        clear_btn.setStyleSheet("background-color: #ef4444; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        clear_btn.clicked.connect(self._clear_results)
+        
+        history_btn = QPushButton("载入历史结果")
+        history_btn.setStyleSheet("background-color: #0d9488; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        history_btn.clicked.connect(self._restore_results)
+        
+        self.pause_btn = QPushButton("暂停扫描")
+        self.pause_btn.setStyleSheet("background-color: #f59e0b; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        self.pause_btn.clicked.connect(self._toggle_pause_scan)
+        self.pause_btn.setEnabled(False)
+        
+        self.cancel_btn = QPushButton("取消扫描")
+        self.cancel_btn.setStyleSheet("background-color: #6b7280; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        self.cancel_btn.clicked.connect(self._cancel_scan)
+        self.cancel_btn.setEnabled(False)
+        
+        report_btn = QPushButton("导出扫描报告")
+        report_btn.setStyleSheet("background-color: #6b7280; color: white; padding: 8px 15px; border: none; border-radius: 4px;")
+        report_btn.clicked.connect(self._export_scan_report)
+        
+        self.stats_check = QCheckBox("扫描统计")
+        self.stats_check.setFont(sub_font)
+        self.stats_check.setToolTip("记录每个文件的读取/匹配/解码/过滤耗时、去重命中率和峰值内存（扫描会略慢）")
+        self.profile_check = QCheckBox("cProfile")
+        self.profile_check.setFont(sub_font)
+        self.profile_check.setToolTip("用cProfile抓取下一次扫描，随扫描报告一起导出")
+        
+        btn_layout.addWidget(single_btn)
+        btn_layout.addWidget(multi_btn)
+        btn_layout.addWidget(clear_btn)
+        btn_layout.addWidget(self.pause_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(history_btn)
+        btn_layout.addWidget(report_btn)
+        btn_layout.addWidget(self.stats_check)
+        btn_layout.addWidget(self.profile_check)
+        btn_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        drag_layout.addLayout(btn_layout)
+
+        self.file_status_label = QLabel(f"✅ 等待选择/拖拽文件 | 上次路径：{os.path.basename(self.last_path) if self.last_path else '无'}")
+        self.file_status_label.setFont(sub_font)
+        self.set_transparent_no_border(self.file_status_label)
+        self.file_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        drag_layout.addWidget(self.file_status_label)
+
+        self.drag_frame.setAcceptDrops(True)
+        self.drag_frame.dragEnterEvent = self._on_drag_enter
+        self.drag_frame.dragLeaveEvent = self._on_drag_leave
+        self.drag_frame.dropEvent = self._on_drag_drop
+        
+        main_layout.addWidget(self.drag_frame)
+
+        filter_frame = QFrame()
+        self.set_transparent_no_border(filter_frame)
+        filter_layout = QHBoxLayout(filter_frame)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.img_check = QCheckBox("图片 (jpg/png/webp等)")
+        self.img_check.setFont(sub_font)
+        self.img_check.setChecked(True)
+        self.img_check.stateChanged.connect(self._apply_filters)
+        
+        self.video_check = QCheckBox("视频 (webm/mp4等)")
+        self.video_check.setFont(sub_font)
+        self.video_check.setChecked(True)
+        self.video_check.stateChanged.connect(self._apply_filters)
+        
+        self.other_check = QCheckBox("其他 (json/config等)")
+        self.other_check.setFont(sub_font)
+        self.other_check.setChecked(False)
+        self.other_check.stateChanged.connect(self._apply_filters)
+        
+        export_btn = QPushButton("导出当前链接")
+        export_btn.setStyleSheet("background-color: #8b5cf6; color: white; padding: 6px 12px; border: none; border-radius: 4px;")
+        export_btn.clicked.connect(self._export_links)
+        
+        download_btn = QPushButton("下载当前链接")
+        download_btn.setStyleSheet("background-color: #f97316; color: white; padding: 6px 12px; border: none; border-radius: 4px;")
+        download_btn.clicked.connect(lambda: self._download_links(list(self.filtered_matches)))
+        
+        extract_btn = QPushButton("导出缓存原文件")
+        extract_btn.setStyleSheet("background-color: #0ea5e9; color: white; padding: 6px 12px; border: none; border-radius: 4px;")
+        extract_btn.clicked.connect(self._extract_cached_media)
+        
+        filter_layout.addWidget(self.img_check)
+        filter_layout.addWidget(self.video_check)
+        filter_layout.addWidget(self.other_check)
+        
+        self.search_edit = QLineEdit()
+        self.search_edit.setFont(sub_font)
+        self.search_edit.setPlaceholderText("搜索链接（支持 host:域名 / path:/路径前缀）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setMinimumWidth(280)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(80)
+        self._search_timer.timeout.connect(self._apply_filters)
+        self.search_edit.textChanged.connect(lambda text: self._search_timer.start())
+        filter_layout.addWidget(self.search_edit)
+        
+        self.ext_edit = QLineEdit()
+        self.ext_edit.setFont(sub_font)
+        self.ext_edit.setPlaceholderText("扩展名，如 png,webp")
+        self.ext_edit.setClearButtonEnabled(True)
+        self.ext_edit.setFixedWidth(140)
+        self.ext_edit.textChanged.connect(lambda text: self._search_timer.start())
+        filter_layout.addWidget(self.ext_edit)
+        
+        self.sort_size_check = QCheckBox("按大小排序")
+        self.sort_size_check.setFont(sub_font)
+        self.sort_size_check.stateChanged.connect(self._apply_filters)
+        filter_layout.addWidget(self.sort_size_check)
+        
+        self.new_only_check = QCheckBox("仅看上次启动后新增")
+        self.new_only_check.setFont(sub_font)
+        self.new_only_check.stateChanged.connect(self._apply_filters)
+        filter_layout.addWidget(self.new_only_check)
+        
+        probe_btn = QPushButton("探测类型/大小")
+        probe_btn.setStyleSheet("background-color: #64748b; color: white; padding: 6px 12px; border: none; border-radius: 4px;")
+        probe_btn.clicked.connect(self._probe_metadata)
+        filter_layout.addWidget(probe_btn)
+        filter_layout.addStretch()
+        filter_layout.addWidget(download_btn)
+        filter_layout.addWidget(extract_btn)
+        filter_layout.addWidget(export_btn)
+        main_layout.addWidget(filter_frame)
+
+        pagination_frame = QFrame()
+        self.set_transparent_no_border(pagination_frame)
+        pagination_layout = QHBoxLayout(pagination_frame)
+        
+        self.page_info_label = QLabel("第 1 / 1 页 | 共 0 个链接")
+        self.page_info_label.setFont(sub_font)
+        self.set_transparent_no_border(self.page_info_label)
+        pagination_layout.addWidget(self.page_info_label)
+        
+        prev_btn = QPushButton("上一页")
+        prev_btn.setFont(QFont("Segoe UI", 9))
+        prev_btn.setFixedWidth(60)
+        prev_btn.clicked.connect(lambda: self._goto_page(self.current_page - 1))
+        pagination_layout.addWidget(prev_btn)
+        
+        self.page_edit = QLineEdit("1")
+        self.page_edit.setFont(QFont("Segoe UI", 9))
+        self.page_edit.setFixedWidth(40)
+        pagination_layout.addWidget(self.page_edit)
+        
+        jump_btn = QPushButton("跳转")
+        jump_btn.setFont(QFont("Segoe UI", 9))
+        jump_btn.setFixedWidth(40)
+        jump_btn.clicked.connect(self._jump_page_handler)
+        pagination_layout.addWidget(jump_btn)
+        
+        next_btn = QPushButton("下一页")
+        next_btn.setFont(QFont("Segoe UI", 9))
+        next_btn.setFixedWidth(60)
+        next_btn.clicked.connect(lambda: self._goto_page(self.current_page + 1))
+        pagination_layout.addWidget(next_btn)
+        
+        self.page_controls = [prev_btn, self.page_edit, jump_btn, next_btn]
+        self.scroll_check = QCheckBox("滚动浏览")
+        self.scroll_check.setFont(sub_font)
+        self.scroll_check.toggled.connect(self._toggle_scroll_mode)
+        pagination_layout.addWidget(self.scroll_check)
+        
+        self.thumb_check = QCheckBox("显示缩略图")
+        self.thumb_check.setFont(sub_font)
+        self.thumb_check.toggled.connect(self._toggle_thumbnails)
+        pagination_layout.addWidget(self.thumb_check)
+        
+        main_layout.addWidget(pagination_frame)
+
+        result_frame = QFrame()
+        result_frame.setStyleSheet("background-color: white; border: 1px solid #e2e8f0; border-radius: 4px; padding: 0px; margin:0px;")
+        result_layout = QHBoxLayout(result_frame)
+        result_layout.setContentsMargins(0,0,0,0)
+        result_layout.setSpacing(0)
+        
+        self.result_model = MatchTableModel(self._url_metadata, self)
+        self.result_view = QTableView()
+        self.result_view.setModel(self.result_model)
+        self.result_view.setColumnWidth(0, 80)
+        self.result_view.setColumnWidth(1, 80)
+        self.result_view.setColumnWidth(MatchTableModel.TAG_COLUMN, 90)
+        self.result_view.setColumnWidth(3, 150)
+        self.result_view.horizontalHeader().setStretchLastSection(True)
+        self.result_view.horizontalHeader().setHighlightSections(False)
+        self.result_view.verticalHeader().hide()
+        self.result_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.result_view.verticalHeader().setDefaultSectionSize(16)
+        self.result_view.setShowGrid(False)
+        self.result_view.setWordWrap(False)
+        self.result_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.result_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.result_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.result_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.result_view.setStyleSheet("""
+            QTableView {background-color: white; color: #111827; border: none; font-size: 9pt; outline: none; padding:0;margin:0;}
+            QHeaderView::section {background-color: white; color: #374151; border: none; font-weight: bold;padding:0;margin:0;}
+            QTableView::item {border: none;padding:0;margin:0;}
+            QTableView::item:selected {background-color: #dbeafe; color: #1e40af; border-radius: 2px;}
+        """)
+        self.result_view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.result_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.result_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.result_view.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        
+        self.result_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.result_view.customContextMenuRequested.connect(self._show_right_menu)
+        self.right_menu = None  # 首次右键时再创建
+        
+        self.result_view.doubleClicked.connect(self._on_item_double_click)
+        
+        result_layout.addWidget(self.result_view)
+        main_layout.addWidget(result_frame)
+
+    # ========== 快捷键绑定 ==========
+    def _bind_shortcuts(self):
+        self.addAction(QAction("OpenSingle", self, shortcut="Ctrl+O", triggered=lambda: self._select_files(multi=False)))
+        self.addAction(QAction("OpenMulti", self, shortcut="Ctrl+Shift+O", triggered=lambda: self._select_files(multi=True)))
+        self.addAction(QAction("Export", self, shortcut="Ctrl+E", triggered=self._export_links))
+        self.addAction(QAction("Clear", self, shortcut="Ctrl+R", triggered=self._clear_results))
+        self.addAction(QAction("Quit", self, shortcut="Esc", triggered=self.close))
+
+    # ========== 拖拽事件 ==========
+    def _on_drag_enter(self, event):
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+            self.file_status_label.setText("👉 松开鼠标即可解析文件（支持多文件）")
+            self.set_transparent_no_border(self.file_status_label, "#3b82f6")
+
+    def _on_drag_leave(self, event):
+        if not self.file_paths:
+            self.file_status_label.setText(f"✅ 等待选择/拖拽文件 | 上次路径：{os.path.basename(self.last_path) if self.last_path else '无'}")
+            self.set_transparent_no_border(self.file_status_label)
+
+    def _on_drag_drop(self, event):
+        urls = event.mimeData().urls()
+        file_paths = [url.toLocalFile() for url in urls if os.path.isfile(url.toLocalFile()) and os.access(url.toLocalFile(), os.R_OK)]
+        if not file_paths:
+            self.file_status_label.setText("❌ 拖拽解析失败：无效文件")
+            self.set_transparent_no_border(self.file_status_label, "#dc2626")
+            return
+        self.file_paths = file_paths
+        self._update_file_status()
+        self._save_last_path(file_paths[0])
+        self._start_process_files()
+
+    # ========== 文件选择与处理 ==========
+    def _select_files(self, multi=False):
+        initial_dir = os.path.dirname(self.last_path) if self.last_path and os.path.exists(os.path.dirname(self.last_path)) else "."
+        file_filter = "所有文件 (*.*);;data_1文件 (data_1);;缓存索引文件 (index)"
+        if multi:
+            file_paths, _ = QFileDialog.getOpenFileNames(self, "选择多个data_1文件", initial_dir, file_filter)
+        else:
+            file_path, _ = QFileDialog.getOpenFileName(self, "选择data_1文件", initial_dir, file_filter)
+            file_paths = [file_path] if file_path else []
+        if not file_paths:
+            return
+        self.file_paths = file_paths
+        self._update_file_status()
+        self._save_last_path(file_paths[0])
+        self._start_process_files()
+
+    def _scan_all_caches(self):
+        caches = discover_launcher_caches()
+        if not caches:
+            QMessageBox.information(self, "提示", "未发现启动器缓存目录（国服/国际服 HYP）")
+            return
+        # 各缓存目录的index一次交给扫描线程，多个目录在进程池中同时解析，结果按区服/版本打标签后合并
+        self.file_paths = [os.path.join(cache.path, "index") for cache in caches]
+        self._start_process_files()
+        self._show_progress(
+            f"🔍 发现 {len(caches)} 个启动器缓存：" + "、".join(f"{c.region} {c.version}" for c in caches), "#3b82f6"
+        )
+
+    def _update_file_status(self):
+        if len(self.file_paths) == 1:
+            self.file_status_label.setText(f"✅ 解析成功：{os.path.basename(self.file_paths[0])}")
+        else:
+            self.file_status_label.setText(f"✅ 解析成功：共 {len(self.file_paths)} 个文件")
+        self.set_transparent_no_border(self.file_status_label, "#16a34a")
+
+    def _retire_scan(self):
+        # 当前扫描线程在下一个检查点退出，不等它结束；引用留到它结束为止，之后它发来的信号一律不再处理
+        old = self.process_thread
+        if old is not None and old.isRunning():
+            old.stop()
+            self._retired_scans = [thread for thread in self._retired_scans if thread.isRunning()] + [old]
+        self.process_thread = None
+
+    def _start_process_files(self):
+        # 新扫描取代正在进行的扫描
+        self._retire_scan()
+        # 新扫描的结果替换旧结果，边扫描边分批追加到列表
+        self._reset_matches()
+        self._apply_filters()
+        self.file_status_label.setToolTip("")
+        thread = self.process_thread = FileProcessThread(
+            self.file_paths,
+            collect_stats=self.stats_check.isChecked(),
+            profile_path=SCAN_PROFILE_PATH if self.profile_check.isChecked() else None,
+            result_db=self.result_db if self.result_store is not None else None
+        )
+        # 被取代的线程可能还有已排队的信号，只处理当前扫描线程发来的
+        current = lambda: thread is self.process_thread
+        thread.progress_signal.connect(lambda text, color: current() and self._show_progress(text, color))
+        thread.batch_signal.connect(lambda urls, sources: current() and self._append_matches(urls, sources))
+        thread.result_signal.connect(lambda count: current() and self._schedule_refresh())
+        thread.stats_signal.connect(lambda stats: current() and self._on_scan_stats(stats))
+        thread.data_uri_signal.connect(lambda items, source: current() and self._append_data_uris(items, source))
+        thread.error_signal.connect(lambda err: current() and QMessageBox.critical(self, "错误", err))
+        thread.finished.connect(lambda: current() and self._update_scan_buttons(running=False))
+        thread.start()
+        self._update_scan_buttons(running=True)
+
+    def _update_scan_buttons(self, running):
+        self.pause_btn.setEnabled(running)
+        self.cancel_btn.setEnabled(running)
+        self.pause_btn.setText("继续扫描" if running and self.process_thread.control.paused else "暂停扫描")
+
+    def _toggle_pause_scan(self):
+        thread = self.process_thread
+        if not (thread and thread.isRunning()):
+            return
+        if thread.control.paused:
+            thread.resume()
+            self._show_progress("▶️ 继续扫描", "#f59e0b")
+        else:
+            thread.pause()
+            self._show_progress(f"⏸️ 扫描已暂停：已找到 {len(self.all_matches)} 个链接", "#6b7280")
+        self._update_scan_buttons(running=True)
+
+    def _cancel_scan(self):
+        thread = self.process_thread
+        if thread and thread.isRunning():
+            # 已找到的结果保留
+            self._retire_scan()
+            self._update_scan_buttons(running=False)
+            self._show_progress(f"⏹️ 已取消扫描，保留已找到的 {len(self.all_matches)} 个链接", "#6b7280")
+
+    # ========== 扫描结果、筛选与导出 ==========
+    def _copy_text(self, text):
+        clipboard = QApplication.clipboard()
+        clipboard.setText(text)
+        QMessageBox.information(self, "提示", "已复制到剪贴板")
+
+    def _clear_results(self):
+        self._cancel_scan()
+        if self.result_store is not None and self.result_store.count():
+            reply = QMessageBox.question(self, "提示", "是否同时清空历史结果（下次启动不再恢复）？")
+            if reply == QMessageBox.StandardButton.Yes:
+                # 被取消的扫描线程退出时还会把最后一批结果写进库，等它们结束再清空，免得清空后又被写回
+                for thread in self._retired_scans:
+                    thread.wait()
+                self._retired_scans = []
+                self.result_store.clear()
+                self._has_history = False
+        self._reset_matches()
+        self.current_page = 1
+        self._render_page()
+        self.file_status_label.setText(f"✅ 等待选择/拖拽文件 | 上次路径：{os.path.basename(self.last_path) if self.last_path else '无'}")
+
+    def _apply_filters(self, keep_page=False):
+        # 过滤逻辑：直接取已勾选类别/扩展名的预建行号索引或每行类别编码，不再逐条判断扩展名
+        selected = [
+            self._category_index[category]
+            for category, check in (("image", self.img_check), ("video", self.video_check), ("other", self.other_check))
+            if check.isChecked()
+        ]
+        selected_codes = {
+            CATEGORY_CODES[category] for category, check in (("image", self.img_check), ("video", self.video_check), ("other", self.other_check))
+            if check.isChecked()
+        }
+        query = self.search_edit.text().strip()
+        exts = {ext.lstrip(".") for ext in re.split(r"[\s,，;]+", self.ext_edit.text().strip().lower()) if ext.lstrip(".")}
+        ext_rows = heapq.merge(*(self._ext_index[ext] for ext in exts if ext in self._ext_index)) if exts else None
+        if query:
+            # 搜索结果通常远少于类别索引，直接按行类别筛一遍即可
+            rows = self._search_index.search(query)
+            if ext_rows is not None:
+                allowed = set(ext_rows)
+                rows = (row for row in rows if row in allowed)
+            self.filtered_ids = array("I", (row for row in rows if self._match_categories[row] in selected_codes))
+        elif ext_rows is not None:
+            # 扩展名桶按行号有序，合并后再按行类别筛
+            self.filtered_ids = array("I", (row for row in ext_rows if self._match_categories[row] in selected_codes))
+        elif len(selected) == len(self._category_index):
+            self.filtered_ids = range(len(self.all_matches))
+        elif len(selected) == 1:
+            # 复制一份，之后入库追加到类别索引的行不会悄悄改变当前视图
+            self.filtered_ids = array("I", selected[0])
+        else:
+            # 勾选多个类别时按每行类别编码translate+compress在C层整段挑出行号，不在Python里逐个合并类别索引
+            table = bytes(code in selected_codes for code in range(256))
+            self.filtered_ids = array("I", compress(range(len(self.all_matches)), self._match_categories.translate(table)))
+        if self.new_only_check.isChecked():
+            self.filtered_ids = array("I", (row for row in self.filtered_ids if self._new_flags[row]))
+        if self.sort_size_check.isChecked():
+            # 已知大小的按从大到小，未探测的排在最后
+            sizes = [(self._url_metadata.get(self.all_matches[row]) or {}).get("size") for row in self.filtered_ids]
+            order = sorted(range(len(sizes)), key=lambda i: -1 if sizes[i] is None else -sizes[i])
+            self.filtered_ids = array("I", [self.filtered_ids[i] for i in order if sizes[i] is not None] +
+                                      [self.filtered_ids[i] for i in order if sizes[i] is None])
+        self.filtered_matches = UrlView(self.all_matches, self.filtered_ids)
+        # 更新分页和列表
+        if not keep_page:
+            self.current_page = 1
+        self._render_page()
+
+    def _render_page(self):
+        if self.scroll_check.isChecked():
+            # 滚动模式：模型覆盖全部筛选结果，视图只为可见行取数据
+            scroll_value = self.result_view.verticalScrollBar().value()
+            self.result_model.set_rows(
+                self.all_matches, self._match_categories, self.filtered_ids, tags=self._match_tags, tag_labels=self._tag_labels
+            )
+            self.result_view.verticalScrollBar().setValue(scroll_value)
+            self.page_info_label.setText(f"滚动浏览 | 共 {len(self.filtered_ids)} 个链接")
+            return
+        total_pages = self._get_total_pages()
+        start_idx = (self.current_page - 1) * self.items_per_page
+        self.result_model.set_rows(
+            self.all_matches, self._match_categories, self.filtered_ids, start_idx, self.items_per_page,
+            tags=self._match_tags, tag_labels=self._tag_labels
+        )
+        if self.thumbnail_loader:
+            # 预取下一页图片的缩略图，翻页时直接命中内存
+            next_rows = self.filtered_ids[start_idx + self.items_per_page:start_idx + 2 * self.items_per_page]
+            self.thumbnail_loader.prefetch(
+                self.all_matches[row] for row in next_rows if self._match_categories[row] == CATEGORY_CODES["image"]
+            )
+        self.page_info_label.setText(f"第 {self.current_page} / {total_pages} 页 | 共 {len(self.filtered_matches)} 个链接")
+
+    def _toggle_thumbnails(self, checked):
+        if checked and self.thumbnail_loader is None:
+            self.thumbnail_loader = ThumbnailLoader(parent=self)
+            self.thumbnail_loader.data_uri_lookup = lambda key: self._data_uris.get(key)
+            self._thumb_repaint_timer = QTimer(self)
+            self._thumb_repaint_timer.setSingleShot(True)
+            self._thumb_repaint_timer.setInterval(UI_REFRESH_INTERVAL_MS)
+            self._thumb_repaint_timer.timeout.connect(self.result_view.viewport().update)
+            # 定时器运行期间到达的缩略图并入同一次重绘，持续到达时也按固定间隔刷新（限频而不是防抖）
+            self.thumbnail_loader.updated.connect(
+                lambda url: self._thumb_repaint_timer.isActive() or self._thumb_repaint_timer.start()
+            )
+        self.result_model.thumbnails = self.thumbnail_loader if checked else None
+        self.result_view.verticalHeader().setDefaultSectionSize(THUMB_SIZE + 4 if checked else 16)
+        self.result_view.setIconSize(QSize(THUMB_SIZE, THUMB_SIZE) if checked else QSize(16, 16))
+        self.result_view.setColumnWidth(0, THUMB_SIZE + 60 if checked else 80)
+        self.current_page = 1
+        self._calculate_items_per_page()
+        self._render_page()
+
+    def _toggle_scroll_mode(self, checked):
+        policy = Qt.ScrollBarPolicy.ScrollBarAsNeeded if checked else Qt.ScrollBarPolicy.ScrollBarAlwaysOff
+        self.result_view.setVerticalScrollBarPolicy(policy)
+        for widget in self.page_controls:
+            widget.setEnabled(not checked)
+        self.result_view.scrollToTop()
+        self._render_page()
+
+    def _goto_page(self, page):
+        total_pages = self._get_total_pages()
+        if 1 <= page <= total_pages:
+            self.current_page = page
+            self._render_page()
+            self.page_edit.setText(str(page))
+
+    def _jump_page_handler(self):
+        try:
+            page = int(self.page_edit.text())
+            self._goto_page(page)
+        except ValueError:
+            QMessageBox.warning(self, "提示", "请输入有效的页码")
+
+    def _export_links(self):
+        if self.export_thread and self.export_thread.isRunning():
+            reply = QMessageBox.question(self, "提示", "正在导出链接，是否取消？")
+            if reply == QMessageBox.StandardButton.Yes:
+                self.export_thread.stop()
+            return
+        # 行号快照：导出期间继续扫描/筛选不影响本次导出的内容，URL在线程里按行读取
+        rows = self._link_rows(self.filtered_ids)
+        if not rows:
+            QMessageBox.warning(self, "提示", "暂无可导出的链接")
+            return
+        filters = {f"{label} (*{ext})": fmt for fmt, (label, ext) in EXPORT_FORMATS.items()}
+        save_path, selected = QFileDialog.getSaveFileName(self, "导出链接", "media_links.txt", ";;".join(filters))
+        if not save_path:
+            return
+        fmt = filters.get(selected, "txt")
+        if not save_path.endswith(EXPORT_FORMATS[fmt][1]):
+            save_path = os.path.splitext(save_path)[0] + EXPORT_FORMATS[fmt][1]
+        self.export_thread = ExportThread(UrlView(self.all_matches, rows), save_path, fmt, self._url_metadata)
+        self.export_thread.progress_signal.connect(self._show_progress)
+        self.export_thread.result_signal.connect(lambda count: (
+            self._show_progress(f"✅ 导出完成：{count} 个链接", "#16a34a"),
+            QMessageBox.information(self, "提示", f"已导出 {count} 个链接到 {save_path}")
+        ))
+        self.export_thread.error_signal.connect(lambda err: QMessageBox.critical(self, "错误", err))
+        self.export_thread.start()
+
+    def _link_rows(self, rows):
+        # 复制一份行号，去掉内嵌图片行：它们的行键（data:image/…;blake2b=…）不是能访问的链接
+        if not self._data_uris:
+            return rows[:]
+        data_rows = {self.all_matches.index(key) for key in self._data_uris}
+        return array("I", (row for row in rows if row not in data_rows))
+
+    def _reset_matches(self):
+        # 全部结果存于紧凑的UrlStore，筛选结果只是其上的行号视图
+        self.all_matches = UrlStore()
+        self.filtered_ids = array("I")
+        self.filtered_matches = UrlView(self.all_matches, self.filtered_ids)
+        # 入库时一次性分类：每行的类别编码 + 按类别/扩展名的行号索引（行号递增，天然有序）
+        self._match_categories = bytearray()
+        self._category_index = {category: array("I") for category in CATEGORY_LABELS}
+        self._ext_index = {}
+        self._search_index = UrlSearchIndex(self.all_matches)
+        # 每行是否为上次启动后才首次发现（1为新增）
+        self._new_flags = bytearray()
+        # 每行的来源标签编号（0为无标签），标签按来源文件换算一次后缓存
+        self._match_tags = array("H")
+        self._tag_labels = [""]
+        self._source_tags = {}
+        # 内嵌图片的类型和大小是入库时估算后写进元数据的，随这些行一起清掉
+        for key in self._data_uris:
+            self._url_metadata.pop(key, None)
+        # 内嵌图片行键 → DataUri，载荷留在原文件，预览/保存时才解码
+        self._data_uris = {}
+        # 新扫描替换当前结果，未恢复完的历史结果不再追加
+        self._restore_pages = None
+
+    def _tag_id(self, source):
+        tag_id = self._source_tags.get(source)
+        if tag_id is None:
+            label = launcher_cache_tag(source) if source else ""
+            if label not in self._tag_labels:
+                self._tag_labels.append(label)
+            tag_id = self._source_tags[source] = self._tag_labels.index(label)
+        return tag_id
+
+    def _index_match(self, row, category, ext, is_new, tag_id=0):
+        self._match_categories.append(CATEGORY_CODES[category])
+        self._match_tags.append(tag_id)
+        self._category_index[category].append(row)
+        ext_rows = self._ext_index.get(ext)
+        if ext_rows is None:
+            ext_rows = self._ext_index[ext] = array("I")
+        ext_rows.append(row)
+        self._new_flags.append(is_new)
+
+    def _append_matches(self, urls, sources=None):
+        # 按批入库：去重交给UrlStore.add_many，扩展名整批切出；类别按批内出现的扩展名各判断一次，
+        # 各索引整段追加
+        base = len(self.all_matches)
+        new_urls = self.all_matches.add_many(urls)
+        if not new_urls:
+            return
+        new_rows = range(base, base + len(new_urls))
+        exts = url_exts(new_urls)
+        ext_ids = {ext: ext_id for ext_id, ext in enumerate(dict.fromkeys(exts))}
+        ext_codes = bytes(CATEGORY_CODES[ext_category(ext)] for ext in ext_ids)
+        if len(ext_ids) == 1:
+            ext_rows = {exts[0]: new_rows}
+            codes = bytearray(ext_codes * len(new_urls))
+        elif len(ext_ids) <= 256:
+            # 每行记一个字节的扩展名编号，归组和归类都用translate+compress在C层整段完成
+            ids = bytes(map(ext_ids.__getitem__, exts))
+            ext_rows = {ext: compress(new_rows, ids.translate(_select_table(ext_id))) for ext, ext_id in ext_ids.items()}
+            codes = bytearray(ids.translate(ext_codes.ljust(256, b"\0")))
+        else:
+            ext_rows = {ext: [] for ext in ext_ids}
+            for row, ext in zip(new_rows, exts):
+                ext_rows[ext].append(row)
+            codes = bytearray(ext_codes[ext_ids[ext]] for ext in exts)
+        # 已探测到Content-Type的链接以其为准，类别可能与扩展名不一致
+        metadata = self._url_metadata
+        if metadata and not metadata.keys().isdisjoint(new_urls):
+            for i, url in enumerate(new_urls):
+                meta = metadata.get(url)
+                if meta and meta.get("type"):
+                    codes[i] = CATEGORY_CODES[ext_category(exts[i], meta["type"])]
+        self._match_categories += codes
+        for code, category in enumerate(CATEGORY_KEYS):
+            count = codes.count(code)
+            if count == len(codes):
+                self._category_index[category].extend(new_rows)
+            elif count:
+                self._category_index[category].extend(compress(new_rows, codes.translate(_select_table(code))))
+        for ext, rows in ext_rows.items():
+            index = self._ext_index.get(ext)
+            if index is None:
+                index = self._ext_index[ext] = array("I")
+            index.extend(rows)
+        if not sources:
+            self._match_tags.extend(bytes(len(new_urls)))
+        elif len(set(sources)) == 1:
+            self._match_tags.extend([self._tag_id(sources[0])] * len(new_urls))
+        else:
+            # 同一URL在批内出现多次时按首次出现的来源，与逐条加入一致
+            source_of = dict(zip(reversed(urls), reversed(sources)))
+            tag_ids = {source: self._tag_id(source) for source in set(sources)}
+            self._match_tags.extend([tag_ids[source_of[url]] for url in new_urls])
+        # 结果库里早于本次启动就有的链接不算新增
+        if self.result_store is not None and self._has_history:
+            known = self.result_store.known_before(new_urls, self._new_since)
+            self._new_flags += bytes([url not in known for url in new_urls])
+        else:
+            self._new_flags += b"\x01" * len(new_urls)
+        self._schedule_refresh()
+        if not self._index_timer.isActive():
+            self._index_timer.start()
+
+    def _append_data_uris(self, items, source):
+        # 内嵌图片不入结果库：它们指向缓存文件中的偏移，缓存改写后即失效
+        added = False
+        tag_id = self._tag_id(source)
+        for item in items:
+            key = data_uri_key(item)
+            row, is_new = self.all_matches.add(key)
+            if not is_new:
+                continue
+            self._data_uris[key] = item
+            # 解码后大小按载荷长度估算，忽略结尾填充
+            self._url_metadata[key] = {"type": f"image/{item.mime}", "size": item.length // 4 * 3}
+            self._index_match(row, "image", data_uri_ext(item.mime), False, tag_id)
+            added = True
+        if added:
+            self._schedule_refresh()
+            if not self._index_timer.isActive():
+                self._index_timer.start()
+
+    def _restore_results(self):
+        # 从结果库分页恢复历史结果：每个事件循环周期读一页，界面不卡顿
+        if self.process_thread and self.process_thread.isRunning():
+            QMessageBox.information(self, "提示", "正在处理文件，请稍候...")
+            return
+        if self.result_store is None:
+            try:
+                self.result_store = ResultStore(self.result_db)
+                self._new_since = self.result_store.mark_launch()
+                self._has_history = self.result_store.has_before(self._new_since)
+            except Exception as e:
+                self.result_store = None
+                self._show_progress(f"⚠️ 结果库打开失败，本次结果不会保存：{e}", "#dc2626")
+                return
+        self._reset_matches()
+        self._apply_filters()
+        self._restore_pages = self.result_store.iter_pages()
+        self._restore_step()
+
+    def _restore_step(self):
+        if self._restore_pages is None:
+            return
+        page = next(self._restore_pages, None)
+        if page is None:
+            self._restore_pages = None
+            if self.all_matches:
+                new_count = self._new_flags.count(1)
+                self._show_progress(
+                    f"♻️ 已恢复 {len(self.all_matches)} 条历史结果，其中上次启动后新增 {new_count} 条", "#16a34a"
+                )
+            return
+        for _, url, category, ext, first_seen, source in page:
+            row, is_new = self.all_matches.add(url)
+            if not is_new:
+                continue
+            meta = self._url_metadata.get(url)
+            if meta and meta.get("type"):
+                category, ext = classify_url(url, meta["type"])
+            self._index_match(row, category, ext, first_seen > self._new_since, self._tag_id(source))
+        self._schedule_refresh()
+        if not self._index_timer.isActive():
+            self._index_timer.start()
+        QTimer.singleShot(0, self._restore_step)
+
+    def _on_metadata_batch(self, metas):
+        # 探测到真实Content-Type后重新归类：类别变了的行从原类别索引二分删除、插入新类别索引，其余行不动
+        for url, meta in metas.items():
+            self._url_metadata[url] = meta
+            row = self.all_matches.index(url)
+            if row < 0:
+                continue
+            category, _ = classify_url(url, meta.get("type"))
+            old_code = self._match_categories[row]
+            if CATEGORY_CODES[category] != old_code:
+                self._match_categories[row] = CATEGORY_CODES[category]
+                old_rows = self._category_index[CATEGORY_KEYS[old_code]]
+                del old_rows[bisect_left(old_rows, row)]
+                insort(self._category_index[category], row)
+        self._schedule_refresh()
+
+    def _probe_metadata(self):
+        if not self.filtered_matches:
+            QMessageBox.warning(self, "提示", "暂无可探测的链接")
+            return
+        if self.probe_thread and self.probe_thread.isRunning():
+            QMessageBox.information(self, "提示", "正在探测链接信息，请稍候...")
+            return
+        self._load_metadata_cache()
+        self.probe_thread = ProbeThread(
+            [url for url in self.filtered_matches if url not in self._data_uris], self.metadata_cache
+        )
+        self.probe_thread.progress_signal.connect(self._show_progress)
+        self.probe_thread.batch_signal.connect(self._on_metadata_batch)
+        self.probe_thread.result_signal.connect(
+            lambda count: self._show_progress(f"✅ 探测完成：{count} 个链接已获取类型和大小", "#16a34a")
+        )
+        self.probe_thread.error_signal.connect(lambda err: QMessageBox.critical(self, "错误", err))
+        self.probe_thread.start()
+
+    def _index_search_step(self):
+        # 界面空闲时分片补建搜索索引，避免大批结果到达时卡住界面
+        self._search_index.index_pending(SEARCH_INDEX_STEP)
+        if self._search_index.pending:
+            self._index_timer.start()
+
+    def _schedule_refresh(self):
+        # 结果成批到达时合并刷新，列表刷新频率封顶
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _toggle_watch(self, checked):
+        if checked:
+            # 监视自动发现的全部版本目录，一个都没找到时退回预设路径
+            cache_dirs = [cache.path for cache in discover_launcher_caches()] or list(DEFAULT_PATHS.values())
+            self.watch_thread = CacheWatchThread(cache_dirs, self.result_db if self.result_store is not None else None)
+            self.watch_thread.progress_signal.connect(self._show_progress)
+            self.watch_thread.result_signal.connect(self._append_matches)
+            self.watch_thread.error_signal.connect(self._on_watch_error)
+            self.watch_thread.start()
+        else:
+            self._stop_watch()
+
+    def _on_watch_error(self, err):
+        self.watch_check.setChecked(False)
+        QMessageBox.warning(self, "提示", err)
+
+    def _stop_watch(self):
+        if self.watch_thread and self.watch_thread.isRunning():
+            self.watch_thread.stop()
+            self.watch_thread.wait()
+        self.watch_thread = None
+
+    def _download_links(self, urls):
+        if not urls:
+            QMessageBox.warning(self, "提示", "暂无可下载的链接")
+            return
+        if self.download_thread and self.download_thread.isRunning():
+            QMessageBox.information(self, "提示", "正在下载，请稍候...")
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "选择下载目录", os.path.expanduser("~"))
+        if not out_dir:
+            return
+        # 内嵌图片就地解码保存，其余链接照常下载
+        data_uris = {url: self._data_uris[url] for url in urls if url in self._data_uris}
+        if data_uris:
+            urls = [url for url in urls if url not in data_uris]
+        self.download_thread = DownloadThread(urls, out_dir, data_uris)
+        self.download_thread.progress_signal.connect(self._show_progress)
+        self.download_thread.result_signal.connect(self._on_download_finished)
+        self.download_thread.error_signal.connect(lambda err: QMessageBox.critical(self, "错误", err))
+        self.download_thread.start()
+
+    def _on_download_finished(self, results):
+        counts = {"downloaded": 0, "resumed": 0, "skipped": 0}
+        failed = 0
+        for _, _, status in results:
+            if status in counts:
+                counts[status] += 1
+            else:
+                failed += 1
+        summary = f"新下载 {counts['downloaded']} 个，续传 {counts['resumed']} 个，已存在跳过 {counts['skipped']} 个，失败 {failed} 个"
+        self._show_progress(f"✅ 下载完成：{summary}", "#16a34a" if not failed else "#dc2626")
+        QMessageBox.information(self, "提示", summary)
+
+    def _show_progress(self, text, color):
+        self.file_status_label.setText(text)
+        self.set_transparent_no_border(self.file_status_label, color)
+
+    def _on_scan_stats(self, stats):
+        # 状态栏只放一行摘要，逐文件明细放到悬停提示里
+        self.scan_stats = stats
+        self.file_status_label.setToolTip(stats.details())
+
+    def _export_scan_report(self):
+        if self.scan_stats is None:
+            QMessageBox.information(self, "提示", "暂无扫描报告，请勾选“扫描统计”或“cProfile”后重新扫描")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "导出扫描报告", "scan_report.json", "JSON文件 (*.json)")
+        if not path:
+            return
+        try:
+            report = self.scan_stats.to_dict()
+            profile_path = self.scan_stats.profile_path
+            if profile_path and os.path.exists(profile_path):
+                # cProfile结果随报告放在同一目录，可用 python -m pstats 查看
+                report["profile"] = os.path.splitext(path)[0] + ".prof"
+                shutil.copyfile(profile_path, report["profile"])
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"导出扫描报告失败：{e}")
+            return
+        self._show_progress(f"✅ 扫描报告已导出：{os.path.basename(path)}", "#16a34a")
+
+    def _extract_cached_media(self):
+        if self.extract_thread and self.extract_thread.isRunning():
+            QMessageBox.information(self, "提示", "正在导出缓存文件，请稍候...")
+            return
+        last_dir = os.path.dirname(self.last_path) if self.last_path else ""
+        if last_dir and os.path.exists(os.path.join(last_dir, "index")):
+            initial_dir = last_dir
+        else:
+            initial_dir = next((path for path in DEFAULT_PATHS.values() if os.path.isdir(path)), last_dir or ".")
+        cache_dir = QFileDialog.getExistingDirectory(self, "选择Cache_Data缓存目录", initial_dir)
+        if not cache_dir:
+            return
+        if not is_cache_index(os.path.join(cache_dir, "index")):
+            QMessageBox.warning(self, "提示", "所选目录不是有效的缓存目录（缺少index文件）")
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "选择导出目录", os.path.expanduser("~"))
+        if not out_dir:
+            return
+        # 有筛选结果时只导出当前列表中的链接，否则导出缓存中全部图片/视频
+        urls = list(self.filtered_matches) if self.filtered_matches else None
+        self.extract_thread = CacheMediaExtractThread(cache_dir, out_dir, urls)
+        self.extract_thread.progress_signal.connect(self._show_progress)
+        self.extract_thread.result_signal.connect(
+            lambda results: QMessageBox.information(self, "提示", f"已导出 {len(results)} 个缓存媒体文件到 {out_dir}")
+        )
+        self.extract_thread.error_signal.connect(lambda err: QMessageBox.critical(self, "错误", err))
+        self.extract_thread.start()
+
+    def _build_right_menu(self):
+        self.right_menu = QMenu(self)
+        self.copy_action = QAction("复制链接", self)
+        self.copy_action.triggered.connect(self._copy_selected_link)
+        self.open_action = QAction("在浏览器打开", self)
+        self.open_action.triggered.connect(self._open_selected_link)
+        self.download_action = QAction("下载该链接", self)
+        self.download_action.triggered.connect(lambda: self._download_links([self._selected_url()] if self._selected_url() else []))
+        self.right_menu.addAction(self.copy_action)
+        self.right_menu.addAction(self.open_action)
+        self.right_menu.addAction(self.download_action)
+
+    def _show_right_menu(self, pos):
+        index = self.result_view.indexAt(pos)
+        if index.isValid():
+            self.result_view.setCurrentIndex(index)
+            if self.right_menu is None:
+                self._build_right_menu()
+            # 内嵌图片没有可复制的链接，仍可打开和保存
+            self.copy_action.setEnabled(self._selected_url() not in self._data_uris)
+            self.right_menu.exec(self.result_view.viewport().mapToGlobal(pos))
+
+    def _selected_url(self):
+        index = self.result_view.currentIndex()
+        return self.result_model.url_at(index.row()) if index.isValid() else None
+
+    def _copy_selected_link(self):
+        url = self._selected_url()
+        if url and url not in self._data_uris:
+            self._copy_text(url)
+
+    def _open_selected_link(self):
+        url = self._selected_url()
+        if url:
+            import webbrowser
+            item = self._data_uris.get(url)
+            if item is not None:
+                # 内嵌图片解码到本地文件后用系统默认程序打开
+                try:
+                    url = "file:///" + save_data_uri(item, DATA_URI_PREVIEW_DIR).replace("\\", "/").lstrip("/")
+                except (OSError, ValueError) as e:
+                    QMessageBox.warning(self, "提示", f"内嵌图片解码失败：{e}")
+                    return
+            webbrowser.open(url)
+
+    def _on_item_double_click(self, index):
+        self._open_selected_link()
+
+# ========== 程序入口 ==========
+def main_gui():
+    app = QApplication(sys.argv)
+    # 禁用QT的默认退出行为（确保托盘逻辑生效）
+    app.setQuitOnLastWindowClosed(False)
+    probe = os.environ.get(STARTUP_PROBE_ENV)
+    if probe:
+        # 启动耗时报告的子进程改用临时结果库：启动/退出时间记在临时库里，真实库的“上次启动后新增”分界不动；
+        # 退出时窗口直接sys.exit，临时目录留到解释器退出时清理
+        import atexit
+        import tempfile
+        probe_dir = tempfile.mkdtemp(prefix="mihoyo_startup_probe_")
+        atexit.register(shutil.rmtree, probe_dir, ignore_errors=True)
+        window = MiHoYoMediaExtractor(result_db=os.path.join(probe_dir, "results.db"))
+    else:
+        window = MiHoYoMediaExtractor()
+    window.show()
+    if probe:
+        # 事件循环处理完首帧后输出耗时并退出
+        def _report_first_window():
+            print(json.dumps({"window_ms": round((time.perf_counter() - _STARTUP_T0) * 1000, 1)}), flush=True)
+            app.quit()
+        QTimer.singleShot(0, _report_first_window)
+    return app.exec()
+
+
+if __name__ == "__main__":
+    # 打包为exe时进程池子进程需要此调用
+    multiprocessing.freeze_support()
+    sys.exit(main_gui())